@@ -1,11 +1,18 @@
 import subprocess
-from PyPDF2 import PdfReader
+import time
 import os
+from observability.metrics import observe_llm_call
+from observability.tracing import annotate_usage, span, traced
+from agentic_summary.latex_build import STAMP_SUFFIX, build_pdf
+from agentic_summary.latex_converter import markdown_to_latex
+from agentic_summary.text_extraction import extract_texts
+from agentic_summary.usage_ledger import BudgetExceededError, usage_context
 
 
 class Agentic_Aggregation:
     def __init__(self, output_path, deployment_name, client, max_tokens, temperature, top_p, frequency_penalty,
-                 presence_penalty, max_pdfs_per_file):
+                 presence_penalty, max_pdfs_per_file, extraction_backend="pypdf2", extraction_workers=None,
+                 latex_conversion="llm", tectonic_cache_path=None):
         """
         Initialize the Agentic Aggregation class.
 
@@ -19,6 +26,11 @@ class Agentic_Aggregation:
             frequency_penalty (float): Penalty for token repetition.
             presence_penalty (float): Encouragement for new content generation.
             max_pdfs_per_file (int): Maximum number of PDFs processed per summary file.
+            extraction_backend (str): Text extraction backend for the summaries ("pdfium", "pdfminer" or "pypdf2").
+            extraction_workers (int): Processes extracting summary texts (CPU count when None).
+            latex_conversion (str): How the survey is converted to LaTeX: "local" (in-process converter),
+                "auto" (local, with the LLM as fallback for unsupported constructs) or "llm".
+            tectonic_cache_path (str): Persistent tectonic cache (inside the output directory when None).
         """
         self.output_path = output_path
         self.deployment_name = deployment_name
@@ -29,13 +41,48 @@ class Agentic_Aggregation:
         self.frequency_penalty = frequency_penalty
         self.presence_penalty = presence_penalty
         self.max_pdfs_per_file = max_pdfs_per_file
+        self.extraction_backend = extraction_backend
+        self.extraction_workers = extraction_workers
+        self.latex_conversion = latex_conversion
+        self.tectonic_cache_path = tectonic_cache_path or os.path.join(self.output_path, "tectonic_cache")
 
         self.states_of_art_path = os.path.join(self.output_path, "state_of_the_art")
         os.makedirs(self.states_of_art_path, exist_ok=True)
 
+    def create_completion(self, prompt, stage):
+        """
+        Sends a chat completion request and records its latency and token usage under `stage`.
+
+        Args:
+            prompt (list): Chat messages.
+            stage (str): Pipeline stage issuing the request (used as metrics label).
+
+        Returns:
+            ChatCompletion: The API response.
+        """
+        with span("llm_request", stage=stage, model=self.deployment_name) as request_span, \
+                usage_context(stage=stage):
+            start = time.perf_counter()
+            completion = self.client.chat.completions.create(
+                model=self.deployment_name,
+                messages=prompt,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                top_p=self.top_p,
+                frequency_penalty=self.frequency_penalty,
+                presence_penalty=self.presence_penalty,
+                stop=None,
+                stream=False
+            )
+            observe_llm_call(completion, time.perf_counter() - start, stage=stage)
+            annotate_usage(request_span, completion)
+        return completion
+
+    @traced()
     def clean_directory(self):
         """
-        Removes all files from the specified directory except for 'state_of_the_art.pdf'.
+        Removes all files from the specified directory except for 'state_of_the_art.pdf' and its build
+        stamp (used to skip unchanged LaTeX builds).
 
         This ensures that only the final compiled PDF remains, preventing clutter from temporary or
         intermediate files generated during processing.
@@ -44,66 +91,104 @@ class Agentic_Aggregation:
             file_path = os.path.join(self.states_of_art_path, file)
 
             # Preserve only the final PDF, delete all other files
-            if file != "state_of_the_art.pdf":
+            if file not in ("state_of_the_art.pdf", "state_of_the_art" + STAMP_SUFFIX):
                 try:
                     os.remove(file_path)
                 except Exception as e:
                     print(f"Error deleting {file}: {e}")
 
-    def aggregate_summaries(self):
+    def iter_summaries(self):
         """
-        Aggregates the extracted text from all summary PDF files into structured text files,
-        ensuring summaries are grouped into multiple text files when exceeding a predefined limit.
+        Yields every summary PDF in the output directory with the text extracted from its pages.
 
-        Saves the aggregated summaries in the designated output directory.
+        Returns:
+            generator: Pairs of (file name, list of page texts).
+        """
+        summary_paths = [os.path.join(root, file) for root, _, files in os.walk(self.output_path)
+                         for file in sorted(files) if file.lower().endswith("_summary.pdf")]
+
+        # Extract text content from the PDFs (in parallel, reusing the cached text of unchanged summaries)
+        for path, pages in extract_texts(summary_paths, self.extraction_backend, self.extraction_workers):
+            yield os.path.basename(path), pages
 
+    @staticmethod
+    def build_aggregates(summaries, max_pdfs_per_file):
+        """
+        Builds the aggregate texts from extracted summaries, starting a new aggregate every
+        `max_pdfs_per_file` summaries.
+
+        Args:
+            summaries (iterable): Pairs of (file name, list of page texts), see `iter_summaries`.
+            max_pdfs_per_file (int): Maximum number of summaries per aggregate.
+
+        Returns:
+            generator: The aggregate texts, in order.
         """
         all_summaries_text = ""
         pdf_count = 0
-        file_index = 1
 
-        # Traverse the output directory to locate all summary PDF files
-        for root, _, files in os.walk(self.output_path):
-            for file in sorted(files):
-                if file.lower().endswith("_summary.pdf"):
-                    pdf_count += 1
-                    pdf_path = os.path.join(root, file)
+        for file, page_texts in summaries:
+            pdf_count += 1
 
-                    # Append the summary number and file name as a heading
-                    all_summaries_text += f"### Summary {pdf_count}: {file}\n\n"
+            # Append the summary number and file name as a heading
+            all_summaries_text += f"### Summary {pdf_count}: {file}\n\n"
 
-                    # Extract text content from the PDF
-                    with open(pdf_path, "rb") as pdf_file:
-                        reader = PdfReader(pdf_file)
-                        for page in reader.pages:
-                            extracted_text = page.extract_text()
-                            if extracted_text:
-                                all_summaries_text += extracted_text + "\n\n"
+            for extracted_text in page_texts:
+                if extracted_text:
+                    all_summaries_text += extracted_text + "\n\n"
 
-                    all_summaries_text += "----------------------------\n\n"
+            all_summaries_text += "----------------------------\n\n"
 
-                    # If the maximum number of PDFs per file is reached, save and start a new file
-                    if pdf_count % self.max_pdfs_per_file == 0:
-                        text_file_name = f"aggregate{file_index}.txt"
-                        text_file_path = os.path.join(self.states_of_art_path, text_file_name)
+            # If the maximum number of PDFs per file is reached, start a new aggregate
+            if pdf_count % max_pdfs_per_file == 0:
+                yield all_summaries_text
+                all_summaries_text = ""
 
-                        with open(text_file_path, "w", encoding="utf-8") as text_file:
-                            text_file.write(all_summaries_text)
+        # Remaining summaries, if any content is left
+        if all_summaries_text.strip():
+            yield all_summaries_text
 
-                        all_summaries_text = ""
-                        file_index += 1
+    @traced()
+    def aggregate_summaries(self):
+        """
+        Aggregates the extracted text from all summary PDF files into structured text files,
+        ensuring summaries are grouped into multiple text files when exceeding a predefined limit.
 
-        # Save the remaining summaries if any content remains unsaved
-        if all_summaries_text.strip():
+        Saves the aggregated summaries in the designated output directory.
+
+        """
+        file_index = 0
+
+        for file_index, all_summaries_text in enumerate(
+                self.build_aggregates(self.iter_summaries(), self.max_pdfs_per_file), start=1):
             text_file_name = f"aggregate{file_index}.txt"
             text_file_path = os.path.join(self.states_of_art_path, text_file_name)
 
             with open(text_file_path, "w", encoding="utf-8") as text_file:
                 text_file.write(all_summaries_text)
 
-        if pdf_count == 0:
+        if file_index == 0:
             print("No summary content found in the PDF files.")
 
+    @staticmethod
+    def extract_paper_titles(all_summaries_text):
+        """
+        Extracts the paper titles from the "### Summary N: title" headings of an aggregate.
+
+        Args:
+            all_summaries_text (str): Content of an aggregate text file.
+
+        Returns:
+            list: The paper titles, in order.
+        """
+        paper_titles = []
+        for line in all_summaries_text.split("\n"):
+            if line.startswith("### Summary "):
+                title = line.split(": ", 1)[-1].strip()
+                paper_titles.append(title)
+        return paper_titles
+
+    @traced()
     def summarize_aggregates(self):
         """
         Processes aggregated text summaries, generates a structured scientific survey
@@ -127,11 +212,7 @@ class Agentic_Aggregation:
                     continue
 
                 # Extracts paper titles and counts the actual number of summarized papers
-                paper_titles = []
-                for line in all_summaries_text.split("\n"):
-                    if line.startswith("### Summary "):
-                        title = line.split(": ", 1)[-1].strip()
-                        paper_titles.append(title)
+                paper_titles = self.extract_paper_titles(all_summaries_text)
 
                 total_papers = len(paper_titles)
 
@@ -227,17 +308,7 @@ class Agentic_Aggregation:
                 ]
 
                 try:
-                    completion = self.client.chat.completions.create(
-                        model=self.deployment_name,
-                        messages=prompt,
-                        max_tokens=self.max_tokens,
-                        temperature=self.temperature,
-                        top_p=self.top_p,
-                        frequency_penalty=self.frequency_penalty,
-                        presence_penalty=self.presence_penalty,
-                        stop=None,
-                        stream=False
-                    )
+                    completion = self.create_completion(prompt, stage="summarize_aggregates")
 
                     summarized_aggregate = completion.choices[0].message.content.strip()
 
@@ -248,9 +319,12 @@ class Agentic_Aggregation:
                     with open(summary_file_path, "w", encoding="utf-8") as summary_file:
                         summary_file.write(summarized_aggregate)
 
+                except BudgetExceededError:
+                    raise
                 except Exception as e:
                     print(f"Error generating the summarized aggregate: {e}")
 
+    @traced()
     def aggregate_aggregates(self):
         """
         Aggregates all summarized scientific surveys into a final consolidated summary.
@@ -284,6 +358,7 @@ class Agentic_Aggregation:
 
         return final_aggregate
 
+    @traced()
     def summarize_final_aggregate(self, final_aggregate):
         """
         Generates a structured state-of-the-art survey from the final aggregated summaries.
@@ -383,17 +458,7 @@ class Agentic_Aggregation:
         ]
 
         try:
-            completion = self.client.chat.completions.create(
-                model=self.deployment_name,
-                messages=prompt,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                top_p=self.top_p,
-                frequency_penalty=self.frequency_penalty,
-                presence_penalty=self.presence_penalty,
-                stop=None,
-                stream=False
-            )
+            completion = self.create_completion(prompt, stage="summarize_final_aggregate")
 
             state_of_the_art = completion.choices[0].message.content.strip()
             print("\nState-of-the-art summary generated successfully.\n")
@@ -406,12 +471,16 @@ class Agentic_Aggregation:
 
             return state_of_the_art
 
+        except BudgetExceededError:
+            raise
         except Exception as e:
             print(f"Error generating state-of-the-art summary: {e}")
 
+    @traced()
     def convert_txt_to_latex(self, txt_input):
         """
-        Converts a structured plain text input into a fully formatted and compilable LaTeX document.
+        Converts a structured plain text input into a fully formatted and compilable LaTeX document,
+        locally with `markdown_to_latex` or with the LLM (see `latex_conversion`).
 
         Args:
             txt_input (str): Either the path to a text file or a string containing structured text.
@@ -429,6 +498,16 @@ class Agentic_Aggregation:
         else:
             txt_content = txt_input
 
+        if self.latex_conversion in ("local", "auto"):
+            with span("markdown_to_latex"):
+                latex_output, unsupported = markdown_to_latex(txt_content)
+            if not unsupported or self.latex_conversion == "local":
+                with open(tex_file_path, "w", encoding="utf-8") as tex_file:
+                    tex_file.write(latex_output)
+                return tex_file_path
+            print(f"Unsupported constructs for the local LaTeX conversion ({', '.join(unsupported)}), "
+                  f"falling back to the LLM.")
+
         prompt = [
             {
                 "role": "system",
@@ -539,17 +618,7 @@ class Agentic_Aggregation:
         ]
 
         try:
-            completion = self.client.chat.completions.create(
-                model=self.deployment_name,
-                messages=prompt,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                top_p=self.top_p,
-                frequency_penalty=self.frequency_penalty,
-                presence_penalty=self.presence_penalty,
-                stop=None,
-                stream=False
-            )
+            completion = self.create_completion(prompt, stage="convert_txt_to_latex")
 
             latex_output = completion.choices[0].message.content.strip()
 
@@ -558,13 +627,17 @@ class Agentic_Aggregation:
 
             return tex_file_path
 
+        except BudgetExceededError:
+            raise
         except Exception as e:
             print(f"Error during LaTeX generation: {e}")
 
+    @traced()
     def convert_latex_to_pdf(self):
         """
         Converts the LaTeX file in the 'state_of_the_art' directory into a PDF.
-        The generated PDF is saved in the same directory as 'state_of_the_art.pdf'.
+        The generated PDF is saved in the same directory as 'state_of_the_art.pdf'; the build uses the
+        persistent tectonic cache and is skipped when the LaTeX sources are unchanged.
 
         Returns:
             str: The path to the generated PDF file, or None if the conversion fails.
@@ -577,7 +650,7 @@ class Agentic_Aggregation:
 
         try:
             # Run the Tectonic compiler to generate the PDF
-            subprocess.run(["tectonic", tex_file_path, "--outdir", self.states_of_art_path], check=True)
+            build_pdf(tex_file_path, self.states_of_art_path, self.tectonic_cache_path)
 
             # Validate if the PDF file was successfully generated
             if os.path.exists(pdf_file_path):
@@ -588,6 +661,7 @@ class Agentic_Aggregation:
         except subprocess.CalledProcessError as e:
             print(f"Error during LaTeX to PDF conversion: {e}")
 
+    @traced()
     def summarize_summaries(self):
         """
         Executes the full summarization pipeline:
@@ -4,16 +4,24 @@ import os
 from fpdf import FPDF
 import unicodedata
 import re
+import time
+from observability.metrics import REGISTRY, observe_llm_call
+from observability.profiling import memory_checkpoint
+from observability.tracing import annotate_usage, current_span, span, traced
+from agentic_summary.job_ledger import EmptySummaryError
+from agentic_summary.usage_ledger import BudgetExceededError, track_usage, usage_context
+from scraper.spider.pdf_store import STORE_DIR, PdfStore
 
 
 class Agentic_Summarization:
     def __init__(self, input_path, output_path, deployment_name, client, pdf_dpi, image_quality,
-                 max_tokens, temperature, top_p, frequency_penalty, presence_penalty):
+                 max_tokens, temperature, top_p, frequency_penalty, presence_penalty, triage=None, job_ledger=None,
+                 catalog=None):
         """
         Initializes the PDFProcessor with required parameters.
 
         Args:
-            input_path (str): Path to the directory containing year-based folders with PDFs.
+            input_path (str): Path to the scraper output (PDF store, or year-based folders with PDFs).
             output_path (str): Path to the directory where processed summaries will be saved.
             deployment_name (str): Azure OpenAI deployment name for API access.
             client (AzureOpenAI): Instance of the OpenAI client for API communication.
@@ -24,6 +32,10 @@ class Agentic_Summarization:
             top_p (float): Probability threshold for nucleus sampling, influencing response diversity.
             frequency_penalty (float): Reduces the likelihood of repeating words or phrases.
             presence_penalty (float): Encourages introducing new concepts in responses.
+            triage (PaperTriage): Relevance triage selecting the papers worth summarizing (all of them when None).
+            job_ledger (JobLedger): Ledger recording the status of every paper and handing out claims.
+            catalog (PaperCatalog): Scraper catalog indexing the downloaded PDFs; the year folders of
+                `input_path` are listed when None.
         """
         self.input_path = input_path
         self.output_path = output_path
@@ -36,8 +48,22 @@ class Agentic_Summarization:
         self.top_p = top_p
         self.frequency_penalty = frequency_penalty
         self.presence_penalty = presence_penalty
+        self.triage = triage
+        self.job_ledger = job_ledger
+        self.catalog = catalog
+        self.pdf_store = PdfStore(os.path.join(input_path, STORE_DIR)) if catalog is not None else None
 
-    def convert_pdf_to_encoded_images(self, pdf_path, year_folder):
+    def summary_dir(self, year_folder, venue=None):
+        """
+        Output directory of a paper's summary: `{year}`, or `{year}/{venue}` for the papers read from
+        the catalog, whose view names are only unique within their venue.
+        """
+        if venue:
+            return os.path.join(self.output_path, year_folder, venue)
+        return os.path.join(self.output_path, year_folder)
+
+    @traced()
+    def convert_pdf_to_encoded_images(self, pdf_path, year_folder, venue=None):
         """
         Converts a PDF file into images (one per page), saves them in the specified directory,
         and encodes them into Base64 format for further processing.
@@ -45,6 +71,7 @@ class Agentic_Summarization:
         Args:
             pdf_path (str): Path to the input PDF file.
             year_folder (str): Subfolder (e.g., year) within the output directory.
+            venue (str): Venue subfolder within the year, for the papers read from the catalog.
 
         Returns:
             tuple:
@@ -57,40 +84,44 @@ class Agentic_Summarization:
         os.makedirs(self.output_path, exist_ok=True)
 
         # Convert the PDF into a list of images (one per page), with the specified DPI
-        images = convert_from_path(pdf_path, dpi=self.pdf_dpi)
+        with span("rasterize", dpi=self.pdf_dpi):
+            images = convert_from_path(pdf_path, dpi=self.pdf_dpi)
 
-        output_year_path = os.path.join(self.output_path, year_folder)
+        output_year_path = self.summary_dir(year_folder, venue)
         os.makedirs(output_year_path, exist_ok=True)
 
         encoded_images = []
 
-        # Process each page of the PDF
-        for page_num, img in enumerate(images, start=1):
-            # Construct the output filename for the image, including page number
-            output_image_filename = f"{pdf_filename}_page_{page_num}.png"
-            image_path = os.path.join(output_year_path, output_image_filename)
+        with span("encode_images", pages=len(images)):
+            # Process each page of the PDF
+            for page_num, img in enumerate(images, start=1):
+                # Construct the output filename for the image, including page number
+                output_image_filename = f"{pdf_filename}_page_{page_num}.png"
+                image_path = os.path.join(output_year_path, output_image_filename)
 
-            img.save(image_path, format="PNG", quality=self.image_quality)
+                img.save(image_path, format="PNG", quality=self.image_quality)
 
-            # Encode the saved image in Base64 format
-            with open(image_path, "rb") as img_file:
-                encoded_string = base64.b64encode(img_file.read()).decode("utf-8")
+                # Encode the saved image in Base64 format
+                with open(image_path, "rb") as img_file:
+                    encoded_string = base64.b64encode(img_file.read()).decode("utf-8")
 
-                # Append the encoded image as a dictionary, formatted for further use
-                encoded_images.append({
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{encoded_string}"}
-                })
+                    # Append the encoded image as a dictionary, formatted for further use
+                    encoded_images.append({
+                        "type": "image_url",
+                        "image_url": {"url": f"data:image/png;base64,{encoded_string}"}
+                    })
 
         return encoded_images, output_year_path, pdf_filename
 
-    def generate_summary(self, encoded_images, pdf_filename):
+    @traced()
+    def generate_summary(self, encoded_images, pdf_filename, year=None):
         """
         Generates a structured summary of a scientific paper using Azure OpenAI GPT model.
 
         Args:
             encoded_images (list): List of dictionaries containing encoded images in Base64.
             pdf_filename (str): Name of the PDF file to be summarized.
+            year (str): Year folder of the paper, used as metrics label.
 
         Returns:
             str: The generated summary of the paper.
@@ -148,23 +179,32 @@ class Agentic_Summarization:
         ]
 
         try:
-            completion = self.client.chat.completions.create(
-                model=self.deployment_name,
-                messages=chat_prompt,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                top_p=self.top_p,
-                frequency_penalty=self.frequency_penalty,
-                presence_penalty=self.presence_penalty,
-                stop=None,
-                stream=False
-            )
-
-            output_text = completion.choices[0].message.content.strip()
+            with span("llm_request", stage="summarize", model=self.deployment_name) as request_span, \
+                    usage_context(stage="summarize"):
+                start = time.perf_counter()
+                completion = self.client.chat.completions.create(
+                    model=self.deployment_name,
+                    messages=chat_prompt,
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature,
+                    top_p=self.top_p,
+                    frequency_penalty=self.frequency_penalty,
+                    presence_penalty=self.presence_penalty,
+                    stop=None,
+                    stream=False
+                )
+                observe_llm_call(completion, time.perf_counter() - start, stage="summarize", year=year)
+                annotate_usage(request_span, completion)
+
+            output_text = (completion.choices[0].message.content or "").strip()
+            if not output_text:
+                raise EmptySummaryError(f"No summary returned for {pdf_filename} "
+                                        f"(finish reason: {completion.choices[0].finish_reason}).")
             return output_text
 
         except Exception as e:
             print(f"Error generating summary: {e}")
+            raise
 
     @staticmethod
     def format_text(pdf, line):
@@ -207,6 +247,7 @@ class Agentic_Summarization:
         # Write formatted text to PDF, ensuring encoding compatibility
         pdf.multi_cell(0, 10, line.encode('latin-1', 'replace').decode('latin-1'))
 
+    @traced()
     def convert_text_to_pdf(self, summary_text, pdf_file_name, output_dir):
         """
         Converts a structured text summary into a formatted PDF file.
@@ -234,6 +275,7 @@ class Agentic_Summarization:
 
         pdf.output(pdf_output_path)
         print(f"Summary saved: '{pdf_output_path}'")
+        return pdf_output_path
 
     @staticmethod
     def remove_temp_images(pdf_file, output_year_path, encoded_images):
@@ -258,45 +300,208 @@ class Agentic_Summarization:
             if os.path.exists(image_path):
                 os.remove(image_path)
 
-    def process_pdfs_by_year(self, selected_years):
+    @traced()
+    def process_pdf(self, pdf_path, year_folder, venue=None):
+        """
+        Summarizes a single PDF: converts it to images, generates the summary, saves it as a PDF
+        and removes the temporary images.
+
+        Args:
+            pdf_path (str): Path to the input PDF file.
+            year_folder (str): Year subfolder of the PDF.
+            venue (str): Venue of the PDF, for the papers read from the catalog.
+
+        Returns:
+            str: The path to the summary PDF.
+        """
+        pdf_file = os.path.basename(pdf_path)
+        current_span().set_attribute("paper", pdf_file)
+        with usage_context(paper=pdf_file, year=year_folder):
+            summary_path = self._process_pdf(pdf_path, pdf_file, year_folder, venue)
+        memory_checkpoint(f"{year_folder}: {pdf_file}")
+        return summary_path
+
+    def _process_pdf(self, pdf_path, pdf_file, year_folder, venue=None):
+        # Convert the PDF to Base64-encoded images
+        with REGISTRY.histogram("rasterize_seconds", "PDF to image conversion time").time(
+                year=year_folder, stage="rasterize"):
+            encoded_images, output_year_path, pdf_filename = self.convert_pdf_to_encoded_images(pdf_path, year_folder,
+                                                                                                venue)
+        REGISTRY.counter("pages_rasterized_total", "PDF pages converted to images").inc(
+            len(encoded_images), year=year_folder, stage="rasterize")
+
+        try:
+            # Generate a structured summary from the encoded images
+            output_summary = self.generate_summary(encoded_images, pdf_filename, year=year_folder)
+            REGISTRY.counter("papers_summarized_total", "Papers summarized").inc(
+                year=year_folder, stage="summarize")
+
+            # Save the generated summary as a PDF file
+            return self.convert_text_to_pdf(output_summary, pdf_file.replace('.pdf', ''), output_year_path)
+        finally:
+            # Remove temporary images used during the process
+            self.remove_temp_images(pdf_file, output_year_path, encoded_images)
+
+    def run_job(self, pdf_path, year_folder, pdf_hash=None, venue=None):
         """
-        Processes all PDF files within year-based subfolders inside the input directory.
+        Summarizes a PDF as a job of the job ledger: claims it, records the outcome with its timings and
+        token usage, and lets the run go on when the paper fails (it is retried on a later run until it
+        runs out of attempts).
+
+        Args:
+            pdf_path (str): Path to the input PDF file.
+            year_folder (str): Year subfolder of the PDF.
+            pdf_hash (str): SHA-256 of the PDF when already known (from the catalog).
+            venue (str): Venue of the PDF, for the papers read from the catalog.
+        """
+        pdf_file = os.path.basename(pdf_path)
+        if self.job_ledger is None:
+            try:
+                self.process_pdf(pdf_path, year_folder, venue)
+            except BudgetExceededError:
+                raise
+            except Exception as e:
+                print(f"Error summarizing {pdf_file}: {type(e).__name__}: {e}")
+            return
+
+        pdf_hash = pdf_hash or self.job_ledger.pdf_hash(pdf_path)
+        if not self.job_ledger.claim(pdf_hash, pdf_path, year_folder):
+            job = self.job_ledger.status(pdf_hash)
+            # A summary deleted since the job completed is generated again
+            if job["status"] != "done" or (job["summary_path"] and os.path.exists(job["summary_path"])):
+                print(f"Skipping {pdf_file}: job {job['status']}"
+                      + (f" ({job['error_class']})." if job["error_class"] else "."))
+                return
+            self.job_ledger.retry(pdf_hash)
+            if not self.job_ledger.claim(pdf_hash, pdf_path, year_folder):
+                return
+
+        with track_usage() as usage:
+            try:
+                summary_path = self.process_pdf(pdf_path, year_folder, venue)
+            except (BudgetExceededError, KeyboardInterrupt):
+                self.job_ledger.release(pdf_hash)
+                raise
+            except Exception as e:
+                status = self.job_ledger.fail(pdf_hash, e, usage["prompt_tokens"], usage["completion_tokens"])
+                REGISTRY.counter("papers_failed_total", "Papers whose summarization failed").inc(
+                    year=year_folder, stage="summarize")
+                print(f"Error summarizing {pdf_file} ({type(e).__name__}: {e}), job {status}.")
+                return
+        self.job_ledger.complete(pdf_hash, summary_path, usage["prompt_tokens"], usage["completion_tokens"])
+
+    def pdf_files_by_year(self, selected_years):
+        """
+        Lists the PDFs to summarize, grouped by year.
+
+        With a catalog, the PDFs are the downloaded papers of its index, read through their
+        `{venue}/{year}` views (views missing from the input directory are linked again from the
+        store, and a PDF downloaded for several venues is summarized once under the first one),
+        plus the PDFs of the year-based subfolders that the catalog has no record of (downloaded
+        before it existed). Without one, only the year-based subfolders of the input directory are listed.
 
         Args:
             selected_years (list): List of years to process.
+
+        Returns:
+            dict: Lists of (PDF path, SHA-256 or None, venue or None) tuples, by year folder.
+        """
+        pdfs_by_year = {}
+        if self.catalog is not None:
+            seen = set()
+            for paper in self.catalog.papers(year=selected_years, downloaded_only=True):
+                pdf_hash = paper["sha256"]
+                if pdf_hash in seen:
+                    continue
+                # Recorded paths are relative to the spider's working directory, resolve them under the input path
+                pdf_file = os.path.basename(paper["pdf_path"] or "")
+                if pdf_hash is None:
+                    # Downloaded before the PDF store: flat `{year}/{title}.pdf` layout
+                    pdf_path = os.path.join(self.input_path, str(paper["year"]), pdf_file)
+                else:
+                    seen.add(pdf_hash)
+                    view_dir = os.path.join(self.input_path, paper["venue"], str(paper["year"]))
+                    pdf_path = os.path.join(view_dir, pdf_file)
+                    if not os.path.exists(pdf_path) and self.pdf_store.has(pdf_hash):
+                        pdf_path = self.pdf_store.link_view(pdf_hash, view_dir, os.path.splitext(pdf_file)[0])
+                if not pdf_file or not os.path.exists(pdf_path):
+                    print(f"PDF of '{paper['title']}' ({paper['venue']} {paper['year']}) not found - Skipping.")
+                    continue
+                pdfs_by_year.setdefault(str(paper["year"]), []).append((pdf_path, pdf_hash, paper["venue"]))
+
+            # Flat PDFs downloaded before the catalog existed have no record but are still summarized
+            listed = {os.path.abspath(pdf[0]) for pdfs in pdfs_by_year.values() for pdf in pdfs}
+            for year_folder, pdfs in self.year_folder_pdfs(selected_years, verbose=False).items():
+                unlisted = [pdf for pdf in pdfs if os.path.abspath(pdf[0]) not in listed]
+                if unlisted:
+                    pdfs_by_year.setdefault(year_folder, []).extend(unlisted)
+            return pdfs_by_year
+        return self.year_folder_pdfs(selected_years)
+
+    def year_folder_pdfs(self, selected_years, verbose=True):
         """
+        Lists the PDFs of the year-based subfolders of the input directory (`{year}/{title}.pdf`).
+
+        Returns:
+            dict: Lists of (PDF path, None, None) tuples, by year folder.
+        """
+        pdfs_by_year = {}
         # Iterate through year-based subdirectories in the input path
         for year_folder in os.listdir(self.input_path):
             if not year_folder.isdigit() or int(year_folder) not in selected_years:
-                print(f"Skipping year: {year_folder}")
+                if verbose:
+                    print(f"Skipping year: {year_folder}")
                 continue
 
             year_path = os.path.join(self.input_path, year_folder)
 
             # Ensure the directory is valid before processing
-            if os.path.isdir(year_path):
-                for pdf_file in os.listdir(year_path):
-                    if pdf_file.lower().endswith(".pdf"):
-                        pdf_path = os.path.join(year_path, pdf_file)
-
-                        summary_filename = pdf_file.replace('.pdf', '_summary.pdf')
-                        output_year_path = os.path.join(self.output_path, year_folder)
-                        summary_path = os.path.join(output_year_path, summary_filename)
-
-                        # Skip processing if a summary already exists
-                        if os.path.exists(summary_path):
-                            print(f"Summary already exists for: {pdf_file} - Skipping.")
-                            continue
-
-                        # Convert the PDF to Base64-encoded images
-                        encoded_images, output_year_path, pdf_filename = self.convert_pdf_to_encoded_images(pdf_path,
-                                                                                                            year_folder)
+            if not os.path.isdir(year_path):
+                continue
 
-                        # Generate a structured summary from the encoded images
-                        output_summary = self.generate_summary(encoded_images, pdf_filename)
+            pdfs_by_year[year_folder] = [(os.path.join(year_path, f), None, None) for f in os.listdir(year_path)
+                                         if f.lower().endswith(".pdf")]
+        return pdfs_by_year
 
-                        # Save the generated summary as a PDF file
-                        self.convert_text_to_pdf(output_summary, pdf_file.replace('.pdf', ''), output_year_path)
+    def process_pdfs_by_year(self, selected_years):
+        """
+        Processes the PDFs of the selected years, from the catalog's index or the year-based subfolders
+        of the input directory.
 
-                        # Remove temporary images used during the process
-                        self.remove_temp_images(pdf_file, output_year_path, encoded_images)
+        Args:
+            selected_years (list): List of years to process.
+        """
+        for year_folder, pdfs in self.pdf_files_by_year(selected_years).items():
+            with span("summarize_year", year=int(year_folder)):
+                # Only the papers relevant to the user's topics are worth the vision summarization
+                if self.triage is not None:
+                    try:
+                        # Papers are triaged under their venue, where their file names are unique
+                        keys = [os.path.join(venue or "", os.path.basename(pdf_path)) for pdf_path, _, venue in pdfs]
+                        kept = set(self.triage.select(year_folder, [pdf[0] for pdf in pdfs], self.output_path,
+                                                      keys=keys))
+                    except BudgetExceededError as e:
+                        print(f"Stopping summarization: {e}")
+                        return
+                    pdfs = [pdf for pdf in pdfs if pdf[0] in kept]
+
+                pending = REGISTRY.gauge("papers_pending", "PDFs left to process in the current year")
+                pending.set(len(pdfs), year=year_folder, stage="summarize")
+                for pdf_path, pdf_hash, venue in pdfs:
+                    pdf_file = os.path.basename(pdf_path)
+
+                    summary_filename = pdf_file.replace('.pdf', '_summary.pdf')
+                    summary_path = os.path.join(self.summary_dir(year_folder, venue), summary_filename)
+
+                    pending.dec(year=year_folder, stage="summarize")
+
+                    # Skip processing if a summary already exists
+                    if os.path.exists(summary_path):
+                        print(f"Summary already exists for: {pdf_file} - Skipping.")
+                        continue
+
+                    try:
+                        self.run_job(pdf_path, year_folder, pdf_hash, venue)
+                    except BudgetExceededError as e:
+                        print(f"Stopping summarization: {e}")
+                        return
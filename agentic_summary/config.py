@@ -9,13 +9,45 @@ API_KEY = os.getenv("API_KEY")
 AZURE_ENDPOINT = os.getenv("AZURE_ENDPOINT")
 DEPLOYMENT_NAME = os.getenv("DEPLOYMENT_NAME")
 API_VERSION = os.getenv("API_VERSION")
+# Small, fast deployment for the high-volume stages (the main deployment when unset)
+FAST_DEPLOYMENT_NAME = os.getenv("FAST_DEPLOYMENT_NAME") or DEPLOYMENT_NAME
+
+# Quotas of each deployment, used to pace requests (0 for no limit)
+TOKENS_PER_MINUTE = int(os.getenv("TOKENS_PER_MINUTE", 0))
+REQUESTS_PER_MINUTE = int(os.getenv("REQUESTS_PER_MINUTE", 0))
+
+# Price of each deployment in USD per 1K tokens: (prompt, completion)
+MODEL_PRICES = {
+    FAST_DEPLOYMENT_NAME: (float(os.getenv("FAST_PROMPT_PRICE_PER_1K", 0.00015)),
+                           float(os.getenv("FAST_COMPLETION_PRICE_PER_1K", 0.0006))),
+    DEPLOYMENT_NAME: (float(os.getenv("PROMPT_PRICE_PER_1K", 0.0025)),
+                      float(os.getenv("COMPLETION_PRICE_PER_1K", 0.01)))
+}
+# Per-run budgets (0 for no limit) and what happens when one is exceeded:
+# "stop" refuses further LLM calls, "downgrade" sends low-detail images and caps completions
+RUN_TOKEN_BUDGET = int(os.getenv("RUN_TOKEN_BUDGET", 0))
+RUN_COST_BUDGET = float(os.getenv("RUN_COST_BUDGET", 0))
+BUDGET_POLICY = os.getenv("BUDGET_POLICY", "stop")
+DOWNGRADE_MAX_TOKENS = 2000
 
 # Project's root directory
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
 # Paths to input and output directories
 INPUT_PATH = os.path.join(PROJECT_ROOT, "scraper", "output")
+# Scraper catalog, the index of the downloaded PDFs (the year folders of INPUT_PATH are listed without it)
+CATALOG_PATH = os.path.join(INPUT_PATH, "catalog.db")
 OUTPUT_PATH = os.path.join(PROJECT_ROOT, "agentic_summary", "output")
+METRICS_PATH = os.path.join(OUTPUT_PATH, "metrics")
+TRACES_PATH = os.path.join(OUTPUT_PATH, "traces")
+PROFILES_PATH = os.path.join(OUTPUT_PATH, "profiles")
+# SQLite ledger of every LLM call (tokens, latency, cost per paper and stage)
+USAGE_LEDGER_PATH = os.path.join(OUTPUT_PATH, "usage.db")
+# Per-paper summarization jobs; a paper failing JOB_MAX_ATTEMPTS runs in a row is no longer retried
+JOB_LEDGER_PATH = os.path.join(OUTPUT_PATH, "jobs.db")
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+# Persistent tectonic cache, pre-seeded with `python -m agentic_summary.latex_build --warm` for offline builds
+TECTONIC_CACHE_PATH = os.getenv("TECTONIC_CACHE_DIR") or os.path.join(PROJECT_ROOT, "agentic_summary", "tectonic_cache")
 
 # Additional configuration settings for PDF processing and AI model parameters
 PDF_DPI = 300
@@ -28,5 +60,39 @@ TOP_P = 0.95
 FREQUENCY_PENALTY = 0
 PRESENCE_PENALTY = 0
 
+# Per-stage routing of LLM calls: deployment and generation parameters overriding the defaults above
+# (parameters set to None keep the caller's value, e.g. MAX_TOKENS unless a *_MAX_TOKENS variable is set).
+# A stage can also be served by a local OpenAI-compatible server with its own quotas, e.g.
+# {"deployment": "llama3.1", "endpoint": "http://localhost:11434/v1", "api_key": "local", "tokens_per_minute": 0}
+STAGE_ROUTES = {
+    "extract_topics": {"deployment": FAST_DEPLOYMENT_NAME,
+                       "max_tokens": int(os.getenv("EXTRACT_TOPICS_MAX_TOKENS", 0)) or None},
+    "augment_keywords": {"deployment": FAST_DEPLOYMENT_NAME,
+                         "max_tokens": int(os.getenv("AUGMENT_KEYWORDS_MAX_TOKENS", 0)) or None},
+    "triage": {"deployment": FAST_DEPLOYMENT_NAME},
+    "summarize": {"deployment": FAST_DEPLOYMENT_NAME, "max_tokens": int(os.getenv("SUMMARIZE_MAX_TOKENS", 0)) or None},
+    "summarize_aggregates": {"deployment": FAST_DEPLOYMENT_NAME},
+    "convert_txt_to_latex": {"deployment": FAST_DEPLOYMENT_NAME},
+    # The final survey is the only stage reserved for the strong model
+    "summarize_final_aggregate": {"deployment": DEPLOYMENT_NAME},
+}
+
+# Relevance triage before summarization: "ranker" (offline BM25) or "llm" (cheap text request per paper).
+# Papers scoring below the threshold (0 to 1) or outside the top-K of their year (0 for no limit) are skipped.
+# Ranker scores are the mean over topics of the abstract's BM25 score against the topic matched against
+# itself (capped at 1): one mention of a synonym of every topic scores about 0.5, whatever the other papers
+TRIAGE_METHOD = os.getenv("TRIAGE_METHOD", "ranker")
+TRIAGE_THRESHOLD = float(os.getenv("TRIAGE_THRESHOLD", 0.2))
+TRIAGE_TOP_K = int(os.getenv("TRIAGE_TOP_K", 0))
+
+# Text extraction of the summary PDFs during aggregation: "pdfium", "pdfminer" or "pypdf2",
+# run in EXTRACTION_WORKERS processes (0 for one per CPU)
+EXTRACTION_BACKEND = os.getenv("EXTRACTION_BACKEND", "pdfium")
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", 0))
+
+# Conversion of the survey to LaTeX: "local" (deterministic converter), "auto" (local, falling back to the
+# LLM for constructs it cannot convert, such as raw HTML or images) or "llm"
+LATEX_CONVERSION = os.getenv("LATEX_CONVERSION", "local")
+
 # PDF batching limit
 MAX_PDFS_PER_FILE = 50
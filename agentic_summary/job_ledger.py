@@ -0,0 +1,246 @@
+"""
+Job ledger of the per-paper summarization: one SQLite row per PDF, keyed by its content hash, with
+its status, attempts, last error, timings and token usage.
+- Workers claim a paper atomically before summarizing it, so parallel runs never process the same PDF.
+- Failed papers are retried on the next runs until `max_attempts`; permanent errors (unreadable PDF,
+  request rejected by the API) and papers out of attempts are marked "poisoned" and skipped.
+
+Report and retries:
+    python -m agentic_summary.job_ledger [--status failed|poisoned|...] [--retry HASH_PREFIX | --retry-poisoned]
+"""
+
+import argparse
+import os
+import socket
+import sqlite3
+import threading
+import time
+from scraper.spider.pdf_store import file_sha256
+
+JOB_STATUSES = ("pending", "running", "done", "failed", "poisoned")
+# Errors that will not go away by retrying the same PDF
+PERMANENT_ERRORS = ("BadRequestError", "PDFPageCountError", "PDFSyntaxError", "PdfReadError")
+
+
+class EmptySummaryError(Exception):
+    """
+    Raised when the model returned no summary for a paper.
+    """
+
+
+class JobLedger:
+    def __init__(self, db_path, max_attempts=3, stale_after=3600, worker=None):
+        """
+        Opens (or creates) the job ledger.
+
+        Args:
+            db_path (str): Path of the SQLite database.
+            max_attempts (int): Attempts before a failing paper is poisoned.
+            stale_after (float): Seconds after which a "running" job is considered abandoned
+                (crashed worker) and can be claimed again.
+            worker (str): Name of this worker (host and PID by default).
+        """
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.stale_after = stale_after
+        self.worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # Autocommit mode: claims open their own IMMEDIATE transactions
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS summary_jobs (
+                pdf_hash TEXT PRIMARY KEY,
+                paper TEXT NOT NULL,
+                year TEXT,
+                pdf_path TEXT,
+                size INTEGER,
+                mtime_ns INTEGER,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                error_class TEXT,
+                error TEXT,
+                claimed_at REAL,
+                finished_at REAL,
+                duration REAL,
+                prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                completion_tokens INTEGER NOT NULL DEFAULT 0,
+                summary_path TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS summary_jobs_path ON summary_jobs (pdf_path)")
+
+    def pdf_hash(self, pdf_path):
+        """
+        Returns the SHA-256 of a PDF, reusing the recorded hash while its size and mtime are unchanged.
+        """
+        stat = os.stat(pdf_path)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT pdf_hash FROM summary_jobs WHERE pdf_path = ? AND size = ? AND mtime_ns = ?",
+                (pdf_path, stat.st_size, stat.st_mtime_ns)
+            ).fetchone()
+        return row["pdf_hash"] if row else file_sha256(pdf_path)
+
+    def claim(self, pdf_hash, pdf_path, year=None):
+        """
+        Atomically claims a paper for this worker.
+
+        Returns:
+            bool: True when the paper is new, pending, failed with attempts left, or abandoned by
+                a crashed worker with attempts left; False when it is done, poisoned or being
+                processed elsewhere.
+        """
+        stat = os.stat(pdf_path)
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute("""
+                    INSERT OR IGNORE INTO summary_jobs (pdf_hash, paper, year, pdf_path, size, mtime_ns)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (pdf_hash, os.path.basename(pdf_path), str(year) if year is not None else None, pdf_path,
+                      stat.st_size, stat.st_mtime_ns))
+                # A worker that died on this paper (OOM, segfault) never recorded its failure: once the
+                # paper has used all its attempts that way, it is poisoned instead of handed out again
+                self.conn.execute("""
+                    UPDATE summary_jobs
+                    SET status = 'poisoned', error_class = 'WorkerLost',
+                        error = 'The worker processing this paper stopped without recording an outcome.',
+                        finished_at = ?
+                    WHERE pdf_hash = ? AND status = 'running' AND claimed_at < ? AND attempts >= ?
+                """, (now, pdf_hash, now - self.stale_after, self.max_attempts))
+                claimed = self.conn.execute("""
+                    UPDATE summary_jobs
+                    SET status = 'running', attempts = attempts + 1, worker = ?, claimed_at = ?,
+                        paper = ?, year = ?, pdf_path = ?, size = ?, mtime_ns = ?
+                    WHERE pdf_hash = ? AND attempts < ? AND (status IN ('pending', 'failed')
+                                                             OR status = 'running' AND claimed_at < ?)
+                """, (self.worker, now, os.path.basename(pdf_path), str(year) if year is not None else None,
+                      pdf_path, stat.st_size, stat.st_mtime_ns, pdf_hash, self.max_attempts,
+                      now - self.stale_after)).rowcount == 1
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return claimed
+
+    def complete(self, pdf_hash, summary_path, prompt_tokens=0, completion_tokens=0):
+        now = time.time()
+        with self._lock:
+            self.conn.execute("""
+                UPDATE summary_jobs
+                SET status = 'done', error_class = NULL, error = NULL, finished_at = ?, duration = ? - claimed_at,
+                    prompt_tokens = prompt_tokens + ?, completion_tokens = completion_tokens + ?, summary_path = ?
+                WHERE pdf_hash = ?
+            """, (now, now, prompt_tokens, completion_tokens, summary_path, pdf_hash))
+
+    def fail(self, pdf_hash, error, prompt_tokens=0, completion_tokens=0):
+        """
+        Records a failed attempt.
+
+        Returns:
+            str: The new status, "failed" (retried on a later run) or "poisoned".
+        """
+        now = time.time()
+        error_class = type(error).__name__
+        with self._lock:
+            self.conn.execute("""
+                UPDATE summary_jobs
+                SET status = CASE WHEN ? OR attempts >= ? THEN 'poisoned' ELSE 'failed' END,
+                    error_class = ?, error = ?, finished_at = ?, duration = ? - claimed_at,
+                    prompt_tokens = prompt_tokens + ?, completion_tokens = completion_tokens + ?
+                WHERE pdf_hash = ?
+            """, (error_class in PERMANENT_ERRORS, self.max_attempts, error_class, str(error)[:2000], now, now,
+                  prompt_tokens, completion_tokens, pdf_hash))
+            row = self.conn.execute("SELECT status FROM summary_jobs WHERE pdf_hash = ?", (pdf_hash,)).fetchone()
+        return row["status"] if row else None
+
+    def release(self, pdf_hash):
+        """
+        Gives a claimed paper back without counting the attempt (e.g. the run was stopped by its budget).
+        """
+        with self._lock:
+            self.conn.execute("""
+                UPDATE summary_jobs SET status = 'pending', attempts = MAX(attempts - 1, 0), worker = NULL
+                WHERE pdf_hash = ? AND status = 'running'
+            """, (pdf_hash,))
+
+    def status(self, pdf_hash):
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM summary_jobs WHERE pdf_hash = ?", (pdf_hash,)).fetchone()
+        return dict(row) if row else None
+
+    def jobs(self, status=None):
+        query = "SELECT * FROM summary_jobs"
+        params = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(query + " ORDER BY year DESC, paper", params)]
+
+    def retry(self, pdf_hash_prefix=None, status="poisoned"):
+        """
+        Makes papers claimable again with a fresh attempt count.
+
+        Returns:
+            int: Number of papers reset.
+        """
+        with self._lock:
+            if pdf_hash_prefix:
+                cursor = self.conn.execute(
+                    "UPDATE summary_jobs SET status = 'pending', attempts = 0 WHERE pdf_hash LIKE ?",
+                    (pdf_hash_prefix + "%",))
+            else:
+                cursor = self.conn.execute(
+                    "UPDATE summary_jobs SET status = 'pending', attempts = 0 WHERE status = ?", (status,))
+        return cursor.rowcount
+
+    def print_report(self, status=None):
+        with self._lock:
+            counts = self.conn.execute("""
+                SELECT status, COUNT(*) AS jobs, SUM(attempts) AS attempts, AVG(duration) AS duration,
+                       SUM(prompt_tokens) AS prompt_tokens, SUM(completion_tokens) AS completion_tokens
+                FROM summary_jobs GROUP BY status ORDER BY status
+            """).fetchall()
+        print(f"\n{'status':10} {'jobs':>7} {'attempts':>9} {'avg s':>8} {'prompt':>11} {'completion':>11}")
+        for row in counts:
+            print(f"{row['status']:10} {row['jobs']:7d} {row['attempts']:9d} {row['duration'] or 0:8.1f} "
+                  f"{row['prompt_tokens']:11d} {row['completion_tokens']:11d}")
+        if status:
+            for job in self.jobs(status):
+                print(f"\n{job['pdf_hash'][:12]} {job['year'] or '-'} {job['paper']} ({job['attempts']} attempts)")
+                if job["error_class"]:
+                    print(f"    {job['error_class']}: {job['error']}")
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    from agentic_summary.config import JOB_LEDGER_PATH
+
+    parser = argparse.ArgumentParser(description="Report and reset the summarization jobs.")
+    parser.add_argument("--db", default=JOB_LEDGER_PATH, help="Job ledger database.")
+    parser.add_argument("--status", choices=JOB_STATUSES, help="List the papers with this status.")
+    parser.add_argument("--retry", metavar="HASH_PREFIX", help="Make a paper claimable again.")
+    parser.add_argument("--retry-poisoned", action="store_true", help="Make every poisoned paper claimable again.")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"No job ledger at '{args.db}'.")
+        return
+    ledger = JobLedger(args.db)
+    if args.retry or args.retry_poisoned:
+        print(f"{ledger.retry(args.retry)} papers will be retried on the next run.")
+    ledger.print_report(args.status)
+    ledger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+LaTeX build of the state-of-the-art survey with tectonic:
+- A persistent tectonic cache (TECTONIC_CACHE_DIR), pre-seeded with every package used by the
+  generated documents, so builds run with `--only-cached` and work offline.
+- The build is skipped when the hash of the .tex and of the assets it references is unchanged and
+  the PDF is still there; compile times are recorded in the build stamp and the metrics.
+- Builds sharing the cache take a lock on it: offline builds only read it and share the lock,
+  builds that may download bundle files take it exclusively.
+
+Pre-seed the cache (e.g. while building an image):
+    python -m agentic_summary.latex_build --warm
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from observability.metrics import REGISTRY
+from agentic_summary.latex_converter import markdown_to_latex
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are not locked
+    fcntl = None
+
+STAMP_SUFFIX = ".build.json"
+SEED_MARKER = "seeded.json"
+ASSET_PATTERN = re.compile(r"\\(?:includegraphics(?:\[[^\]]*\])?|input|include|bibliography|addbibresource)"
+                           r"\{([^}]+)\}")
+ASSET_EXTENSIONS = ("", ".tex", ".png", ".jpg", ".jpeg", ".pdf", ".eps", ".bib")
+# Tectonic output of an offline build that needed a file missing from the cache
+CACHE_MISS_PATTERN = re.compile(r"only[- ]cached|not (?:available|found) in (?:the )?(?:local )?cache|not cached"
+                                r"|File `[^']+' not found", re.IGNORECASE)
+
+# Document using every construct of `markdown_to_latex`, compiled once to download their packages
+SEED_DOCUMENT = """#### Title: Cache Seed
+
+#### Abstract:
+Seed document with **bold**, *italic*, `code`, $x^2$ and a [link](https://example.com).
+
+#### 1. Section
+##### 1.1 Subsection
+###### Subsubsection
+- Item
+  1. Nested item
+
+| Column | Other |
+|---|---|
+| Cell | Cell |
+
+> Quote
+
+$$
+\\sum_i x_i
+$$
+"""
+
+
+def build_hash(tex_path):
+    """
+    Hashes the .tex file and the assets it references (images, inputs, bibliographies).
+    """
+    digest = hashlib.sha256()
+    with open(tex_path, "rb") as f:
+        content = f.read()
+    digest.update(content)
+    tex_dir = os.path.dirname(os.path.abspath(tex_path))
+    for reference in sorted(set(ASSET_PATTERN.findall(content.decode("utf-8", "replace")))):
+        for name in reference.split(","):
+            for extension in ASSET_EXTENSIONS:
+                asset_path = os.path.join(tex_dir, name.strip() + extension)
+                if os.path.isfile(asset_path):
+                    digest.update(name.strip().encode("utf-8"))
+                    with open(asset_path, "rb") as f:
+                        digest.update(f.read())
+                    break
+    return digest.hexdigest()
+
+
+def seed_document():
+    return markdown_to_latex(SEED_DOCUMENT)[0]
+
+
+def is_seeded(cache_dir):
+    """
+    Whether the cache was seeded with the current preamble of `markdown_to_latex`.
+    """
+    try:
+        with open(os.path.join(cache_dir, SEED_MARKER), "r", encoding="utf-8") as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return marker.get("preamble") == hashlib.sha256(seed_document().encode("utf-8")).hexdigest()
+
+
+@contextmanager
+def cache_lock(cache_dir, exclusive):
+    """
+    Locks the tectonic cache: shared for offline (read-only) builds, exclusive for builds that may write.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(cache_dir, ".lock"), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def run_tectonic(tex_path, output_dir, cache_dir, offline):
+    """
+    Runs tectonic, echoing its output; a failed build raises `CalledProcessError` carrying the output.
+    """
+    command = ["tectonic", tex_path, "--outdir", output_dir]
+    if offline:
+        command.append("--only-cached")
+    env = dict(os.environ, TECTONIC_CACHE_DIR=cache_dir)
+    with cache_lock(cache_dir, exclusive=not offline):
+        result = subprocess.run(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    if result.stdout:
+        print(result.stdout, end="")
+    result.check_returncode()
+
+
+def build_pdf(tex_path, output_dir, cache_dir, force=False):
+    """
+    Compiles a .tex file with tectonic unless it is unchanged since the last build.
+
+    Offline (`--only-cached`) builds are used once the cache is seeded; if one fails because a file
+    is missing from the cache, the build is retried online.
+
+    Args:
+        tex_path (str): LaTeX file to compile.
+        output_dir (str): Directory receiving the PDF (and the build stamp).
+        cache_dir (str): Persistent tectonic cache directory.
+        force (bool): Compile even when the inputs are unchanged.
+
+    Returns:
+        tuple: The PDF path and whether tectonic actually ran.
+    """
+    pdf_path = os.path.join(output_dir, os.path.splitext(os.path.basename(tex_path))[0] + ".pdf")
+    stamp_path = os.path.splitext(pdf_path)[0] + STAMP_SUFFIX
+    source_hash = build_hash(tex_path)
+
+    if not force and os.path.exists(pdf_path) and os.path.exists(stamp_path):
+        with open(stamp_path, "r", encoding="utf-8") as f:
+            stamp = json.load(f)
+        if stamp.get("hash") == source_hash:
+            print(f"LaTeX sources unchanged since the last build, keeping '{pdf_path}'.")
+            REGISTRY.counter("latex_builds_skipped_total", "LaTeX builds skipped (unchanged sources)").inc(
+                stage="latex")
+            return pdf_path, False
+
+    offline = is_seeded(cache_dir)
+    start = time.perf_counter()
+    with REGISTRY.histogram("latex_compile_seconds", "Tectonic compile time").time(stage="latex"):
+        try:
+            run_tectonic(tex_path, output_dir, cache_dir, offline)
+        except subprocess.CalledProcessError as e:
+            # Other failures (LaTeX errors in the document) would fail online as well
+            if not offline or not CACHE_MISS_PATTERN.search(e.output or ""):
+                raise
+            print("Offline LaTeX build failed, retrying with bundle downloads.")
+            offline = False
+            run_tectonic(tex_path, output_dir, cache_dir, offline)
+    compile_seconds = time.perf_counter() - start
+    print(f"LaTeX compiled in {compile_seconds:.1f}s ({'offline' if offline else 'online'}).")
+
+    # Written atomically: concurrent builds of the same document must not leave a torn stamp
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"hash": source_hash, "compile_seconds": compile_seconds, "offline": offline,
+                   "built_at": time.time()}, f, indent=2)
+    os.replace(tmp_path, stamp_path)
+    return pdf_path, True
+
+
+def warm_cache(cache_dir):
+    """
+    Pre-seeds the tectonic cache by compiling a document that uses every package of the generated
+    surveys, then marks the cache as usable offline.
+    """
+    document = seed_document()
+    with tempfile.TemporaryDirectory() as build_dir:
+        tex_path = os.path.join(build_dir, "seed.tex")
+        with open(tex_path, "w", encoding="utf-8") as f:
+            f.write(document)
+        start = time.perf_counter()
+        run_tectonic(tex_path, build_dir, cache_dir, offline=False)
+    with open(os.path.join(cache_dir, SEED_MARKER), "w", encoding="utf-8") as f:
+        json.dump({"seeded_at": time.time(), "preamble": hashlib.sha256(document.encode("utf-8")).hexdigest()}, f)
+    print(f"Tectonic cache seeded in '{cache_dir}' ({time.perf_counter() - start:.1f}s).")
+
+
+def main():
+    from agentic_summary.config import TECTONIC_CACHE_PATH
+
+    parser = argparse.ArgumentParser(description="Build LaTeX documents with a persistent tectonic cache.")
+    parser.add_argument("--cache", default=TECTONIC_CACHE_PATH, help="Tectonic cache directory.")
+    parser.add_argument("--warm", action="store_true", help="Pre-seed the cache for offline builds.")
+    parser.add_argument("--tex", help="LaTeX file to build.")
+    parser.add_argument("--force", action="store_true", help="Build even when the sources are unchanged.")
+    args = parser.parse_args()
+
+    if args.warm:
+        warm_cache(args.cache)
+    if args.tex:
+        build_pdf(args.tex, os.path.dirname(os.path.abspath(args.tex)), args.cache, force=args.force)
+    if not args.warm and not args.tex:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
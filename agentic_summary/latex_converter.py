@@ -0,0 +1,328 @@
+"""
+Deterministic Markdown to LaTeX conversion of the state-of-the-art survey, replacing the
+`convert_txt_to_latex` LLM round trip:
+- Headings (numbering removed, "Title:" and "Abstract" headings mapped to \\title and the abstract),
+  bullet and numbered lists (nested by indentation), pipe tables, block quotes, code blocks,
+  links, emphasis, inline and display math, bracketed citations and escaping of the special characters.
+- Constructs it cannot render faithfully (raw HTML, images, footnotes, diagrams) are reported,
+  so the caller can fall back to the LLM.
+"""
+
+import re
+
+PREAMBLE = r"""\documentclass[a4paper,12pt]{article}
+\usepackage{iftex}
+\ifPDFTeX
+\usepackage[utf8]{inputenc}
+\usepackage[T1]{fontenc}
+\else
+\usepackage{fontspec}
+\fi
+\usepackage{graphicx}
+\usepackage{amsmath, amssymb}
+\usepackage{enumitem}
+\usepackage{booktabs}
+\usepackage{longtable}
+\usepackage{array}
+\usepackage{hyperref}
+"""
+
+SECTION_COMMANDS = ("section", "subsection", "subsubsection", "paragraph")
+
+LATEX_SPECIAL = {"\\": r"\textbackslash{}", "&": r"\&", "%": r"\%", "$": r"\$", "#": r"\#", "_": r"\_",
+                 "{": r"\{", "}": r"\}", "~": r"\textasciitilde{}", "^": r"\textasciicircum{}",
+                 "|": r"\textbar{}"}
+SPECIAL_PATTERN = re.compile(r"[\\&%$#_{}~^|]")
+
+INLINE_PATTERN = re.compile(
+    r"(?P<code>`[^`\n]+`)"
+    r"|(?P<math>\$(?!\s)[^$\n]+?(?<!\s)\$|\\\(.+?\\\))"
+    r"|(?P<image>!\[[^\]]*\]\([^)\s]+\))"
+    r"|(?P<footnote>\[\^[^\]]+\])"
+    r"|(?P<link>\[(?P<link_text>[^\]]+)\]\((?P<link_url>[^)\s]+)\))"
+    r"|(?P<url>https?://[^\s)>\]]+)"
+    r"|(?P<html><(?P<tag>/?[a-zA-Z][a-zA-Z0-9]*)\b[^>]*>)"
+    r"|\*\*\*(?P<bold_italic>\S(?:.*?\S)?)\*\*\*"
+    r"|\*\*(?P<bold>\S(?:.*?\S)?)\*\*"
+    r"|(?<!\w)__(?P<bold_underscore>\S(?:.*?\S)?)__(?!\w)"
+    r"|\*(?P<italic>[^\s*](?:[^*]*?[^\s*])?)\*"
+    r"|(?<!\w)_(?P<italic_underscore>[^\s_](?:[^_]*?[^\s_])?)_(?!\w)"
+)
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+HEADING_NUMBER_PATTERN = re.compile(r"^(?:\d+(?:\.\d+)*\.?|[IVX]+\.)\s+")
+LIST_ITEM_PATTERN = re.compile(r"^(\s*)([-*+]|\d+[.)])\s+(.*)$")
+TABLE_SEPARATOR_PATTERN = re.compile(r"^\s*\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?\s*$")
+RULE_PATTERN = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+
+
+def escape(text):
+    """
+    Escapes the LaTeX special characters of plain text.
+    """
+    return SPECIAL_PATTERN.sub(lambda match: LATEX_SPECIAL[match.group()], text)
+
+
+def escape_url(url):
+    return url.replace("\\", "/").replace("%", r"\%").replace("#", r"\#")
+
+
+class _Converter:
+    def __init__(self):
+        self.unsupported = []
+        self.lines = []
+        self.title = None
+        self.list_stack = []
+        self.in_abstract = False
+        self.base_level = 1
+
+    def report(self, construct):
+        if construct not in self.unsupported:
+            self.unsupported.append(construct)
+
+    def inline(self, text):
+        parts, position = [], 0
+        for match in INLINE_PATTERN.finditer(text):
+            parts.append(escape(text[position:match.start()]))
+            parts.append(self.inline_token(match))
+            position = match.end()
+        parts.append(escape(text[position:]))
+        return "".join(parts)
+
+    def inline_token(self, match):
+        kind = match.lastgroup
+        if match.group("code"):
+            return r"\texttt{" + escape(match.group("code")[1:-1]) + "}"
+        if match.group("math"):
+            return match.group("math")
+        if match.group("image"):
+            self.report("images")
+            return escape(match.group("image"))
+        if match.group("footnote"):
+            self.report("footnotes")
+            return escape(match.group("footnote"))
+        if match.group("link"):
+            return (r"\href{" + escape_url(match.group("link_url")) + "}{" +
+                    self.inline(match.group("link_text")) + "}")
+        if match.group("url"):
+            return r"\href{" + escape_url(match.group("url")) + "}{" + escape(match.group("url")) + "}"
+        if match.group("html"):
+            if match.group("tag").lower() in ("br", "br/"):
+                return r"\newline{}"
+            self.report("HTML")
+            return ""
+        content = match.group(kind)
+        if kind == "bold_italic":
+            return r"\textbf{\textit{" + self.inline(content) + "}}"
+        if kind in ("bold", "bold_underscore"):
+            return r"\textbf{" + self.inline(content) + "}"
+        return r"\textit{" + self.inline(content) + "}"
+
+    def close_lists(self, indent=-1):
+        while self.list_stack and self.list_stack[-1][0] > indent:
+            self.lines.append(r"\end{" + self.list_stack.pop()[1] + "}")
+
+    def close_blocks(self):
+        self.close_lists()
+
+    @staticmethod
+    def heading_kind(text):
+        text = text.strip().strip("*_").strip()
+        lowered = text.lower()
+        if lowered.startswith("title") and ":" in text:
+            return "title"
+        if lowered.rstrip(":") == "abstract":
+            return "abstract"
+        return None
+
+    def heading(self, level, text):
+        self.close_blocks()
+        kind = self.heading_kind(text)
+        text = text.strip().strip("*_").strip()
+        if kind == "title":
+            self.title = text.split(":", 1)[1].strip().strip("*_").strip() or self.title
+            return
+        if self.in_abstract:
+            self.lines.append(r"\end{abstract}")
+            self.in_abstract = False
+        if kind == "abstract":
+            self.lines.append(r"\begin{abstract}")
+            self.in_abstract = True
+            return
+        text = HEADING_NUMBER_PATTERN.sub("", text).rstrip(":")
+        command = SECTION_COMMANDS[max(0, min(level - self.base_level, len(SECTION_COMMANDS) - 1))]
+        self.lines.append("\\" + command + "{" + self.inline(text) + "}")
+
+    def plan_headings(self, lines):
+        """
+        Picks the heading used as title (a lone top-level heading when there is no "Title:" one)
+        and the heading level mapped to \\section.
+        """
+        headings = [(index, len(match.group(1)), match.group(2))
+                    for index, match in enumerate(map(HEADING_PATTERN.match, lines)) if match]
+        sections = [(index, level) for index, level, text in headings if self.heading_kind(text) is None]
+        title_line = None
+        if sections and not any(self.heading_kind(text) == "title" for _, _, text in headings):
+            top = min(level for _, level in sections)
+            if sections[0][1] == top and sum(1 for _, level in sections if level == top) == 1:
+                title_line = sections.pop(0)[0]
+        self.base_level = min((level for _, level in sections), default=1)
+        return title_line
+
+    def list_item(self, indent, marker, text):
+        environment = "enumerate" if marker[0].isdigit() else "itemize"
+        self.close_lists(indent)
+        if self.list_stack and self.list_stack[-1][0] == indent and self.list_stack[-1][1] != environment:
+            self.lines.append(r"\end{" + self.list_stack.pop()[1] + "}")
+        if not self.list_stack or self.list_stack[-1][0] < indent:
+            self.list_stack.append((indent, environment))
+            self.lines.append(r"\begin{" + environment + "}")
+        # `\item{}`: an item starting with a bracket ("[1] Smith et al.") must not become the item label
+        self.lines.append(r"\item{} " + self.inline(text))
+
+    def table(self, rows):
+        self.close_blocks()
+        cells = [self.split_row(row) for row in rows]
+        columns = max(len(row) for row in cells)
+        width = r"p{\dimexpr0.95\linewidth/" + str(columns) + r"-2\tabcolsep\relax}"
+        self.lines.append(r"\begin{longtable}{|" + "|".join([width] * columns) + "|}")
+        self.lines.append(r"\hline")
+        for index, row in enumerate(cells):
+            row = row + [""] * (columns - len(row))
+            if index == 0:
+                row = [r"\textbf{" + self.inline(cell) + "}" for cell in row]
+            else:
+                row = [self.inline(cell) for cell in row]
+            self.lines.append(" & ".join(row) + r" \\")
+            self.lines.append(r"\hline")
+            if index == 0:
+                self.lines.append(r"\endhead")
+        self.lines.append(r"\end{longtable}")
+
+    @staticmethod
+    def split_row(row):
+        row = row.strip()
+        if row.startswith("|"):
+            row = row[1:]
+        if row.endswith("|") and not row.endswith(r"\|"):
+            row = row[:-1]
+        return [cell.strip().replace(r"\|", "|") for cell in re.split(r"(?<!\\)\|", row)]
+
+    def convert(self, text):
+        lines = text.replace("\r\n", "\n").strip().split("\n")
+        # Model outputs are often wrapped in a ```markdown fence
+        if len(lines) > 1 and lines[0].startswith("```") and lines[-1].strip() == "```":
+            lines = lines[1:-1]
+
+        title_line = self.plan_headings(lines)
+
+        index = 0
+        paragraph = []
+
+        def flush_paragraph():
+            if paragraph:
+                self.lines.append(self.inline(" ".join(line.strip() for line in paragraph)))
+                self.lines.append("")
+                paragraph.clear()
+
+        while index < len(lines):
+            line = lines[index]
+            stripped = line.strip()
+
+            if stripped.startswith("```"):
+                flush_paragraph()
+                self.close_blocks()
+                language = stripped[3:].strip().lower()
+                if language in ("mermaid", "dot", "graphviz", "plantuml"):
+                    self.report("diagrams")
+                block = []
+                index += 1
+                while index < len(lines) and not lines[index].strip().startswith("```"):
+                    block.append(lines[index])
+                    index += 1
+                self.lines.extend([r"\begin{verbatim}"] + block + [r"\end{verbatim}"])
+            elif stripped.startswith("$$") or stripped.startswith(r"\["):
+                flush_paragraph()
+                self.close_blocks()
+                closing = "$$" if stripped.startswith("$$") else r"\]"
+                block = [stripped[2:]]
+                while not block[-1].rstrip().endswith(closing) and index + 1 < len(lines):
+                    index += 1
+                    block.append(lines[index])
+                math = "\n".join(block).rstrip()
+                if math.endswith(closing):
+                    math = math[:-2]
+                self.lines.extend([r"\[", math.strip(), r"\]"])
+            elif index == title_line:
+                flush_paragraph()
+                self.title = HEADING_PATTERN.match(line).group(2).strip().strip("*_").strip()
+            elif HEADING_PATTERN.match(line):
+                flush_paragraph()
+                match = HEADING_PATTERN.match(line)
+                self.heading(len(match.group(1)), match.group(2))
+            elif (stripped.startswith("|") and index + 1 < len(lines)
+                  and TABLE_SEPARATOR_PATTERN.match(lines[index + 1])):
+                flush_paragraph()
+                rows = [line]
+                index += 2
+                while index < len(lines) and lines[index].strip().startswith("|"):
+                    rows.append(lines[index])
+                    index += 1
+                self.table(rows)
+                continue
+            elif RULE_PATTERN.match(line):
+                flush_paragraph()
+                self.close_blocks()
+                self.lines.extend([r"\noindent\rule{\linewidth}{0.4pt}", ""])
+            elif LIST_ITEM_PATTERN.match(line):
+                flush_paragraph()
+                match = LIST_ITEM_PATTERN.match(line)
+                self.list_item(len(match.group(1).expandtabs(4)), match.group(2), match.group(3))
+            elif stripped.startswith(">"):
+                flush_paragraph()
+                self.close_blocks()
+                quote = []
+                while index < len(lines) and lines[index].strip().startswith(">"):
+                    quote.append(lines[index].strip()[1:].strip())
+                    index += 1
+                self.lines.extend([r"\begin{quote}", self.inline(" ".join(quote)), r"\end{quote}"])
+                continue
+            elif not stripped:
+                flush_paragraph()
+                # A blank line ends the lists unless the next item continues them
+                following = next((candidate for candidate in lines[index + 1:] if candidate.strip()), "")
+                if not LIST_ITEM_PATTERN.match(following):
+                    self.close_blocks()
+            elif self.list_stack and (line[:1].isspace() or not paragraph):
+                # Continuation of the previous list item
+                self.lines[-1] += " " + self.inline(stripped)
+            else:
+                paragraph.append(line)
+            index += 1
+
+        flush_paragraph()
+        self.close_blocks()
+        if self.in_abstract:
+            self.lines.append(r"\end{abstract}")
+
+        body = "\n".join(self.lines).strip()
+        header = [PREAMBLE, r"\title{" + self.inline(self.title or "State of the Art") + "}",
+                  r"\author{}", r"\date{\today}", "", r"\begin{document}", r"\maketitle", ""]
+        return "\n".join(header) + body + "\n\n\\end{document}\n"
+
+
+def markdown_to_latex(text):
+    """
+    Converts the Markdown survey into a complete, compilable LaTeX document.
+
+    Args:
+        text (str): Markdown text (as produced by `summarize_final_aggregate`).
+
+    Returns:
+        tuple:
+            - The LaTeX document.
+            - The constructs that could not be converted faithfully (empty when the conversion is complete).
+    """
+    converter = _Converter()
+    document = converter.convert(text)
+    return document, converter.unsupported
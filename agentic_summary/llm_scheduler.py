@@ -0,0 +1,425 @@
+import base64
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import deque
+from observability.metrics import REGISTRY
+from observability.tracing import current_span
+from agentic_summary.usage_ledger import add_usage, current_attribution
+
+# Lower values are served first among the callers waiting on the same scheduler (threads of one
+# process); schedulers of different processes do not share their queue or their quota window
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+
+WINDOW_SECONDS = 60
+# Server errors, timeouts and dropped connections (retried by the OpenAI SDK itself before the
+# scheduler disabled its retries) are retried with exponential backoff
+TRANSIENT_ERRORS = ("APIConnectionError", "APITimeoutError", "InternalServerError")
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+
+
+def image_tokens(image_url, detail="high"):
+    """
+    Estimates the prompt tokens of an image part: 85 tokens at low detail; at high detail, 85 plus 170
+    per 512px tile after scaling to fit 2048x2048 and then to 768px on the shortest side.
+    The size is read from the PNG header inside the data URL, without decoding the image.
+
+    Args:
+        image_url (str): Image URL of the message part (usually a base64 PNG data URL).
+        detail (str): Detail level of the part ("low", "high" or "auto", which is billed as high here).
+
+    Returns:
+        int: Estimated prompt tokens.
+    """
+    if detail == "low":
+        return 85
+    width, height = 2048, 2048
+    if image_url.startswith("data:image/png;base64,"):
+        header = base64.b64decode(image_url[22:54])
+        if header[12:16] == b"IHDR":
+            width, height = int.from_bytes(header[16:20], "big"), int.from_bytes(header[20:24], "big")
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    return 85 + 170 * math.ceil(width / 512) * math.ceil(height / 512)
+
+
+def estimate_image_tokens(messages):
+    """
+    Estimates the prompt tokens spent on the images of a request.
+
+    Args:
+        messages (list): Chat messages.
+
+    Returns:
+        int: Estimated image tokens.
+    """
+    tokens = 0
+    for message in messages:
+        content = message.get("content") or ""
+        if not isinstance(content, str):
+            for part in content:
+                if part.get("type") == "image_url":
+                    tokens += image_tokens(part["image_url"]["url"], part["image_url"].get("detail", "high"))
+    return tokens
+
+
+def estimate_tokens(messages, max_tokens=0):
+    """
+    Estimates the tokens a request counts against the quota before sending it: prompt text
+    (about four characters per token), images, and `max_tokens`, which Azure reserves up front.
+
+    Args:
+        messages (list): Chat messages.
+        max_tokens (int): Completion token limit of the request.
+
+    Returns:
+        int: Estimated tokens.
+    """
+    tokens = (max_tokens or 0) + estimate_image_tokens(messages)
+    for message in messages:
+        tokens += 4
+        content = message.get("content") or ""
+        if isinstance(content, str):
+            tokens += len(content) // 4
+            continue
+        for part in content:
+            if part.get("type") != "image_url":
+                tokens += len(part.get("text", "")) // 4
+    return tokens
+
+
+def downgrade_request(kwargs, max_tokens):
+    """
+    Cheaper version of a request for runs over budget: images at low detail (85 tokens each)
+    and completions capped at `max_tokens`.
+
+    Args:
+        kwargs (dict): Arguments of `chat.completions.create`.
+        max_tokens (int): Completion token cap.
+
+    Returns:
+        dict: The downgraded arguments (the original ones are left untouched).
+    """
+    messages = []
+    for message in kwargs.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, list):
+            content = [dict(part, image_url=dict(part["image_url"], detail="low"))
+                       if part.get("type") == "image_url" else part for part in content]
+            message = dict(message, content=content)
+        messages.append(message)
+    downgraded = dict(kwargs, messages=messages)
+    downgraded["max_tokens"] = min(kwargs.get("max_tokens") or max_tokens, max_tokens)
+    return downgraded
+
+
+def retry_after_seconds(error, default=10.0):
+    """
+    Reads the server-requested delay of a 429 response (retry-after-ms or Retry-After headers).
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return default
+
+
+def is_transient(error):
+    """
+    Whether a failed request is worth retrying as is: 5xx answers, timeouts and connection errors.
+    """
+    status_code = getattr(error, "status_code", None)
+    if status_code is not None:
+        return status_code >= 500
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__)
+
+
+class QuotaWindow:
+    """
+    Sliding one-minute window of the requests admitted to one deployment, with its own quotas,
+    priority queue and 429 pause (deployments do not share their TPM/RPM quotas).
+    """
+
+    def __init__(self, tokens_per_minute=0, requests_per_minute=0):
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        # Admitted requests of the last minute: (admission time, estimated tokens)
+        self.admitted = deque()
+        self.tokens = 0
+        self.queue = []
+        self.paused_until = 0.0
+        self.total_tokens = 0
+        self.total_requests = 0
+        self.peak_tokens = 0
+        self.peak_requests = 0
+
+    def expire(self, now):
+        while self.admitted and now - self.admitted[0][0] >= WINDOW_SECONDS:
+            self.tokens -= self.admitted.popleft()[1]
+
+    def delay(self, tokens, now):
+        """
+        Seconds until a request of `tokens` fits in both budgets (0 when it can be sent now).
+        """
+        delay = max(self.paused_until - now, 0.0)
+        if self.requests_per_minute and len(self.admitted) >= self.requests_per_minute:
+            delay = max(delay, self.admitted[len(self.admitted) - self.requests_per_minute][0] + WINDOW_SECONDS - now)
+        if self.tokens_per_minute and self.tokens + tokens > self.tokens_per_minute:
+            # Oldest admissions must expire until the request fits (a request larger than the whole
+            # budget is sent once the window is empty)
+            excess = self.tokens + tokens - self.tokens_per_minute
+            for admitted_at, admitted_tokens in self.admitted:
+                excess -= admitted_tokens
+                if excess <= 0:
+                    delay = max(delay, admitted_at + WINDOW_SECONDS - now)
+                    break
+            else:
+                if self.admitted:
+                    delay = max(delay, self.admitted[-1][0] + WINDOW_SECONDS - now)
+        return delay
+
+    def admit(self, tokens, now):
+        self.admitted.append((now, tokens))
+        self.tokens += tokens
+        self.total_tokens += tokens
+        self.total_requests += 1
+        self.peak_tokens = max(self.peak_tokens, self.tokens)
+        self.peak_requests = max(self.peak_requests, len(self.admitted))
+
+
+class LLMScheduler:
+    def __init__(self, client, tokens_per_minute=0, requests_per_minute=0, max_retries=6, ledger=None,
+                 downgrade_max_tokens=2000, routes=None):
+        """
+        Paces chat completion requests against the tokens-per-minute and requests-per-minute quotas
+        of each deployment, shared by every caller of the process.
+
+        Requests wait in a priority queue until the last minute of admitted requests leaves room
+        for their estimated cost. On a 429 the whole queue pauses for the Retry-After delay and the
+        request is retried, instead of every caller retrying blindly. Server errors, timeouts and
+        connection errors are retried with exponential backoff.
+        It exposes `chat.completions.create` like the wrapped client, with an extra `priority` argument.
+        Requests made inside a `usage_context` whose stage has a route are sent to that route's
+        deployment (or OpenAI-compatible endpoint) with its generation parameters.
+
+        Args:
+            client (AzureOpenAI): Client used to send the requests (its own retries are disabled).
+            tokens_per_minute (int): TPM quota of each deployment (0 for no limit).
+            requests_per_minute (int): RPM quota of each deployment (0 for no limit).
+            max_retries (int): Attempts after a 429 or a transient error before the error is raised.
+            ledger (UsageLedger): Ledger recording every call and enforcing the run budget.
+            downgrade_max_tokens (int): Completion cap of requests downgraded by the budget policy.
+            routes (dict): Stage -> {"deployment", "endpoint", "api_key", "tokens_per_minute",
+                "requests_per_minute" (quotas of that deployment), and any `create` parameter}.
+        """
+        self.client = client.with_options(max_retries=0) if hasattr(client, "with_options") else client
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self.max_retries = max_retries
+        self.ledger = ledger
+        self.downgrade_max_tokens = downgrade_max_tokens
+        self.routes = routes or {}
+        self._endpoint_clients = {}
+
+        # One quota window per deployment (or endpoint)
+        self._windows = {}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+        self.started_at = time.time()
+        self.requests = 0
+        self.throttled = 0
+        self.estimated_tokens = 0
+        self.used_tokens = 0
+        self.wait_seconds = 0.0
+        self.truncated = 0
+
+        # Same interface as the OpenAI client: scheduler.chat.completions.create(...)
+        self.chat = self
+        self.completions = self
+
+    def _window(self, key, route=None):
+        route = route or {}
+        with self._condition:
+            if key not in self._windows:
+                self._windows[key] = QuotaWindow(route.get("tokens_per_minute", self.tokens_per_minute),
+                                                 route.get("requests_per_minute", self.requests_per_minute))
+            return self._windows[key]
+
+    def _acquire(self, window, tokens, priority):
+        ticket = (priority, next(self._sequence))
+        start = time.monotonic()
+        with self._condition:
+            heapq.heappush(window.queue, ticket)
+            while True:
+                now = time.monotonic()
+                window.expire(now)
+                delay = window.delay(tokens, now) if window.queue[0] == ticket else None
+                if delay == 0:
+                    break
+                self._condition.wait(delay)
+            heapq.heappop(window.queue)
+            window.admit(tokens, now)
+            self._condition.notify_all()
+        waited = time.monotonic() - start
+        self.wait_seconds += waited
+        return waited
+
+    def _pause(self, window, seconds):
+        with self._condition:
+            window.paused_until = max(window.paused_until, time.monotonic() + seconds)
+            self._condition.notify_all()
+
+    def _endpoint_client(self, endpoint, api_key):
+        if endpoint not in self._endpoint_clients:
+            from openai import OpenAI
+            self._endpoint_clients[endpoint] = OpenAI(base_url=endpoint, api_key=api_key or "local", max_retries=0)
+        return self._endpoint_clients[endpoint]
+
+    def route(self, kwargs):
+        """
+        Applies the route of the current stage to a request.
+
+        Args:
+            kwargs (dict): Arguments of `chat.completions.create`.
+
+        Returns:
+            tuple: The client to send the request with, the routed arguments, and the quota window
+                of the deployment serving it.
+        """
+        route = self.routes.get(current_attribution().get("stage"))
+        if not route:
+            return self.client, kwargs, self._window((None, kwargs.get("model")))
+        routed = dict(kwargs)
+        for key, value in route.items():
+            if value is None or key in ("endpoint", "api_key", "tokens_per_minute", "requests_per_minute"):
+                continue
+            routed["model" if key == "deployment" else key] = value
+        window = self._window((route.get("endpoint"), routed.get("model")), route)
+        if route.get("endpoint"):
+            return self._endpoint_client(route["endpoint"], route.get("api_key")), routed, window
+        return self.client, routed, window
+
+    def create(self, priority=PRIORITY_BULK, **kwargs):
+        """
+        Sends a chat completion request once the quotas allow it (same arguments as
+        `chat.completions.create`, plus the scheduling `priority`).
+        With a ledger, the call is recorded, and refused or downgraded once the run is over budget.
+
+        Returns:
+            ChatCompletion: The API response.
+        """
+        client, kwargs, window = self.route(kwargs)
+        request_span = current_span()
+        if request_span is not None and request_span.name == "llm_request":
+            request_span.set_attribute("model", kwargs.get("model"))
+        downgraded = self.ledger.check_budget() if self.ledger is not None else False
+        if downgraded:
+            kwargs = downgrade_request(kwargs, self.downgrade_max_tokens)
+        tokens = estimate_tokens(kwargs.get("messages", []), kwargs.get("max_tokens"))
+        wait = REGISTRY.histogram("llm_queue_wait_seconds", "Time LLM requests waited for quota")
+        for attempt in range(self.max_retries + 1):
+            wait.observe(self._acquire(window, tokens, priority), stage=f"priority{priority}")
+            start = time.perf_counter()
+            try:
+                completion = client.chat.completions.create(**kwargs)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                if getattr(e, "status_code", None) != 429:
+                    if not is_transient(e):
+                        raise
+                    delay = min(BACKOFF_SECONDS * 2 ** attempt, MAX_BACKOFF_SECONDS)
+                    REGISTRY.counter("llm_retries_total", "Chat completion requests retried after a transient error"
+                                     ).inc(stage=type(e).__name__)
+                    print(f"LLM request failed ({type(e).__name__}), retrying in {delay:.1f}s.")
+                    time.sleep(delay)
+                    continue
+                delay = retry_after_seconds(e)
+                self.throttled += 1
+                REGISTRY.counter("llm_throttled_total", "Chat completion requests answered with 429").inc()
+                print(f"Rate limited by the API, pausing requests for {delay:.1f}s.")
+                self._pause(window, delay)
+                continue
+
+            self.requests += 1
+            self.estimated_tokens += tokens
+            choices = getattr(completion, "choices", None) or []
+            if choices and getattr(choices[0], "finish_reason", None) == "length":
+                # The answer hit max_tokens: a summary cut off mid-sentence is worth a look
+                stage = current_attribution().get("stage")
+                self.truncated += 1
+                REGISTRY.counter("llm_truncated_total", "Chat completions cut off by max_tokens").inc(stage=stage)
+                print(f"Warning: {stage or 'LLM'} answer truncated at max_tokens={kwargs.get('max_tokens')} "
+                      f"({kwargs.get('model')}).")
+            usage = getattr(completion, "usage", None)
+            if usage is not None:
+                self.used_tokens += (usage.prompt_tokens or 0) + (usage.completion_tokens or 0)
+                add_usage(usage.prompt_tokens or 0, usage.completion_tokens or 0)
+            if self.ledger is not None:
+                self.ledger.record(kwargs.get("model"), getattr(usage, "prompt_tokens", 0) or 0,
+                                   getattr(usage, "completion_tokens", 0) or 0,
+                                   estimate_image_tokens(kwargs.get("messages", [])),
+                                   time.perf_counter() - start, downgraded=downgraded)
+            return completion
+
+    def utilization(self):
+        """
+        Quota utilization since the scheduler was created.
+
+        Returns:
+            dict: Requests, tokens, 429s, truncated answers, time spent waiting, and the average/peak usage
+                of each quota (the busiest deployment's, with the details of every deployment under "deployments").
+        """
+        minutes = max(time.time() - self.started_at, 1e-9) / 60
+        report = {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "estimated_tokens": self.estimated_tokens,
+            "used_tokens": self.used_tokens,
+            "truncated": self.truncated,
+            "wait_seconds": self.wait_seconds,
+            "tokens_per_minute": self.used_tokens / minutes,
+            "requests_per_minute": self.requests / minutes,
+            "deployments": {},
+        }
+        with self._condition:
+            windows = list(self._windows.items())
+        for (endpoint, model), window in windows:
+            usage = {}
+            if window.tokens_per_minute:
+                # Reserved (estimated) tokens: the quota is enforced on them, not on the billed usage
+                usage["tpm_utilization"] = window.total_tokens / minutes / window.tokens_per_minute
+                usage["tpm_peak_utilization"] = window.peak_tokens / window.tokens_per_minute
+            if window.requests_per_minute:
+                usage["rpm_utilization"] = window.total_requests / minutes / window.requests_per_minute
+                usage["rpm_peak_utilization"] = window.peak_requests / window.requests_per_minute
+            report["deployments"][f"{endpoint} {model}" if endpoint else str(model)] = usage
+            for key, value in usage.items():
+                report[key] = max(report.get(key, 0), value)
+        return report
+
+    def report(self):
+        usage = self.utilization()
+        print(f"LLM quota: {usage['requests']} requests ({usage['throttled']} rate limited), "
+              f"{usage['used_tokens']} tokens used ({usage['estimated_tokens']} reserved), "
+              f"{usage['wait_seconds']:.1f}s waiting for quota, {usage['truncated']} answers truncated.")
+        for deployment, deployment_usage in usage["deployments"].items():
+            for quota in ("tpm", "rpm"):
+                if f"{quota}_utilization" in deployment_usage:
+                    print(f"  {deployment} {quota.upper()}: {deployment_usage[f'{quota}_utilization']:.0%} average, "
+                          f"{deployment_usage[f'{quota}_peak_utilization']:.0%} peak")
+                    REGISTRY.gauge("llm_quota_utilization", "Average use of the LLM quotas").set(
+                        deployment_usage[f"{quota}_utilization"], stage=quota, host=deployment)
+
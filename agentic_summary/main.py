@@ -1,19 +1,47 @@
-from openai import AzureOpenAI
+import argparse
+import os
 from agentic_summary.agentic_summarization import Agentic_Summarization
 from agentic_summary.agentic_aggregation import Agentic_Aggregation
 from agentic_summary.config import (API_KEY, AZURE_ENDPOINT, DEPLOYMENT_NAME, API_VERSION, INPUT_PATH, OUTPUT_PATH,
                                     PDF_DPI, IMAGE_QUALITY, MAX_TOKENS, TEMPERATURE, TOP_P, FREQUENCY_PENALTY,
-                                    PRESENCE_PENALTY, MAX_PDFS_PER_FILE)
+                                    PRESENCE_PENALTY, MAX_PDFS_PER_FILE, METRICS_PATH, TRACES_PATH,
+                                    PROFILES_PATH, TOKENS_PER_MINUTE, REQUESTS_PER_MINUTE, USAGE_LEDGER_PATH,
+                                    MODEL_PRICES, RUN_TOKEN_BUDGET, RUN_COST_BUDGET, BUDGET_POLICY,
+                                    DOWNGRADE_MAX_TOKENS, STAGE_ROUTES, TRIAGE_METHOD, TRIAGE_THRESHOLD,
+                                    TRIAGE_TOP_K, EXTRACTION_BACKEND, EXTRACTION_WORKERS, LATEX_CONVERSION,
+                                    TECTONIC_CACHE_PATH, JOB_LEDGER_PATH, JOB_MAX_ATTEMPTS, CATALOG_PATH)
+from agentic_summary.job_ledger import JobLedger
+from agentic_summary.llm_scheduler import LLMScheduler
+from agentic_summary.triage import PaperTriage
+from agentic_summary.usage_ledger import UsageLedger
+from scraper.spider.catalog import PaperCatalog
+from observability.metrics import REGISTRY
+from observability.profiling import (add_profile_argument, memory_checkpoint, profile_stage, start_profiling,
+                                       stop_profiling)
+from observability.tracing import TRACER, span
 
 
 def main():
-    # Initialize the Azure OpenAI client with API credentials and configuration settings
-    client = AzureOpenAI(
+    parser = argparse.ArgumentParser(description="Summarize downloaded papers and build the state of the art.")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    # Imported here so the SDK is only loaded when the pipeline actually runs
+    from openai import AzureOpenAI
+
+    # Every LLM call of the run is recorded in the usage ledger, which also enforces the run budget
+    ledger = UsageLedger(USAGE_LEDGER_PATH, prices=MODEL_PRICES, token_budget=RUN_TOKEN_BUDGET,
+                         cost_budget=RUN_COST_BUDGET, policy=BUDGET_POLICY)
+
+    # Initialize the Azure OpenAI client with API credentials and configuration settings,
+    # behind a scheduler pacing requests against the deployment's quotas. The client is not bound to a
+    # deployment: each request's model (routed per stage by STAGE_ROUTES) selects it
+    client = LLMScheduler(AzureOpenAI(
         azure_endpoint=AZURE_ENDPOINT,
-        azure_deployment=DEPLOYMENT_NAME,
         api_key=API_KEY,
         api_version=API_VERSION
-    )
+    ), TOKENS_PER_MINUTE, REQUESTS_PER_MINUTE, ledger=ledger, downgrade_max_tokens=DOWNGRADE_MAX_TOKENS,
+        routes=STAGE_ROUTES)
 
     # Prompt user for years
     all_years = list(range(1950, 2050))
@@ -43,26 +71,65 @@ def main():
     selected_years = sorted(selected_years, reverse=True)
     print("\nSelected years:", selected_years)
 
-    # Initialize the summarization module
-    agentic_summarization = Agentic_Summarization(INPUT_PATH, OUTPUT_PATH, DEPLOYMENT_NAME, client, PDF_DPI,
-                                                  IMAGE_QUALITY, MAX_TOKENS, TEMPERATURE, TOP_P, FREQUENCY_PENALTY,
-                                                  PRESENCE_PENALTY)
+    # Prompt user for the topics used to triage the papers before summarization
+    topics_input = input("\nEnter the topics of the state of the art, comma-separated "
+                         "(press Enter to summarize every paper): ").strip()
+    triage = None
+    if topics_input:
+        topics = [topic.strip() for topic in topics_input.split(",") if topic.strip()]
+        triage = PaperTriage(topics, TRIAGE_METHOD, threshold=TRIAGE_THRESHOLD, top_k=TRIAGE_TOP_K or None,
+                             client=client, deployment_name=DEPLOYMENT_NAME)
+        print("Triage topics:", topics)
+
+    if args.profile:
+        start_profiling(PROFILES_PATH, "agentic_summary", mode=args.profile)
+
+    # Status of every paper across runs, so failing papers are retried a bounded number of times
+    job_ledger = JobLedger(JOB_LEDGER_PATH, max_attempts=JOB_MAX_ATTEMPTS)
+    # The scraper catalog indexes the downloaded PDFs, so the input directory is never listed
+    catalog = PaperCatalog(CATALOG_PATH) if os.path.exists(CATALOG_PATH) else None
+
+    with span("agentic_summary", years=",".join(map(str, selected_years))):
+        # Initialize the summarization module
+        agentic_summarization = Agentic_Summarization(INPUT_PATH, OUTPUT_PATH, DEPLOYMENT_NAME, client, PDF_DPI,
+                                                      IMAGE_QUALITY, MAX_TOKENS, TEMPERATURE, TOP_P, FREQUENCY_PENALTY,
+                                                      PRESENCE_PENALTY, triage=triage, job_ledger=job_ledger,
+                                                      catalog=catalog)
+
+        print("\nStarting PDF processing and summarization...")
 
-    print("\nStarting PDF processing and summarization...")
+        # Process PDFs by year, generating individual summaries
+        with profile_stage("summarize"):
+            agentic_summarization.process_pdfs_by_year(selected_years)
+        print("\nPDF summarization completed.")
+        job_ledger.print_report()
+        memory_checkpoint("after summarization", full=True)
 
-    # Process PDFs by year, generating individual summaries
-    agentic_summarization.process_pdfs_by_year(selected_years)
-    print("\nPDF summarization completed.")
+        # Initialize the aggregation module
+        agentic_aggregation = Agentic_Aggregation(OUTPUT_PATH, DEPLOYMENT_NAME, client, MAX_TOKENS, TEMPERATURE, TOP_P,
+                                                  FREQUENCY_PENALTY, PRESENCE_PENALTY, MAX_PDFS_PER_FILE,
+                                                  extraction_backend=EXTRACTION_BACKEND,
+                                                  extraction_workers=EXTRACTION_WORKERS or None,
+                                                  latex_conversion=LATEX_CONVERSION,
+                                                  tectonic_cache_path=TECTONIC_CACHE_PATH)
 
-    # Initialize the aggregation module
-    agentic_aggregation = Agentic_Aggregation(OUTPUT_PATH, DEPLOYMENT_NAME, client, MAX_TOKENS, TEMPERATURE, TOP_P,
-                                              FREQUENCY_PENALTY, PRESENCE_PENALTY, MAX_PDFS_PER_FILE)
+        print("\nAggregating summaries into a final document...")
 
-    print("\nAggregating summaries into a final document...")
+        # Generate a comprehensive summary from the individual summaries
+        with profile_stage("aggregate"):
+            agentic_aggregation.summarize_summaries()
+        print("\nSummary aggregation completed.")
 
-    # Generate a comprehensive summary from the individual summaries
-    agentic_aggregation.summarize_summaries()
-    print("\nSummary aggregation completed.")
+    client.report()
+    print(f"\nUsage of run {ledger.run_id} (details: python -m agentic_summary.usage_ledger --by paper):")
+    ledger.print_report("route")
+    ledger.close()
+    job_ledger.close()
+    if catalog is not None:
+        catalog.close()
+    REGISTRY.export(METRICS_PATH, "agentic_summary")
+    TRACER.export(TRACES_PATH, "agentic_summary")
+    stop_profiling()
 
 
 if __name__ == "__main__":
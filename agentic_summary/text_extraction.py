@@ -0,0 +1,145 @@
+"""
+Text extraction of the summary PDFs read by the aggregation:
+- Backends: "pdfium" (pypdfium2, fastest), "pdfminer" (pdfminer.six) or "pypdf2".
+- Every extraction is cached in a `<file>.text.json` sidecar keyed by the file's size, mtime and
+  SHA-256, so unchanged summaries are never parsed twice (a touched but identical file only costs a hash).
+- Cache misses are extracted in a process pool; results are yielded in input order.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from observability.metrics import REGISTRY
+from scraper.spider.pdf_store import file_sha256
+
+EXTRACTION_BACKENDS = ("pdfium", "pdfminer", "pypdf2")
+SIDECAR_SUFFIX = ".text.json"
+
+
+def _extract_pdfium(pdf_path):
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        return [pdf[index].get_textpage().get_text_range().replace("\r\n", "\n") for index in range(len(pdf))]
+    finally:
+        pdf.close()
+
+
+def _extract_pdfminer(pdf_path):
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+
+    return ["".join(element.get_text() for element in page if isinstance(element, LTTextContainer))
+            for page in extract_pages(pdf_path)]
+
+
+def _extract_pypdf2(pdf_path):
+    from PyPDF2 import PdfReader
+
+    with open(pdf_path, "rb") as pdf_file:
+        return [page.extract_text() for page in PdfReader(pdf_file).pages]
+
+
+_EXTRACTORS = {"pdfium": _extract_pdfium, "pdfminer": _extract_pdfminer, "pypdf2": _extract_pypdf2}
+
+
+def sidecar_path(pdf_path):
+    return pdf_path + SIDECAR_SUFFIX
+
+
+def _write_sidecar(pdf_path, entry):
+    tmp_path = sidecar_path(pdf_path) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, sidecar_path(pdf_path))
+
+
+def load_cached(pdf_path, backend):
+    """
+    Returns the cached page texts of a PDF, or None when the sidecar is missing or stale.
+    """
+    try:
+        with open(sidecar_path(pdf_path), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("backend") != backend:
+        return None
+    stat = os.stat(pdf_path)
+    if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+        return entry["pages"]
+    # Copied or touched files keep their cache as long as the content is the same
+    if entry.get("size") == stat.st_size and entry.get("sha256") == file_sha256(pdf_path):
+        entry["mtime_ns"] = stat.st_mtime_ns
+        _write_sidecar(pdf_path, entry)
+        return entry["pages"]
+    return None
+
+
+def extract_and_cache(pdf_path, backend):
+    """
+    Extracts the page texts of a PDF and stores them in its sidecar (runs in the worker processes).
+
+    Returns:
+        tuple: The page texts (None on failure) and the error message (None on success).
+    """
+    stat = os.stat(pdf_path)
+    try:
+        pages = _EXTRACTORS[backend](pdf_path)
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    _write_sidecar(pdf_path, {"backend": backend, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                              "sha256": file_sha256(pdf_path), "pages": pages})
+    return pages, None
+
+
+def extract_texts(pdf_paths, backend="pdfium", workers=None):
+    """
+    Yields the page texts of every PDF, from the sidecar cache when it is fresh and otherwise
+    extracted in a process pool.
+
+    Args:
+        pdf_paths (list): PDFs to read, in the order the results are yielded.
+        backend (str): "pdfium", "pdfminer" or "pypdf2".
+        workers (int): Extraction processes (CPU count when None, 1 to extract in-process).
+
+    Returns:
+        generator: Pairs of (PDF path, list of page texts); unreadable PDFs are reported and skipped.
+    """
+    if backend not in EXTRACTION_BACKENDS:
+        raise ValueError(f"Unknown extraction backend: {backend}")
+
+    cached, pending = {}, []
+    for pdf_path in pdf_paths:
+        pages = load_cached(pdf_path, backend)
+        if pages is None:
+            pending.append(pdf_path)
+        else:
+            cached[pdf_path] = pages
+    REGISTRY.counter("summary_text_cache_hits_total", "Summary PDFs read from the text cache").inc(
+        len(cached), stage="aggregate")
+    REGISTRY.counter("summary_text_extracted_total", "Summary PDFs parsed for their text").inc(
+        len(pending), stage="aggregate")
+
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if executor is None:
+            extracted = map(extract_and_cache, pending, repeat(backend))
+        else:
+            extracted = executor.map(extract_and_cache, pending, repeat(backend),
+                                     chunksize=max(1, len(pending) // (workers * 4)))
+        for pdf_path in pdf_paths:
+            if pdf_path in cached:
+                yield pdf_path, cached.pop(pdf_path)
+                continue
+            pages, error = next(extracted)
+            if error is not None:
+                print(f"Error extracting text from '{pdf_path}': {error}")
+                continue
+            yield pdf_path, pages
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
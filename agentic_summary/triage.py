@@ -0,0 +1,185 @@
+"""
+Relevance triage of the downloaded papers, run before the full vision summarization:
+- Reads the abstract (or the first-page text when none is found) locally with PyPDF2.
+- Scores it against the user's topics with the offline `RelevanceRanker` (BM25) or with one cheap
+  text-only LLM call per paper.
+- Only the papers scoring at least the threshold and ranked in the top-K of their year go on to
+  summarization; the skipped ones (and the pages of vision input saved) are reported and written
+  to `triage.json` in the year's output folder, which also caches the scores for the next runs.
+"""
+
+import json
+import os
+import re
+import time
+from observability.metrics import REGISTRY, observe_llm_call
+from observability.tracing import annotate_usage, span, traced
+from agentic_summary.usage_ledger import BudgetExceededError, usage_context
+from scraper.spider.abstracts import extract_abstract, read_first_pages
+
+TRIAGE_METHODS = ("ranker", "llm")
+
+
+class PaperTriage:
+    def __init__(self, topics, method="ranker", threshold=None, top_k=None, client=None, deployment_name=None,
+                 first_pages=1):
+        """
+        Initializes the triage of papers against the user's topics.
+
+        Args:
+            topics (list): Topics, as strings or as keyword groups (lists of synonyms, see `extract_topics`).
+            method (str): "ranker" (BM25, offline) or "llm" (one text-only request per paper).
+            threshold (float): Minimum score to keep a paper, in [0, 1]. With the ranker, each topic is
+                scored against the topic matched against itself (its best synonym alone), so the score
+                does not depend on the other papers of the year.
+            top_k (int): Maximum number of papers kept per year.
+            client (LLMScheduler): Client used by the "llm" method.
+            deployment_name (str): Deployment used by the "llm" method (routed by the "triage" stage).
+            first_pages (int): Pages read to find the abstract.
+        """
+        if method not in TRIAGE_METHODS:
+            raise ValueError(f"Unknown triage method: {method}")
+        if method == "llm" and client is None:
+            raise ValueError("The 'llm' triage method needs a client.")
+        self.keyword_groups = [[topic] if isinstance(topic, str) else list(topic) for topic in topics]
+        self.method = method
+        self.threshold = threshold
+        self.top_k = top_k
+        self.client = client
+        self.deployment_name = deployment_name
+        self.first_pages = first_pages
+
+    def score_ranker(self, abstracts):
+        """
+        Scores abstracts with BM25 against every topic, normalized to [0, 1] by each topic's reference score.
+        """
+        from scraper.spider.relevance import RelevanceRanker
+
+        scores, _ = RelevanceRanker().fit(abstracts).score(self.keyword_groups, reference=True)
+        return [float(score) / len(self.keyword_groups) for score in scores]
+
+    def score_llm(self, abstract, year=None):
+        """
+        Asks the LLM for a 0-10 relevance grade of an abstract, normalized to [0, 1].
+        Papers that cannot be graded get None: they are summarized rather than lost, and graded
+        again by the next run instead of caching a made-up grade.
+        """
+        topics = "; ".join(", ".join(group) for group in self.keyword_groups)
+        prompt = [
+            {"role": "system", "content": "You grade how relevant scientific papers are to research topics."},
+            {"role": "user", "content": f"Topics: {topics}\n\nAbstract:\n{abstract}\n\n"
+                                        "Reply only with an integer from 0 (unrelated) to 10 (central to the topics)."}
+        ]
+        try:
+            with span("llm_request", stage="triage", model=self.deployment_name) as request_span, \
+                    usage_context(stage="triage"):
+                start = time.perf_counter()
+                completion = self.client.chat.completions.create(
+                    model=self.deployment_name,
+                    messages=prompt,
+                    max_tokens=5,
+                    temperature=0
+                )
+                observe_llm_call(completion, time.perf_counter() - start, stage="triage", year=year)
+                annotate_usage(request_span, completion)
+            grade = re.search(r"\d+", completion.choices[0].message.content or "")
+            return min(int(grade.group()), 10) / 10 if grade else None
+        except BudgetExceededError:
+            raise
+        except Exception as e:
+            print(f"Error grading abstract: {e}")
+            return None
+
+    def load_scores(self, report_path):
+        """
+        Returns the scores cached by a previous triage with the same topics and method.
+        """
+        if not os.path.exists(report_path):
+            return {}
+        try:
+            with open(report_path, "r", encoding="utf-8") as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if report.get("topics") != self.keyword_groups or report.get("method") != self.method:
+            return {}
+        return {paper["file"]: paper for paper in report["kept"] + report["skipped"]}
+
+    @traced()
+    def select(self, year_folder, pdf_paths, output_path, keys=None):
+        """
+        Scores the papers of a year and returns the ones to summarize.
+
+        Args:
+            year_folder (str): Year of the papers.
+            pdf_paths (list): PDF paths of the year.
+            output_path (str): Output folder, where the year's `triage.json` report is written.
+            keys (list): Unique name of each PDF in the report and its cache (file names by default).
+
+        Returns:
+            list: The PDF paths that passed the triage, in their original order.
+        """
+        report_path = os.path.join(output_path, year_folder, "triage.json")
+        cached = self.load_scores(report_path)
+        papers = []
+        keys = keys or [os.path.basename(pdf_path) for pdf_path in pdf_paths]
+        for pdf_path, pdf_file in zip(pdf_paths, keys):
+            paper = cached.get(pdf_file)
+            if paper is None or (self.method == "ranker" and "abstract" not in paper):
+                try:
+                    text, pages = read_first_pages(pdf_path, self.first_pages)
+                    paper = {"file": pdf_file, "pages": pages, "abstract": extract_abstract(text)}
+                except Exception as e:
+                    # Unreadable text layers are left to the vision summarization
+                    print(f"Error reading {pdf_file} for triage: {e}")
+                    paper = {"file": pdf_file, "pages": None, "abstract": None, "score": None}
+            papers.append(paper)
+
+        # BM25 scores depend on the whole year, so the ranker always rescores every paper
+        readable = [paper for paper in papers if paper.get("abstract")]
+        if self.method == "ranker" and readable:
+            for paper, score in zip(readable, self.score_ranker([paper["abstract"] for paper in readable])):
+                paper["score"] = score
+        elif self.method == "llm":
+            for paper in readable:
+                if paper.get("score") is None:
+                    paper["score"] = self.score_llm(paper["abstract"], year=year_folder)
+
+        ranked = sorted((paper for paper in papers if paper.get("score") is not None),
+                        key=lambda paper: -paper["score"])
+        kept = {paper["file"] for paper in papers if paper.get("score") is None}
+        for rank, paper in enumerate(ranked):
+            if self.threshold is not None and paper["score"] < self.threshold:
+                continue
+            if self.top_k is not None and rank >= self.top_k:
+                continue
+            kept.add(paper["file"])
+
+        skipped = [paper for paper in ranked if paper["file"] not in kept]
+        self.report(report_path, year_folder, papers, kept, skipped)
+        return [pdf_path for pdf_path, pdf_file in zip(pdf_paths, keys) if pdf_file in kept]
+
+    def report(self, report_path, year_folder, papers, kept, skipped):
+        skipped_pages = sum(paper["pages"] or 0 for paper in skipped)
+        REGISTRY.counter("papers_triage_kept_total", "Papers kept by the relevance triage").inc(
+            len(kept), year=year_folder, stage="triage")
+        REGISTRY.counter("papers_triage_skipped_total", "Papers skipped by the relevance triage").inc(
+            len(skipped), year=year_folder, stage="triage")
+        REGISTRY.counter("pages_triage_skipped_total", "Pages not rasterized thanks to the triage").inc(
+            skipped_pages, year=year_folder, stage="triage")
+
+        print(f"Triage {year_folder}: {len(kept)} of {len(papers)} papers kept, {len(skipped)} skipped "
+              f"({skipped_pages} pages of vision input saved).")
+        for paper in skipped:
+            print(f"  Skipped ({paper['score']:.2f}): {paper['file']}")
+
+        os.makedirs(os.path.dirname(report_path), exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "topics": self.keyword_groups,
+                "method": self.method,
+                "threshold": self.threshold,
+                "top_k": self.top_k,
+                "kept": [paper for paper in papers if paper["file"] in kept],
+                "skipped": skipped
+            }, f, indent=2)
@@ -0,0 +1,256 @@
+"""
+Usage ledger: one SQLite row per LLM call with its tokens, latency, model and cost, attributed to
+the paper, year and stage being processed (set by the callers with `usage_context`).
+
+Report:
+    python -m agentic_summary.usage_ledger [--run RUN_ID | --all-runs] [--by paper|year|stage|model|route|run]
+                                           [--top N]
+"""
+
+import argparse
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+_attribution = contextvars.ContextVar("usage_attribution", default={})
+_totals = contextvars.ContextVar("usage_totals", default=None)
+
+ATTRIBUTION_FIELDS = ("paper", "year", "stage")
+BUDGET_POLICIES = ("stop", "downgrade")
+
+
+class BudgetExceededError(Exception):
+    """
+    Raised instead of sending a request once the run's token or cost budget is spent (policy "stop").
+    """
+
+
+@contextmanager
+def usage_context(**attribution):
+    """
+    Attributes every LLM call made inside the `with` block to the given paper, year and/or stage
+    (nested blocks override only the fields they set).
+    """
+    unknown = set(attribution) - set(ATTRIBUTION_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown usage attribution fields: {sorted(unknown)}")
+    merged = dict(_attribution.get())
+    merged.update({key: value for key, value in attribution.items() if value is not None})
+    token = _attribution.set(merged)
+    try:
+        yield
+    finally:
+        _attribution.reset(token)
+
+
+def current_attribution():
+    return dict(_attribution.get())
+
+
+@contextmanager
+def track_usage():
+    """
+    Sums the tokens of every LLM call made inside the `with` block (e.g. to charge them to a job).
+
+    Returns:
+        dict: Running totals: calls, prompt_tokens and completion_tokens.
+    """
+    totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    token = _totals.set(totals)
+    try:
+        yield totals
+    finally:
+        _totals.reset(token)
+
+
+def add_usage(prompt_tokens, completion_tokens):
+    totals = _totals.get()
+    if totals is not None:
+        totals["calls"] += 1
+        totals["prompt_tokens"] += prompt_tokens
+        totals["completion_tokens"] += completion_tokens
+
+
+class UsageLedger:
+    def __init__(self, db_path, run_id=None, prices=None, token_budget=0, cost_budget=0.0, policy="stop"):
+        """
+        Opens (or creates) the ledger and starts a new run.
+
+        Args:
+            db_path (str): Path of the SQLite database.
+            run_id (str): Identifier of this run (generated from the date when omitted).
+            prices (dict): Model -> (USD per 1K prompt tokens, USD per 1K completion tokens).
+            token_budget (int): Maximum prompt + completion tokens for the run (0 for no limit).
+            cost_budget (float): Maximum cost in USD for the run (0 for no limit).
+            policy (str): What happens once a budget is exceeded: "stop" refuses further requests,
+                "downgrade" keeps going with cheaper requests (see LLMScheduler).
+        """
+        if policy not in BUDGET_POLICIES:
+            raise ValueError(f"Unknown budget policy: {policy}")
+        self.db_path = db_path
+        self.run_id = run_id or time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        self.prices = prices or {}
+        self.token_budget = token_budget
+        self.cost_budget = cost_budget
+        self.policy = policy
+        self.run_tokens = 0
+        self.run_cost = 0.0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_calls (
+                id INTEGER PRIMARY KEY,
+                run_id TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                paper TEXT,
+                year TEXT,
+                stage TEXT,
+                model TEXT,
+                prompt_tokens INTEGER NOT NULL,
+                completion_tokens INTEGER NOT NULL,
+                image_tokens INTEGER NOT NULL,
+                latency REAL NOT NULL,
+                cost REAL NOT NULL,
+                downgraded INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS llm_calls_run ON llm_calls (run_id)")
+        self.conn.commit()
+
+    def cost(self, model, prompt_tokens, completion_tokens):
+        prompt_price, completion_price = self.prices.get(model, (0.0, 0.0))
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+    def record(self, model, prompt_tokens, completion_tokens, image_tokens, latency, downgraded=False):
+        """
+        Records one LLM call, attributed to the current `usage_context`.
+
+        Args:
+            model (str): Deployment or model that served the request.
+            prompt_tokens (int): Prompt tokens reported by the API.
+            completion_tokens (int): Completion tokens reported by the API.
+            image_tokens (int): Estimated share of the prompt tokens spent on images.
+            latency (float): Request latency in seconds.
+            downgraded (bool): Whether the request was downgraded by the budget policy.
+
+        Returns:
+            float: The cost of the call in USD.
+        """
+        attribution = current_attribution()
+        cost = self.cost(model, prompt_tokens, completion_tokens)
+        year = attribution.get("year")
+        with self._lock:
+            self.conn.execute("""
+                INSERT INTO llm_calls (run_id, created_at, paper, year, stage, model, prompt_tokens,
+                                       completion_tokens, image_tokens, latency, cost, downgraded)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (self.run_id, time.time(), attribution.get("paper"), str(year) if year is not None else None,
+                  attribution.get("stage"), model, prompt_tokens, completion_tokens, image_tokens, latency, cost,
+                  int(downgraded)))
+            self.conn.commit()
+            self.run_tokens += prompt_tokens + completion_tokens
+            self.run_cost += cost
+        return cost
+
+    def over_budget(self):
+        return bool((self.token_budget and self.run_tokens >= self.token_budget) or
+                    (self.cost_budget and self.run_cost >= self.cost_budget))
+
+    def check_budget(self):
+        """
+        Raises BudgetExceededError when the run is over budget and the policy is "stop".
+
+        Returns:
+            bool: True when the next request should be downgraded.
+        """
+        if not self.over_budget():
+            return False
+        if self.policy == "stop":
+            raise BudgetExceededError(f"Run budget exhausted ({self.run_tokens} tokens, ${self.run_cost:.2f}).")
+        return True
+
+    def summary(self, by="stage", run_id=None, top=None):
+        """
+        Aggregates the recorded calls.
+
+        Args:
+            by (str): Grouping column: "paper", "year", "stage", "model", "route" (stage and model) or "run".
+            run_id (str): Run to report (this ledger's run by default, "*" for every run).
+            top (int): Only the most expensive `top` groups.
+
+        Returns:
+            list: One row per group with calls, tokens, latency and cost, most expensive first.
+        """
+        column = {"paper": "paper", "year": "year", "stage": "stage", "model": "model", "run": "run_id",
+                  "route": "stage || ' -> ' || model"}[by]
+        run_id = run_id or self.run_id
+        query = f"""
+            SELECT {column} AS name, COUNT(*) AS calls, SUM(prompt_tokens) AS prompt_tokens,
+                   SUM(completion_tokens) AS completion_tokens, SUM(image_tokens) AS image_tokens,
+                   SUM(latency) AS latency, MAX(latency) AS max_latency, SUM(cost) AS cost,
+                   SUM(downgraded) AS downgraded
+            FROM llm_calls {"" if run_id == "*" else "WHERE run_id = ?"}
+            GROUP BY {column} ORDER BY cost DESC, prompt_tokens + completion_tokens DESC
+        """
+        if top:
+            query += f" LIMIT {int(top)}"
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(query, () if run_id == "*" else (run_id,))]
+
+    def latest_run(self):
+        with self._lock:
+            row = self.conn.execute("SELECT run_id FROM llm_calls ORDER BY created_at DESC LIMIT 1").fetchone()
+        return row["run_id"] if row else None
+
+    def print_report(self, by="stage", run_id=None, top=None):
+        rows = self.summary(by, run_id, top)
+        print(f"\n{by:45} {'calls':>6} {'prompt':>10} {'images':>10} {'completion':>10} {'avg s':>7} {'max s':>7} "
+              f"{'cost $':>9}")
+        for row in rows:
+            name = str(row["name"] if row["name"] is not None else "-")
+            print(f"{name[:45]:45} {row['calls']:6d} {row['prompt_tokens']:10d} {row['image_tokens']:10d} "
+                  f"{row['completion_tokens']:10d} {row['latency'] / row['calls']:7.2f} {row['max_latency']:7.2f} "
+                  f"{row['cost']:9.4f}"
+                  + (f"  ({row['downgraded']} downgraded)" if row["downgraded"] else ""))
+        print(f"{'total':45} {sum(r['calls'] for r in rows):6d} {sum(r['prompt_tokens'] for r in rows):10d} "
+              f"{sum(r['image_tokens'] for r in rows):10d} {sum(r['completion_tokens'] for r in rows):10d} "
+              f"{'':7} {'':7} {sum(r['cost'] for r in rows):9.4f}")
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    from agentic_summary.config import USAGE_LEDGER_PATH
+
+    parser = argparse.ArgumentParser(description="Report LLM token usage and cost from the usage ledger.")
+    parser.add_argument("--db", default=USAGE_LEDGER_PATH, help="Ledger database.")
+    parser.add_argument("--run", help="Run id to report (default: the latest run).")
+    parser.add_argument("--all-runs", action="store_true", help="Report every run together.")
+    parser.add_argument("--by", choices=["paper", "year", "stage", "model", "route", "run"], default="stage")
+    parser.add_argument("--top", type=int, help="Only the N most expensive groups (e.g. outlier papers).")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"No usage ledger at '{args.db}'.")
+        return
+    ledger = UsageLedger(args.db)
+    run_id = "*" if args.all_runs else args.run or ledger.latest_run()
+    if run_id is None:
+        print("The usage ledger is empty.")
+        return
+    print(f"Usage of {'all runs' if run_id == '*' else f'run {run_id}'} by {args.by}:")
+    ledger.print_report(args.by, run_id, args.top)
+    ledger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Micro-benchmarks of the pure per-paper / per-line hot paths, with stored baselines:
+- keyword_match: 1M dblp-style titles against three 100-term keyword groups.
+- clean_title: the title cleaning done by `download_paper` (regex + whitespace normalization).
+- format_text: `Agentic_Summarization.format_text` on every line of 5k summaries (into a null PDF sink,
+  so only the text processing is timed).
+- build_aggregates: the string building of `aggregate_summaries` over 5k summaries.
+- extract_paper_titles: the "### Summary" title extraction of `summarize_aggregates`.
+- markdown_to_latex: the local LaTeX conversion of `convert_txt_to_latex`, on one survey per 50 summaries.
+
+Each benchmark processes its whole input per round; the best round is reported per item.
+--save-baseline stores the results in benchmarks/baselines/hot_paths.json; later runs are compared to it
+and the exit code is 1 when a benchmark is slower than the baseline by more than --threshold.
+
+Usage:
+    python -m benchmarks.hot_paths [--scale 0.1] [--rounds 5] [--only keyword_match clean_title]
+                                   [--threshold 0.1] [--save-baseline]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scraper"))
+
+from benchmarks.llm_stub import synthetic_markdown  # noqa: E402
+
+BASELINE_PATH = os.path.join(PROJECT_ROOT, "benchmarks", "baselines", "hot_paths.json")
+
+TITLE_TERMS = ["Large Language Models", "Sequential Recommendation", "Dense Retrieval", "Graph Neural Networks",
+               "Click-Through Rate Prediction", "Conversational Search", "Knowledge Graphs", "Cold-Start",
+               "Contrastive Learning", "Query Understanding", "Federated Learning", "Explainable AI"]
+TITLE_PATTERNS = ["{a} for {b}", "Towards {a} with {b}", "{a}: A Survey", "On the Robustness of {a} to {b}",
+                  "{a} Meets {b}: Lessons from {c}", "Rethinking {a} in {b} (Extended Abstract)",
+                  "Scaling {a} via {b} & {c}", "Über {a} – {b}?"]
+
+
+def dblp_titles(count, rng):
+    """
+    Titles shaped like dblp entries: trailing period, colons, parentheses and the odd non-ASCII character.
+    """
+    return [rng.choice(TITLE_PATTERNS).format(a=rng.choice(TITLE_TERMS), b=rng.choice(TITLE_TERMS),
+                                              c=rng.choice(TITLE_TERMS)) + "."
+            for _ in range(count)]
+
+
+def keyword_groups(terms_per_group, rng):
+    vocabulary = sorted({word for term in TITLE_TERMS for word in term.split()} |
+                        {f"term{i}" for i in range(terms_per_group * 3)})
+    return [rng.sample(vocabulary, terms_per_group) for _ in range(3)]
+
+
+def summaries(count, rng):
+    return [(f"Synthetic Paper {i}_summary.pdf", [synthetic_markdown(700, rng)]) for i in range(count)]
+
+
+class _NullPDF:
+    """
+    Page sink with the FPDF calls used by `format_text`, so the benchmark times only the text processing.
+    """
+
+    def set_font(self, family, style="", size=0):
+        pass
+
+    def multi_cell(self, w, h, txt=""):
+        pass
+
+
+def bench_keyword_match(data):
+    from spider.utils import keyword_match
+    titles, keywords = data["titles"], data["keywords"]
+    return len(titles), lambda: [keyword_match(title, keywords) for title in titles]
+
+
+def bench_clean_title(data):
+    from spider.utils import clean_title
+    titles = data["titles"]
+    return len(titles), lambda: [(clean_title(title), ' '.join(title.split())) for title in titles]
+
+
+def bench_format_text(data):
+    from agentic_summary.agentic_summarization import Agentic_Summarization
+    lines = [line for _, pages in data["summaries"] for page in pages for line in page.split("\n")]
+    pdf = _NullPDF()
+    return len(lines), lambda: [Agentic_Summarization.format_text(pdf, line) for line in lines]
+
+
+def bench_build_aggregates(data):
+    from agentic_summary.agentic_aggregation import Agentic_Aggregation
+    items = data["summaries"]
+    return len(items), lambda: list(Agentic_Aggregation.build_aggregates(items, 50))
+
+
+def bench_extract_paper_titles(data):
+    from agentic_summary.agentic_aggregation import Agentic_Aggregation
+    aggregates = list(Agentic_Aggregation.build_aggregates(data["summaries"], 50))
+    return len(data["summaries"]), lambda: [Agentic_Aggregation.extract_paper_titles(text) for text in aggregates]
+
+
+def bench_markdown_to_latex(data):
+    from agentic_summary.latex_converter import markdown_to_latex
+    surveys = ["\n\n".join(pages[0] for _, pages in data["summaries"][start:start + 50])
+               for start in range(0, len(data["summaries"]), 50)]
+    return len(surveys), lambda: [markdown_to_latex(survey) for survey in surveys]
+
+
+BENCHMARKS = {
+    "keyword_match": bench_keyword_match,
+    "clean_title": bench_clean_title,
+    "format_text": bench_format_text,
+    "build_aggregates": bench_build_aggregates,
+    "extract_paper_titles": bench_extract_paper_titles,
+    "markdown_to_latex": bench_markdown_to_latex,
+}
+
+
+def generate_inputs(scale, seed):
+    rng = random.Random(seed)
+    return {
+        "titles": dblp_titles(max(int(1_000_000 * scale), 1), rng),
+        "keywords": keyword_groups(100, rng),
+        "summaries": summaries(max(int(5000 * scale), 1), rng),
+    }
+
+
+def run_benchmark(setup, data, rounds):
+    items, func = setup(data)
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return {"items": items, "best_round_s": best, "per_item_ns": best / items * 1e9}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the hot per-paper and per-line functions.")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Benchmarks to run (default: all).")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Input size factor (1.0: 1M titles and 5k summaries).")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per benchmark (the best one is kept).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file.")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed slowdown per item relative to the baseline (0.10 = 10%%).")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline.")
+    args = parser.parse_args()
+
+    data = generate_inputs(args.scale, args.seed)
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results, regressions = {}, []
+    print(f"{'benchmark':22} {'items':>9} {'best s':>9} {'ns/item':>10} {'baseline':>10} {'change':>8}")
+    for name in args.only or BENCHMARKS:
+        try:
+            result = run_benchmark(BENCHMARKS[name], data, args.rounds)
+        except ImportError as e:
+            print(f"{name:22} skipped ({e})")
+            continue
+        results[name] = result
+        line = f"{name:22} {result['items']:9d} {result['best_round_s']:9.3f} {result['per_item_ns']:10.1f}"
+        base = baseline.get(name)
+        if base:
+            change = result["per_item_ns"] / base["per_item_ns"] - 1
+            line += f" {base['per_item_ns']:10.1f} {change:+8.1%}"
+            if change > args.threshold:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "scale": args.scale,
+                       "results": results}, f, indent=2)
+        print(f"\nBaseline saved to '{args.baseline}'.")
+    if regressions:
+        sys.exit(f"\nSlower than the baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Import-time budget check for the entry points:
+- Imports each entry point module in a fresh interpreter, several times, and keeps the fastest run.
+- Fails (exit code 1) when an entry point exceeds its budget, so slow top-level imports are caught early.
+- With --verbose, prints the slowest modules reported by `python -X importtime`.
+
+Usage:
+    python -m benchmarks.import_time [--runs N] [--verbose]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SCRAPER_DIR = os.path.join(PROJECT_ROOT, "scraper")
+
+# (module, working directory, budget in seconds)
+IMPORT_TIME_BUDGETS = [
+    ("automatic_main", SCRAPER_DIR, 0.5),
+    ("interactive_main", SCRAPER_DIR, 0.5),
+    ("nokeywords_automatic_main", SCRAPER_DIR, 0.3),
+    ("agentic_summary.main", PROJECT_ROOT, 3.0),
+]
+
+TIMING_SNIPPET = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def _environment():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+    return env
+
+
+def measure_import_time(module, cwd, runs=5):
+    """
+    Returns the fastest of `runs` cold imports of `module`, in seconds.
+    """
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", TIMING_SNIPPET.format(module=module)],
+            cwd=cwd, env=_environment(), capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip()}")
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return min(timings)
+
+
+def slowest_imports(module, cwd, limit=10):
+    """
+    Returns the `limit` modules with the largest cumulative import time, as (seconds, name) tuples.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, env=_environment(), capture_output=True, text=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((int(cumulative_us) / 1e6, name.strip()))
+    return sorted(entries, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check entry point import times against their budgets.")
+    parser.add_argument("--runs", type=int, default=5, help="Imports per entry point (fastest is kept).")
+    parser.add_argument("--verbose", action="store_true", help="Show the slowest imported modules.")
+    args = parser.parse_args()
+
+    over_budget = []
+    for module, cwd, budget in IMPORT_TIME_BUDGETS:
+        try:
+            elapsed = measure_import_time(module, cwd, runs=args.runs)
+        except RuntimeError as e:
+            print(f"{module}: {e}")
+            over_budget.append(module)
+            continue
+
+        status = "OK" if elapsed <= budget else "OVER BUDGET"
+        print(f"{module}: {elapsed * 1000:.0f} ms (budget {budget * 1000:.0f} ms) {status}")
+        if elapsed > budget:
+            over_budget.append(module)
+
+        if args.verbose:
+            for seconds, name in slowest_imports(module, cwd):
+                print(f"    {seconds * 1000:8.1f} ms  {name}")
+
+    if over_budget:
+        print(f"\nImport time budget exceeded: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
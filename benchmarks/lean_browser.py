@@ -0,0 +1,87 @@
+"""
+Lean browser benchmark:
+- Loads a set of listing pages with the default Chrome profile and with the lean profile.
+- Reports transferred bytes, number of subresources and load time per page, and the overall reduction.
+
+Usage:
+    python -m benchmarks.lean_browser [--runs N] [--urls URL ...]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scraper"))
+
+from config import PROCEEDINGS  # noqa: E402
+from spider.base_spider import BaseSpider  # noqa: E402
+
+
+def default_urls():
+    # One listing page per spider class, so every site layout is covered once
+    urls, seen = [], set()
+    for url, _, _, spider in PROCEEDINGS:
+        if spider.class_name not in seen:
+            seen.add(spider.class_name)
+            urls.append(url)
+    return urls
+
+
+def measure(urls, lean, runs):
+    results = {}
+    with tempfile.TemporaryDirectory() as output_path:
+        spider = BaseSpider(output_path=output_path, headless=True, lean=lean)
+        try:
+            for url in urls:
+                samples = []
+                for _ in range(runs):
+                    try:
+                        samples.append(spider.measure_page_load(url))
+                    except Exception as e:
+                        print(f"Error loading {url}: {e}")
+                if samples:
+                    results[url] = {
+                        "bytes": statistics.median(sample["bytes"] for sample in samples),
+                        "resources": statistics.median(sample["resources"] for sample in samples),
+                        "wall_time_s": statistics.median(sample["wall_time_s"] for sample in samples),
+                    }
+        finally:
+            spider.cleanup()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare page weight and load time with and without lean mode.")
+    parser.add_argument("--runs", type=int, default=3, help="Loads per page and mode (median is reported).")
+    parser.add_argument("--urls", nargs="+", help="Pages to load (default: one listing page per spider).")
+    args = parser.parse_args()
+
+    urls = args.urls or default_urls()
+    full = measure(urls, lean=False, runs=args.runs)
+    lean = measure(urls, lean=True, runs=args.runs)
+
+    print(f"\n{'page':60} {'full KB':>9} {'lean KB':>9} {'full s':>7} {'lean s':>7} {'full res':>9} {'lean res':>9}")
+    for url in urls:
+        if url not in full or url not in lean:
+            continue
+        f, l = full[url], lean[url]
+        print(f"{url[:60]:60} {f['bytes'] / 1024:9.0f} {l['bytes'] / 1024:9.0f} {f['wall_time_s']:7.2f} "
+              f"{l['wall_time_s']:7.2f} {f['resources']:9.0f} {l['resources']:9.0f}")
+
+    common = [url for url in urls if url in full and url in lean]
+    if common:
+        full_bytes = sum(full[url]["bytes"] for url in common)
+        lean_bytes = sum(lean[url]["bytes"] for url in common)
+        full_time = sum(full[url]["wall_time_s"] for url in common)
+        lean_time = sum(lean[url]["wall_time_s"] for url in common)
+        print(f"\nBytes: {full_bytes / 1024:.0f} KB -> {lean_bytes / 1024:.0f} KB "
+              f"({100 * (1 - lean_bytes / max(full_bytes, 1)):.0f}% less)")
+        print(f"Load time: {full_time:.2f} s -> {lean_time:.2f} s "
+              f"({100 * (1 - lean_time / max(full_time, 1e-9)):.0f}% less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Local OpenAI-compatible chat-completions stub, for load-testing the summarization pipeline offline:
+- Answers the routes used by the `AzureOpenAI` client (`/openai/deployments/{deployment}/chat/completions`)
+  and by the plain OpenAI client (`/v1/chat/completions`).
+- Simulates latency (`latency` + completion tokens at `tokens_per_second`), rate limiting (a fraction of
+  requests, or every request over `rpm` per minute, gets a 429 with Retry-After) and reports token usage.
+- Responses are canned (first entry of a JSON list `[{"match": substring, "content": text}]` whose
+  substring occurs in the prompt) or synthetic: Markdown summaries, or a small LaTeX document when
+  the prompt asks for LaTeX.
+
+Usage:
+    python -m benchmarks.llm_stub --port 8000 --latency 1 --tokens-per-second 80 --rate-limit 0.05
+    # then point the client at it: AZURE_ENDPOINT=http://127.0.0.1:8000 API_KEY=stub
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Rough prompt cost of one image part (a high-detail page is billed as a few hundred tiles' worth)
+IMAGE_TOKENS = 765
+WORDS = ("model retrieval recommendation language dataset evaluation baseline attention graph embedding "
+         "training benchmark transformer user ranking query signal objective latent sparse dense").split()
+
+SYNTHETIC_LATEX = r"""\documentclass[a4paper,12pt]{article}
+\usepackage[utf8]{inputenc}
+\title{Synthetic State of the Art}
+\author{LLM stub}
+\date{\today}
+\begin{document}
+\maketitle
+\begin{abstract}
+%s
+\end{abstract}
+\section{Introduction}
+%s
+\end{document}
+"""
+
+
+def estimate_prompt_tokens(messages):
+    """
+    Approximate prompt tokens: about four characters per token of text, plus a flat cost per image.
+    """
+    tokens = 0
+    for message in messages:
+        content = message.get("content") or ""
+        if isinstance(content, str):
+            tokens += len(content) // 4 + 4
+            continue
+        for part in content:
+            if part.get("type") == "image_url":
+                tokens += IMAGE_TOKENS
+            else:
+                tokens += len(part.get("text", "")) // 4
+        tokens += 4
+    return tokens
+
+
+def prompt_text(messages):
+    texts = []
+    for message in messages:
+        content = message.get("content") or ""
+        if isinstance(content, str):
+            texts.append(content)
+        else:
+            texts.extend(part.get("text", "") for part in content if part.get("type") == "text")
+    return "\n".join(texts)
+
+
+def synthetic_markdown(tokens, rng):
+    """
+    Markdown with headings, bold labels and bullet points (the constructs `format_text` handles),
+    about `tokens` tokens long.
+    """
+    lines, words = [], 0
+    section = 1
+    while words * 4 // 3 < tokens:
+        lines.append(f"### Section {section}: {' '.join(rng.choices(WORDS, k=3)).title()}")
+        for _ in range(4):
+            sentence = " ".join(rng.choices(WORDS, k=18))
+            lines.append(f"- **{rng.choice(WORDS).title()}:** {sentence.capitalize()}.")
+            words += 20
+        lines.append("")
+        section += 1
+    return "\n".join(lines)
+
+
+class StubState:
+    def __init__(self, latency=0.5, tokens_per_second=0.0, completion_tokens=800, rate_limit=0.0, rpm=0,
+                 retry_after=1.0, responses=None, seed=0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.rate_limit = rate_limit
+        self.rpm = rpm
+        self.retry_after = retry_after
+        self.responses = responses or []
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.throttled = 0
+        self.prompt_tokens = 0
+        self.generated_tokens = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def admit(self):
+        """
+        Return 0 when the request is accepted, or the Retry-After delay (seconds) of a 429.
+        """
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= 60:
+                self._recent.popleft()
+            if self.rpm and len(self._recent) >= self.rpm:
+                self.throttled += 1
+                return max(60 - (now - self._recent[0]), 0.1)
+            if self.rate_limit and self.rng.random() < self.rate_limit:
+                self.throttled += 1
+                return self.retry_after
+            self._recent.append(now)
+            return 0
+
+    def content_for(self, messages, max_tokens):
+        text = prompt_text(messages)
+        for response in self.responses:
+            if response["match"] in text:
+                return response["content"]
+        tokens = min(self.completion_tokens, max_tokens or self.completion_tokens)
+        with self._lock:
+            rng = random.Random(self.rng.random())
+        if "LaTeX" in text:
+            body = " ".join(rng.choices(WORDS, k=tokens * 3 // 4))
+            return SYNTHETIC_LATEX % (body[:400], body)
+        return synthetic_markdown(tokens, rng)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    route = re.compile(r"^(/openai/deployments/(?P<deployment>[^/]+)|/v1)?/chat/completions$")
+
+    def do_POST(self):
+        state = self.server.state
+        match = self.route.match(self.path.split("?", 1)[0])
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if match is None:
+            self._send_json(404, {"error": {"code": "404", "message": f"Unknown route {self.path}"}})
+            return
+
+        retry_after = state.admit()
+        if retry_after:
+            self._send_json(429, {"error": {"code": "429", "message": "Rate limit exceeded (stub)."}},
+                            {"Retry-After": str(max(1, math.ceil(retry_after))),
+                             "retry-after-ms": str(int(retry_after * 1000))})
+            return
+
+        messages = body.get("messages", [])
+        content = state.content_for(messages, body.get("max_tokens"))
+        prompt_tokens = estimate_prompt_tokens(messages)
+        completion_tokens = max(len(content) // 4, 1)
+        delay = state.latency
+        if state.tokens_per_second:
+            delay += completion_tokens / state.tokens_per_second
+        time.sleep(delay)
+        with state._lock:
+            state.prompt_tokens += prompt_tokens
+            state.generated_tokens += completion_tokens
+
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model") or match.group("deployment") or "stub",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LLMStub:
+    """
+    Chat-completions stub running in a background thread (see StubState for the simulation knobs).
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, **kwargs):
+        self.state = StubState(**kwargs)
+        self.server = ThreadingHTTPServer((host, port), _StubHandler)
+        self.server.daemon_threads = True
+        self.server.state = self.state
+
+    @property
+    def endpoint(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def add_stub_arguments(parser):
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds before the first token.")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="Generation speed (0 returns the whole response after --latency).")
+    parser.add_argument("--completion-tokens", type=int, default=800, help="Length of synthetic responses.")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fraction of requests answered with 429.")
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute before 429s (0: unlimited).")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of injected 429s (seconds).")
+    parser.add_argument("--responses", help="JSON file of canned responses [{\"match\": ..., \"content\": ...}].")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the 429 injection and synthetic text.")
+
+
+def stub_options(args):
+    responses = None
+    if args.responses:
+        with open(args.responses, "r", encoding="utf-8") as f:
+            responses = json.load(f)
+    return {
+        "latency": args.latency,
+        "tokens_per_second": args.tokens_per_second,
+        "completion_tokens": args.completion_tokens,
+        "rate_limit": args.rate_limit,
+        "rpm": args.rpm,
+        "retry_after": args.retry_after,
+        "responses": responses,
+        "seed": args.seed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible chat-completions stub.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    stub = LLMStub(args.host, args.port, **stub_options(args))
+    print(f"LLM stub listening on {stub.endpoint} (Ctrl+C to stop).")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+        state = stub.state
+        print(f"\n{state.requests} requests, {state.throttled} throttled, "
+              f"{state.prompt_tokens} prompt tokens, {state.generated_tokens} completion tokens.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Offline spider benchmark on recorded traffic (see scraper/spider/replay.py):
+- Record once with --record (pages and PDFs are fetched live and stored in the archive),
+  then replay any number of times without network access.
+- Reports per venue: wall time, papers/sec, page loads per paper, downloads and replay errors.
+- --save stores the results as JSON; --baseline compares the run against a saved one.
+
+Usage:
+    python -m benchmarks.spider_replay --venues NeurIPS ICLR --years 2023 --record
+    python -m benchmarks.spider_replay --venues NeurIPS ICLR --years 2023 [--latency 0.2 --error-rate 0.05]
+                                       [--sleep-scale 0] [--save results.json] [--baseline results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scraper"))
+
+from config import PROCEEDINGS, INITIAL_KEYWORDS  # noqa: E402
+from observability.metrics import REGISTRY  # noqa: E402
+from spider.base_spider import BaseSpider  # noqa: E402
+from spider.replay import ReplayServer  # noqa: E402
+
+DEFAULT_ARCHIVE = os.path.join(PROJECT_ROOT, "scraper", "output", "replay")
+
+
+def run_venue(url, acr, SpiderClass, years, keywords):
+    pages = REGISTRY.counter("pages_total", "Pages loaded by the browser")
+    papers_seen = REGISTRY.counter("papers_seen_total", "Listing entries checked, by outcome")
+    pages_before = pages.total(venue=acr)
+    seen_before = papers_seen.total(venue=acr)
+    downloaded_before = papers_seen.total(venue=acr, stage="downloaded")
+
+    with tempfile.TemporaryDirectory() as output_path:
+        start = time.perf_counter()
+        spider = SpiderClass(output_path=output_path, headless=True, venue=acr, lean=True)
+        try:
+            spider.scrape_papers(url, years, keywords)
+        finally:
+            spider.cleanup()
+        wall_time = time.perf_counter() - start
+
+    papers = papers_seen.total(venue=acr) - seen_before
+    page_loads = pages.total(venue=acr) - pages_before
+    return {
+        "wall_time_s": wall_time,
+        "papers": papers,
+        "downloaded": papers_seen.total(venue=acr, stage="downloaded") - downloaded_before,
+        "page_loads": page_loads,
+        "papers_per_s": papers / wall_time if wall_time else 0.0,
+        "page_loads_per_paper": page_loads / papers if papers else None,
+    }
+
+
+def median_result(samples):
+    result = {}
+    for key in samples[0]:
+        values = [sample[key] for sample in samples if sample[key] is not None]
+        result[key] = statistics.median(values) if values else None
+    return result
+
+
+def print_comparison(results, baseline):
+    print(f"\n{'venue':10} {'wall s':>9} {'base s':>9} {'change':>8} {'papers/s':>9} {'base p/s':>9}")
+    for acr, result in results.items():
+        base = baseline.get(acr)
+        if base is None:
+            continue
+        change = (result["wall_time_s"] - base["wall_time_s"]) / base["wall_time_s"] if base["wall_time_s"] else 0.0
+        print(f"{acr:10} {result['wall_time_s']:9.2f} {base['wall_time_s']:9.2f} {change:+8.1%} "
+              f"{result['papers_per_s']:9.2f} {base['papers_per_s']:9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark spiders against recorded traffic.")
+    parser.add_argument("--venues", nargs="+", required=True, help="Venue acronyms (e.g. NeurIPS ICLR KDD).")
+    parser.add_argument("--years", nargs="+", type=int, required=True, help="Years to scrape.")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE, help="Replay archive directory.")
+    parser.add_argument("--record", action="store_true", help="Fetch and store responses missing from the archive.")
+    parser.add_argument("--runs", type=int, default=1, help="Runs per venue (median is reported).")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay per response (seconds).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of responses replaced by errors.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the latency/error injection.")
+    parser.add_argument("--sleep-scale", type=float, default=1.0,
+                        help="Multiplier of the spiders' fixed sleeps (0 measures the spiders' own overhead).")
+    parser.add_argument("--no-keywords", action="store_true", help="Download every paper instead of filtering.")
+    parser.add_argument("--save", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against results saved with --save.")
+    args = parser.parse_args()
+
+    selected = {acr.lower() for acr in args.venues}
+    proceedings = [(url, acr, SpiderClass) for url, acr, _, SpiderClass in PROCEEDINGS if acr.lower() in selected]
+    if not proceedings:
+        parser.error(f"No known venue among {args.venues}.")
+    keywords = None if args.no_keywords else INITIAL_KEYWORDS
+    BaseSpider.sleep_scale = args.sleep_scale
+
+    results = {}
+    with ReplayServer(args.archive, record=args.record, latency=args.latency, jitter=args.jitter,
+                      error_rate=args.error_rate, seed=args.seed) as replay:
+        for url, acr, SpiderClass in proceedings:
+            samples = [run_venue(url, acr, SpiderClass, args.years, keywords) for _ in range(args.runs)]
+            results[acr] = median_result(samples)
+        print(f"\nReplay: {replay.requests} requests, {replay.misses} not recorded, "
+              f"{replay.injected_errors} injected errors.")
+
+    print(f"\n{'venue':10} {'wall s':>9} {'papers':>7} {'pdfs':>6} {'papers/s':>9} {'loads/paper':>12}")
+    for acr, result in results.items():
+        per_paper = result["page_loads_per_paper"]
+        print(f"{acr:10} {result['wall_time_s']:9.2f} {result['papers']:7.0f} {result['downloaded']:6.0f} "
+              f"{result['papers_per_s']:9.2f} {per_paper if per_paper is not None else float('nan'):12.2f}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            print_comparison(results, json.load(f)["results"])
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+        print(f"\nResults saved to '{args.save}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Summarization pipeline benchmark against the local LLM stub (see benchmarks/llm_stub.py):
+- Generates a synthetic corpus (or uses --input), then runs `process_pdfs_by_year` and
+  `summarize_summaries` with an `AzureOpenAI` client pointed at the stub.
+- Reports papers/hour, p50/p95 latency per stage (from the trace spans), peak RSS of the process
+  and of its children (pdftoppm, tectonic), token counts, the stub's 429 count and the time
+  requests waited in the LLM scheduler.
+
+Usage:
+    python -m benchmarks.summarization --papers 20 --years 2024 [--latency 2 --tokens-per-second 60]
+                                       [--rate-limit 0.1] [--tpm 30000 --rpm-quota 60] [--routes]
+                                       [--topics "Dense Retrieval" --triage ranker|llm] [--skip-aggregation]
+                                       [--save results.json]
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from agentic_summary.config import (PDF_DPI, IMAGE_QUALITY, MAX_TOKENS, TEMPERATURE, TOP_P,  # noqa: E402
+                                    FREQUENCY_PENALTY, PRESENCE_PENALTY, MAX_PDFS_PER_FILE, STAGE_ROUTES,
+                                    TRIAGE_THRESHOLD, TRIAGE_TOP_K, EXTRACTION_BACKEND, LATEX_CONVERSION)
+from agentic_summary.job_ledger import JobLedger  # noqa: E402
+from agentic_summary.llm_scheduler import LLMScheduler  # noqa: E402
+from agentic_summary.triage import PaperTriage  # noqa: E402
+from benchmarks.llm_stub import LLMStub, add_stub_arguments, stub_options  # noqa: E402
+from benchmarks.synthetic_corpus import generate_corpus  # noqa: E402
+from observability.metrics import REGISTRY  # noqa: E402
+from observability.tracing import TRACER  # noqa: E402
+
+STUB_DEPLOYMENT = "stub-deployment"
+# Spans reported per stage; LLM requests are further split by their "stage" attribute
+STAGE_SPANS = ("PaperTriage.select", "Agentic_Summarization.process_pdf", "rasterize", "encode_images",
+               "Agentic_Summarization.generate_summary", "Agentic_Summarization.convert_text_to_pdf",
+               "Agentic_Aggregation.aggregate_summaries", "Agentic_Aggregation.summarize_aggregates",
+               "Agentic_Aggregation.summarize_final_aggregate", "Agentic_Aggregation.convert_txt_to_latex",
+               "markdown_to_latex", "Agentic_Aggregation.convert_latex_to_pdf")
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def stage_latencies():
+    durations = {}
+    for item in TRACER.spans:
+        if item.name == "llm_request":
+            name = f"llm_request[{item.attributes.get('stage')} -> {item.attributes.get('model')}]"
+        elif item.name in STAGE_SPANS:
+            name = item.name
+        else:
+            continue
+        durations.setdefault(name, []).append(item.duration)
+    return {name: {"count": len(values), "p50": statistics.median(values), "p95": percentile(values, 0.95)}
+            for name, values in sorted(durations.items())}
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux (bytes on macOS)
+    scale = 1 / 1024 if sys.platform != "darwin" else 1 / 2**20
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale)
+
+
+def run(args, input_path, output_path, endpoint):
+    from openai import AzureOpenAI
+    from agentic_summary.agentic_aggregation import Agentic_Aggregation
+    from agentic_summary.agentic_summarization import Agentic_Summarization
+
+    # With --routes, the stages are routed like in production (the stub accepts any deployment name)
+    client = LLMScheduler(AzureOpenAI(azure_endpoint=endpoint, api_key="stub", api_version="2024-02-01"),
+                          args.tpm, args.rpm_quota, max_retries=args.max_retries,
+                          routes=STAGE_ROUTES if args.routes else None)
+    triage = None
+    if args.topics:
+        triage = PaperTriage(args.topics, args.triage, threshold=TRIAGE_THRESHOLD, top_k=TRIAGE_TOP_K or None,
+                             client=client, deployment_name=STUB_DEPLOYMENT)
+    summarization = Agentic_Summarization(input_path, output_path, STUB_DEPLOYMENT, client, args.dpi,
+                                          IMAGE_QUALITY, MAX_TOKENS, TEMPERATURE, TOP_P, FREQUENCY_PENALTY,
+                                          PRESENCE_PENALTY, triage=triage,
+                                          job_ledger=JobLedger(os.path.join(output_path, "jobs.db")))
+    timings = {}
+    start = time.perf_counter()
+    summarization.process_pdfs_by_year(args.years)
+    timings["summarize_s"] = time.perf_counter() - start
+
+    if not args.skip_aggregation:
+        aggregation = Agentic_Aggregation(output_path, STUB_DEPLOYMENT, client, MAX_TOKENS, TEMPERATURE, TOP_P,
+                                          FREQUENCY_PENALTY, PRESENCE_PENALTY, MAX_PDFS_PER_FILE,
+                                          extraction_backend=args.extraction_backend,
+                                          latex_conversion=args.latex_conversion)
+        start = time.perf_counter()
+        aggregation.summarize_summaries()
+        timings["aggregate_s"] = time.perf_counter() - start
+    return timings, client.utilization()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the summarization pipeline against a local LLM stub.")
+    parser.add_argument("--input", help="Existing corpus ({year}/*.pdf); a synthetic one is generated otherwise.")
+    parser.add_argument("--years", nargs="+", type=int, default=[2024])
+    parser.add_argument("--papers", type=int, default=10, help="Synthetic papers per year.")
+    parser.add_argument("--pages", type=int, default=8, help="Pages per synthetic paper.")
+    parser.add_argument("--dpi", type=int, default=PDF_DPI, help="Rasterization DPI.")
+    parser.add_argument("--max-retries", type=int, default=6, help="Scheduler retries on 429.")
+    parser.add_argument("--tpm", type=int, default=0, help="Tokens-per-minute quota paced by the scheduler.")
+    parser.add_argument("--rpm-quota", type=int, default=0,
+                        help="Requests-per-minute quota paced by the scheduler (--rpm sets the stub's limit).")
+    parser.add_argument("--routes", action="store_true", help="Route the stages with STAGE_ROUTES.")
+    parser.add_argument("--topics", nargs="+", help="Triage the papers against these topics first.")
+    parser.add_argument("--triage", choices=["ranker", "llm"], default="ranker", help="Triage method.")
+    parser.add_argument("--extraction-backend", choices=["pdfium", "pdfminer", "pypdf2"], default=EXTRACTION_BACKEND,
+                        help="Text extraction backend of the aggregation.")
+    parser.add_argument("--latex-conversion", choices=["local", "auto", "llm"], default=LATEX_CONVERSION,
+                        help="Survey to LaTeX conversion.")
+    parser.add_argument("--skip-aggregation", action="store_true", help="Only benchmark process_pdfs_by_year.")
+    parser.add_argument("--save", help="Write the results to this JSON file.")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_path = args.input
+        if input_path is None:
+            input_path = os.path.join(work_dir, "input")
+            paths = generate_corpus(input_path, args.years, args.papers, args.pages, args.seed)
+            print(f"Generated {len(paths)} synthetic PDFs.")
+        output_path = os.path.join(work_dir, "output")
+
+        with LLMStub(**stub_options(args)) as stub:
+            timings, quota = run(args, input_path, output_path, stub.endpoint)
+            state = stub.state
+
+    papers = REGISTRY.counter("papers_summarized_total", "Papers summarized").total()
+    skipped = REGISTRY.counter("papers_triage_skipped_total", "Papers skipped by the relevance triage").total()
+    self_rss, children_rss = peak_rss_mb()
+    results = {
+        "papers": papers,
+        "papers_skipped_by_triage": skipped,
+        "papers_per_hour": papers / timings["summarize_s"] * 3600 if timings["summarize_s"] else 0.0,
+        "timings": timings,
+        "stages": stage_latencies(),
+        "peak_rss_mb": {"self": self_rss, "children": children_rss},
+        "tokens": {
+            "prompt": REGISTRY.counter("llm_prompt_tokens_total", "Prompt tokens").total(),
+            "completion": REGISTRY.counter("llm_completion_tokens_total", "Completion tokens").total()
+        },
+        "stub": {"requests": state.requests, "throttled": state.throttled},
+        "quota": quota
+    }
+
+    print(f"\nPapers summarized: {papers:.0f} in {timings['summarize_s']:.1f} s "
+          f"({results['papers_per_hour']:.0f} papers/hour)")
+    if skipped:
+        print(f"Papers skipped by the triage: {skipped:.0f}")
+    if "aggregate_s" in timings:
+        print(f"Aggregation: {timings['aggregate_s']:.1f} s")
+    print(f"\n{'stage':55} {'count':>6} {'p50 s':>8} {'p95 s':>8}")
+    for name, stage in results["stages"].items():
+        print(f"{name:55} {stage['count']:6d} {stage['p50']:8.2f} {stage['p95']:8.2f}")
+    print(f"\nPeak RSS: {self_rss:.0f} MB (children: {children_rss:.0f} MB)")
+    print(f"Tokens: {results['tokens']['prompt']:.0f} prompt, {results['tokens']['completion']:.0f} completion")
+    print(f"Stub: {state.requests} requests, {state.throttled} answered with 429")
+    print(f"Scheduler: {quota['wait_seconds']:.1f}s waiting for quota, {quota['tokens_per_minute']:.0f} tokens/min")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to '{args.save}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Synthetic paper corpus for the summarization benchmark:
+- Writes `{output}/{year}/{title}.pdf`, the layout the scraper produces, with dblp-style titles
+  and pages of generated two-column-length text.
+- Deterministic for a given seed, so benchmark runs are comparable.
+
+Usage:
+    python -m benchmarks.synthetic_corpus --output /tmp/corpus --years 2023 2024 --papers 20 --pages 8
+"""
+
+import argparse
+import os
+import random
+
+from fpdf import FPDF
+
+TITLE_WORDS = {
+    "prefix": ["Towards", "Learning", "Rethinking", "Scaling", "Efficient", "Robust", "Improving", "Understanding"],
+    "topic": ["Large Language Models", "Recommender Systems", "Dense Retrieval", "Graph Neural Networks",
+              "Sequential Recommendation", "Information Retrieval", "Conversational Search", "Language Model Agents"],
+    "suffix": ["with Contrastive Pretraining", "for Cold-Start Users", "via Knowledge Distillation",
+               "under Distribution Shift", "at Scale", "with Retrieval Augmentation", "in the Wild"],
+}
+BODY_WORDS = ("we propose a novel approach that improves ranking quality on several public benchmarks while "
+              "reducing inference cost our experiments show consistent gains over strong baselines and an "
+              "ablation study confirms the contribution of each component the model is trained end to end "
+              "with a contrastive objective over user item interactions and textual side information").split()
+
+
+def synthetic_title(rng):
+    return f"{rng.choice(TITLE_WORDS['prefix'])} {rng.choice(TITLE_WORDS['topic'])} {rng.choice(TITLE_WORDS['suffix'])}"
+
+
+def write_paper(path, title, pages, rng, words_per_page=450):
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    for page in range(pages):
+        pdf.add_page()
+        if page == 0:
+            pdf.set_font("Arial", style="B", size=16)
+            pdf.multi_cell(0, 10, title)
+            pdf.set_font("Arial", size=10)
+            pdf.multi_cell(0, 6, "Anonymous Authors")
+        pdf.set_font("Arial", style="B", size=12)
+        pdf.multi_cell(0, 8, f"{page + 1}. Section")
+        pdf.set_font("Arial", size=10)
+        paragraph = []
+        for _ in range(words_per_page):
+            paragraph.append(rng.choice(BODY_WORDS))
+            if len(paragraph) == 90:
+                pdf.multi_cell(0, 5, " ".join(paragraph).capitalize() + ".")
+                paragraph = []
+        if paragraph:
+            pdf.multi_cell(0, 5, " ".join(paragraph).capitalize() + ".")
+    pdf.output(path)
+
+
+def generate_corpus(output_path, years, papers_per_year, pages=8, seed=0):
+    """
+    Generate `papers_per_year` PDFs of `pages` pages for each year and return their paths.
+    """
+    rng = random.Random(seed)
+    paths = []
+    for year in years:
+        year_path = os.path.join(output_path, str(year))
+        os.makedirs(year_path, exist_ok=True)
+        titles = set()
+        while len(titles) < papers_per_year:
+            title = synthetic_title(rng)
+            # Titles repeat quickly with the small vocabulary: number duplicates like dblp does
+            titles.add(title if title not in titles else f"{title} {len(titles)}")
+        for title in sorted(titles):
+            path = os.path.join(year_path, f"{title}.pdf")
+            write_paper(path, title, pages, rng)
+            paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic corpus of paper PDFs.")
+    parser.add_argument("--output", required=True, help="Directory receiving one folder per year.")
+    parser.add_argument("--years", nargs="+", type=int, default=[2024])
+    parser.add_argument("--papers", type=int, default=10, help="Papers per year.")
+    parser.add_argument("--pages", type=int, default=8, help="Pages per paper.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = generate_corpus(args.output, args.years, args.papers, args.pages, args.seed)
+    print(f"{len(paths)} PDFs written to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
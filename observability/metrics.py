@@ -0,0 +1,233 @@
+"""
+In-process metrics for the crawl and summarization pipelines:
+- Counters, gauges and histograms, each with optional labels (venue, year, stage, host).
+- Updated by the spiders, `download_paper` and the summarization/aggregation stages.
+- Exported at the end of a run as a Prometheus text file (node-exporter textfile format)
+  and as a JSON summary with per-second rates (pages/sec, bytes/sec, ...) and histogram p50/p95.
+
+Usage:
+    from observability.metrics import REGISTRY
+    REGISTRY.counter("pages_total", "Pages loaded").inc(venue="KDD", host="dl.acm.org")
+    REGISTRY.export("output/metrics", "scraper")
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LABEL_NAMES = ("venue", "year", "stage", "host")
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _label_key(labels):
+    unknown = set(labels) - set(LABEL_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown metric labels: {sorted(unknown)}")
+    return tuple(str(labels[name]) if labels.get(name) is not None else "" for name in LABEL_NAMES)
+
+
+def _format_labels(key, extra=None):
+    pairs = [(name, value) for name, value in zip(LABEL_NAMES, key) if value]
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _labels_dict(key):
+    return {name: value for name, value in zip(LABEL_NAMES, key) if value}
+
+
+class Counter:
+    type_name = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def total(self, **labels):
+        """
+        Sum over every series matching the given labels.
+        """
+        wanted = _label_key(labels)
+        with self._lock:
+            return sum(value for key, value in self.values.items()
+                       if all(not w or w == k for w, k in zip(wanted, key)))
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, None, value) for key, value in sorted(self.values.items())]
+
+    def summary(self):
+        with self._lock:
+            return [dict(_labels_dict(key), value=value) for key, value in sorted(self.values.items())]
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def set(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self.values[key] = value
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram:
+    type_name = "histogram"
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label key -> [bucket counts..., sum, count, max]
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.series.setdefault(key, [0] * len(self.buckets) + [0.0, 0, 0.0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-3] += value
+            series[-2] += 1
+            series[-1] = max(series[-1], value)
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe the wall time of the `with` block (also when it raises).
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _quantile(self, series, q):
+        # Upper bound of the bucket holding the q-th observation (Prometheus-style estimate)
+        rank = q * series[-2]
+        seen = 0
+        for bound, count in zip(self.buckets, series):
+            seen += count
+            if seen >= rank:
+                return series[-1] if math.isinf(bound) else min(bound, series[-1])
+        return series[-1]
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, series in sorted(self.series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    le = "+Inf" if math.isinf(bound) else repr(float(bound))
+                    samples.append((f"{self.name}_bucket", key, ("le", le), cumulative))
+                samples.append((f"{self.name}_sum", key, None, series[-3]))
+                samples.append((f"{self.name}_count", key, None, series[-2]))
+        return samples
+
+    def summary(self):
+        with self._lock:
+            return [dict(_labels_dict(key), count=series[-2], sum=series[-3], max=series[-1],
+                         mean=series[-3] / series[-2] if series[-2] else 0.0,
+                         p50=self._quantile(series, 0.5), p95=self._quantile(series, 0.95))
+                    for key, series in sorted(self.series.items())]
+
+
+class MetricsRegistry:
+    def __init__(self, namespace="literaturescout"):
+        self.namespace = namespace
+        self.metrics = {}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text, **kwargs):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, help_text, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Metric '{name}' already registered as a {metric.type_name}.")
+            return metric
+
+    def counter(self, name, help_text=""):
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name, help_text=""):
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name, help_text="", buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def to_prometheus(self):
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            full_name = f"{self.namespace}_{name}"
+            lines.append(f"# HELP {full_name} {metric.help_text or name}")
+            lines.append(f"# TYPE {full_name} {metric.type_name}")
+            for sample_name, key, extra, value in metric.samples():
+                lines.append(f"{self.namespace}_{sample_name}{_format_labels(key, extra)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def to_summary(self):
+        """
+        JSON-serializable summary: every metric by label set, plus per-second rates for counters.
+        """
+        elapsed = max(time.time() - self.started_at, 1e-9)
+        summary = {"started_at": self.started_at, "elapsed_seconds": elapsed, "metrics": {}, "rates": {}}
+        for name, metric in sorted(self.metrics.items()):
+            summary["metrics"][name] = {"type": metric.type_name, "series": metric.summary()}
+            if metric.type_name == "counter":
+                summary["rates"][f"{name}_per_second"] = metric.total() / elapsed
+        return summary
+
+    def export(self, output_dir, run_name):
+        """
+        Write `{run_name}.prom` and `{run_name}.json` into `output_dir` and return their paths.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        prom_path = os.path.join(output_dir, f"{run_name}.prom")
+        json_path = os.path.join(output_dir, f"{run_name}.json")
+        # Prometheus textfile collectors may read at any time: write to a temp file and rename
+        with open(f"{prom_path}.tmp", "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(f"{prom_path}.tmp", prom_path)
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_summary(), f, indent=2)
+        print(f"Metrics written to '{prom_path}' and '{json_path}'.")
+        return prom_path, json_path
+
+
+REGISTRY = MetricsRegistry()
+
+
+def observe_llm_call(completion, seconds, stage, year=None):
+    """
+    Record latency and token usage of one chat completion (usage fields may be missing).
+    """
+    REGISTRY.counter("llm_requests_total", "Chat completion requests").inc(stage=stage, year=year)
+    REGISTRY.histogram("llm_request_seconds", "Chat completion latency").observe(seconds, stage=stage, year=year)
+    usage = getattr(completion, "usage", None)
+    if usage is not None:
+        REGISTRY.counter("llm_prompt_tokens_total", "Prompt tokens").inc(
+            usage.prompt_tokens or 0, stage=stage, year=year)
+        REGISTRY.counter("llm_completion_tokens_total", "Completion tokens").inc(
+            usage.completion_tokens or 0, stage=stage, year=year)
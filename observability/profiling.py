@@ -0,0 +1,191 @@
+"""
+Opt-in profiling for the entry points (enabled with --profile):
+- CPU: each stage (a venue, the summarization pass, the aggregation pass, ...) is profiled separately,
+  either by a low-overhead stack sampler ("sample", default) or by cProfile ("cprofile").
+  Both write `{run}-{stage}.collapsed`, the folded-stack format read by flamegraph.pl and speedscope;
+  cProfile also writes `{run}-{stage}.prof` for pstats/snakeviz.
+- Memory: tracemalloc checkpoints between papers record current/peak traced memory; every
+  `snapshot_every` checkpoints, and at every checkpoint marked `full` (between venues/stages),
+  a snapshot is taken and the allocation sites that grew most since the previous one are reported
+  in `{run}-memory.txt`.
+
+When profiling is not enabled, `profile_stage` and `memory_checkpoint` are no-ops.
+"""
+
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+_profiler = None
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the Python stack of one thread at a fixed interval and counts folded stacks.
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def pstats_to_collapsed(stats):
+    """
+    Approximate folded stacks from cProfile caller/callee data (two-level stacks weighted by
+    inline time in microseconds), enough for a flamegraph of where time is spent.
+    """
+    folded = Counter()
+    for (filename, line, name), (_, _, inline_time, _, callers) in stats.stats.items():
+        label = f"{name} ({os.path.basename(filename)}:{line})"
+        if not callers:
+            folded[label] += int(inline_time * 1e6)
+        for (caller_file, caller_line, caller_name), caller_stats in callers.items():
+            caller_label = f"{caller_name} ({os.path.basename(caller_file)}:{caller_line})"
+            folded[f"{caller_label};{label}"] += int(caller_stats[2] * 1e6)
+    return folded
+
+
+class Profiler:
+    def __init__(self, output_dir, run_name, mode="sample", interval=0.005, snapshot_every=20, top=25):
+        if mode not in ("sample", "cprofile"):
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.output_dir = output_dir
+        self.run_name = run_name
+        self.mode = mode
+        self.interval = interval
+        self.snapshot_every = snapshot_every
+        self.top = top
+        self.checkpoints = 0
+        self.previous_snapshot = None
+        self._cprofile_active = False
+        os.makedirs(output_dir, exist_ok=True)
+        self.memory_report_path = os.path.join(output_dir, f"{run_name}-memory.txt")
+        tracemalloc.start()
+        with open(self.memory_report_path, "w", encoding="utf-8") as f:
+            f.write(f"# tracemalloc report for {run_name}\n")
+
+    def _stage_path(self, stage, extension):
+        safe_stage = re.sub(r"[^A-Za-z0-9_.-]+", "_", stage)
+        return os.path.join(self.output_dir, f"{self.run_name}-{safe_stage}.{extension}")
+
+    @staticmethod
+    def _write_collapsed(path, folded):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in folded.most_common():
+                if count > 0:
+                    f.write(f"{stack} {count}\n")
+
+    @contextmanager
+    def stage(self, name):
+        if self.mode == "sample":
+            sampler = StackSampler(threading.get_ident(), self.interval)
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                self._write_collapsed(self._stage_path(name, "collapsed"), sampler.counts)
+            return
+
+        # cProfile cannot nest: inner stages are accounted to the enclosing one
+        if self._cprofile_active:
+            yield
+            return
+        profile = cProfile.Profile()
+        self._cprofile_active = True
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._cprofile_active = False
+            profile.dump_stats(self._stage_path(name, "prof"))
+            self._write_collapsed(self._stage_path(name, "collapsed"), pstats_to_collapsed(pstats.Stats(profile)))
+
+    def checkpoint(self, label, full=False):
+        self.checkpoints += 1
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"[{time.strftime('%H:%M:%S')}] {label}: "
+                 f"current={current / 2**20:.1f} MiB peak={peak / 2**20:.1f} MiB"]
+
+        if full or self.checkpoints % self.snapshot_every == 0:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            if self.previous_snapshot is not None:
+                lines.append("  top growth since previous snapshot:")
+                for stat in snapshot.compare_to(self.previous_snapshot, "lineno")[:self.top]:
+                    if stat.size_diff <= 0:
+                        break
+                    frame = stat.traceback[0]
+                    lines.append(f"    +{stat.size_diff / 1024:.1f} KiB ({stat.count_diff:+d} blocks) "
+                                 f"{frame.filename}:{frame.lineno}")
+            self.previous_snapshot = snapshot
+
+        with open(self.memory_report_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def close(self):
+        self.checkpoint("end of run", full=True)
+        tracemalloc.stop()
+        print(f"Profiles and memory report written to '{self.output_dir}'.")
+
+
+def start_profiling(output_dir, run_name, mode="sample", **kwargs):
+    global _profiler
+    _profiler = Profiler(output_dir, run_name, mode=mode, **kwargs)
+    return _profiler
+
+
+def stop_profiling():
+    global _profiler
+    if _profiler is not None:
+        _profiler.close()
+        _profiler = None
+
+
+def profile_stage(name):
+    """
+    Profile the `with` block as stage `name` when profiling is enabled.
+    """
+    return _profiler.stage(name) if _profiler is not None else nullcontext()
+
+
+def memory_checkpoint(label, full=False):
+    if _profiler is not None:
+        _profiler.checkpoint(label, full=full)
+
+
+def add_profile_argument(parser):
+    parser.add_argument("--profile", nargs="?", const="sample", choices=["sample", "cprofile"],
+                        help="Profile each stage (stack sampling by default, or cProfile) and track memory "
+                             "with tracemalloc.")
@@ -0,0 +1,169 @@
+"""
+Lightweight, OpenTelemetry-style tracing for the crawl -> download -> summarize -> aggregate pipeline:
+- Spans with parent/child structure, tracked per thread/task through a context variable.
+- Used as a context manager (`with span("download_paper", venue="KDD"):`) or a decorator (`@traced()`).
+- Finished spans are kept in memory and exported at the end of a run, with no collector required, as:
+  - OTLP/JSON (`{run}.otlp.json`), the OpenTelemetry file format accepted by OTLP file receivers and viewers.
+  - Chrome trace events (`{run}.trace.json`), which chrome://tracing and https://ui.perfetto.dev show as a waterfall.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    def __init__(self, name, trace_id, parent_id=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+        self.thread_id = threading.get_ident()
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    @property
+    def duration(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+
+class Tracer:
+    def __init__(self, service_name="literaturescout", max_spans=500000):
+        self.service_name = service_name
+        self.max_spans = max_spans
+        self.spans = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Open a child span of the current span (or a new trace when there is none).
+        Exceptions are recorded on the span and re-raised.
+        """
+        parent = _current_span.get()
+        current = Span(name, parent.trace_id if parent else os.urandom(16).hex(),
+                       parent.span_id if parent else None, attributes)
+        token = _current_span.set(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            current.end_ns = time.time_ns()
+            _current_span.reset(token)
+            with self._lock:
+                if len(self.spans) < self.max_spans:
+                    self.spans.append(current)
+                else:
+                    self.dropped += 1
+
+    def traced(self, name=None, **attributes):
+        """
+        Decorator running the function inside a span (named after the function by default).
+        """
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, **attributes):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _otlp_value(value):
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        return {"stringValue": str(value)}
+
+    def to_otlp(self):
+        spans = []
+        for item in self.spans:
+            spans.append({
+                "traceId": item.trace_id,
+                "spanId": item.span_id,
+                "parentSpanId": item.parent_id or "",
+                "name": item.name,
+                "kind": 1,
+                "startTimeUnixNano": str(item.start_ns),
+                "endTimeUnixNano": str(item.end_ns),
+                "attributes": [{"key": key, "value": self._otlp_value(value)}
+                               for key, value in item.attributes.items()],
+                # STATUS_CODE_OK = 1, STATUS_CODE_ERROR = 2
+                "status": {"code": 2, "message": item.error} if item.error else {"code": 1}
+            })
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{"scope": {"name": "observability.tracing"}, "spans": spans}]
+        }]}
+
+    def to_chrome_trace(self):
+        events = []
+        for item in self.spans:
+            args = dict(item.attributes)
+            if item.error:
+                args["error"] = item.error
+            events.append({
+                "name": item.name,
+                "cat": "span",
+                "ph": "X",
+                "ts": item.start_ns / 1000,
+                "dur": (item.end_ns - item.start_ns) / 1000,
+                "pid": os.getpid(),
+                "tid": item.thread_id,
+                "args": args
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, output_dir, run_name):
+        """
+        Write `{run_name}.otlp.json` and `{run_name}.trace.json` into `output_dir` and return their paths.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        otlp_path = os.path.join(output_dir, f"{run_name}.otlp.json")
+        chrome_path = os.path.join(output_dir, f"{run_name}.trace.json")
+        with self._lock:
+            with open(otlp_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_otlp(), f)
+            with open(chrome_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_chrome_trace(), f)
+        message = f"Trace with {len(self.spans)} spans written to '{chrome_path}' and '{otlp_path}'"
+        print(message + (f" ({self.dropped} spans dropped)." if self.dropped else "."))
+        return otlp_path, chrome_path
+
+
+TRACER = Tracer()
+span = TRACER.span
+traced = TRACER.traced
+
+
+def current_span():
+    return _current_span.get()
+
+
+def annotate_usage(target_span, completion):
+    """
+    Copy the token usage of a chat completion onto a span (when the response reports it).
+    """
+    usage = getattr(completion, "usage", None)
+    if usage is not None:
+        target_span.set_attribute("prompt_tokens", usage.prompt_tokens or 0)
+        target_span.set_attribute("completion_tokens", usage.completion_tokens or 0)
@@ -4,13 +4,25 @@ Automatic scraper:
 - Defines a predefined range of years for paper retrieval.
 - Uses a fixed set of predefined keywords for filtering relevant research.
 - Expands keywords with related terms for improved search accuracy.
+- Reuses the cached keyword expansion unless --refresh-keywords is given.
 """
 
-from config import PROCEEDINGS, INITIAL_KEYWORDS
-from keyword_handling import augment_keywords
+import argparse
+from config import PROCEEDINGS, INITIAL_KEYWORDS, LEAN_BROWSER, LEAN_BROWSER_VENUES, METRICS_PATH, TRACES_PATH, PROFILES_PATH
+from observability.metrics import REGISTRY
+from observability.profiling import (add_profile_argument, memory_checkpoint, profile_stage, start_profiling,
+                                       stop_profiling)
+from observability.tracing import TRACER, span
+from keyword_cache import cached_augment_keywords
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Automatic scraper.")
+    parser.add_argument("--refresh-keywords", action="store_true",
+                        help="Call the LLM again instead of reusing the cached keyword expansion.")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
     # Display available sources
     print("\nAvailable sources:")
     for _, acr, title, _ in PROCEEDINGS:
@@ -30,16 +42,27 @@ def main():
     print("\nInitial keywords:", INITIAL_KEYWORDS)
 
     # Select keywords
-    selected_keywords = augment_keywords(INITIAL_KEYWORDS)
+    selected_keywords = cached_augment_keywords(INITIAL_KEYWORDS, refresh=args.refresh_keywords)
     print("\nSelected keywords:", selected_keywords)
 
+    if args.profile:
+        start_profiling(PROFILES_PATH, "automatic_main", mode=args.profile)
+
     # Perform scraping
-    for url, acr, title, SpiderClass in PROCEEDINGS:
-        if acr.lower() in selected_acronyms:
-            spider_instance = SpiderClass(headless=True)
-            print(f"\n--- Analyzing {acr}: '{title}' ---")
-            spider_instance.scrape_papers(url, selected_years, selected_keywords)
-            spider_instance.cleanup()
+    with span("automatic_main"):
+        for url, acr, title, SpiderClass in PROCEEDINGS:
+            if acr.lower() in selected_acronyms:
+                with span("scrape_venue", venue=acr), profile_stage(acr):
+                    spider_instance = SpiderClass(headless=True, venue=acr,
+                                                  lean=LEAN_BROWSER or acr in LEAN_BROWSER_VENUES)
+                    print(f"\n--- Analyzing {acr}: '{title}' ---")
+                    spider_instance.scrape_papers(url, selected_years, selected_keywords)
+                    spider_instance.cleanup()
+                memory_checkpoint(f"after {acr}", full=True)
+
+    REGISTRY.export(METRICS_PATH, "automatic_main")
+    TRACER.export(TRACES_PATH, "automatic_main")
+    stop_profiling()
 
 
 if __name__ == "__main__":
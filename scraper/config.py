@@ -1,11 +1,13 @@
-from spider.ACM_spider import ACM_spider
-from spider.ACL_spider import ACL_spider
-from spider.IJCAI_spider import IJCAI_spider
-from spider.AAAI_spider import AAAI_spider
-from spider.NeurIPS_spider import NeurIPS_spider
-from spider.ICLR_spider import ICLR_spider
-from spider.ICML_spider import ICML_spider
+from spider import LazySpider
 
+# Spider classes are resolved on first use, so importing this module does not load Selenium
+ACM_spider = LazySpider("ACM_spider")
+ACL_spider = LazySpider("ACL_spider")
+IJCAI_spider = LazySpider("IJCAI_spider")
+AAAI_spider = LazySpider("AAAI_spider")
+NeurIPS_spider = LazySpider("NeurIPS_spider")
+ICLR_spider = LazySpider("ICLR_spider")
+ICML_spider = LazySpider("ICML_spider")
 
 PROCEEDINGS = [
     ("https://dl.acm.org/conference/recsys/proceedings", "RecSys", "ACM Conference On Recommender Systems", ACM_spider),
@@ -37,3 +39,17 @@ INITIAL_KEYWORDS = [
 
 # After augmentation, this will be replaced at runtime
 AUGMENTED_KEYWORDS = None
+
+# Lean browser mode: eager page loads and no images, fonts, stylesheets or trackers
+# (per-host exceptions are listed in spider/browser_profile.py).
+# Off by default: a spider is added to LEAN_BROWSER_VENUES (by acronym, e.g. "KDD") once its listings
+# and downloads are verified to work in lean mode; LEAN_BROWSER = True enables it for every spider.
+LEAN_BROWSER = False
+LEAN_BROWSER_VENUES = set()
+
+# Prometheus text and JSON metrics written at the end of each run
+METRICS_PATH = "output/metrics"
+# Span traces (OTLP/JSON and Chrome trace format) written at the end of each run
+TRACES_PATH = "output/traces"
+# Per-stage CPU profiles and tracemalloc reports written when an entry point runs with --profile
+PROFILES_PATH = "output/profiles"
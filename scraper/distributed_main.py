@@ -0,0 +1,181 @@
+"""
+Distributed scraper:
+- Splits the crawl into work units: one listing unit per (source, year) and one download unit per paper.
+- Publishes listing units to a shared work queue (SQLite file for one host, Redis for several nodes).
+- Workers lease units with a visibility timeout, so units held by a crashed worker are picked up again.
+- Listing workers publish download units instead of downloading; download workers save into a shared output directory.
+
+Usage:
+    python distributed_main.py publish --queue output/work_queue.db --sources kdd acl --years 2023 2024
+    python distributed_main.py work --queue redis://host:6379/0 --output /shared/output
+    python distributed_main.py status --queue output/work_queue.db
+"""
+
+import argparse
+import os
+import socket
+import threading
+import time
+import uuid
+from config import PROCEEDINGS, INITIAL_KEYWORDS, LEAN_BROWSER, LEAN_BROWSER_VENUES
+from observability.metrics import REGISTRY
+from observability.tracing import TRACER, span
+from spider.work_queue import open_work_queue
+
+
+class LeaseHeartbeat(threading.Thread):
+    """
+    Keeps extending a unit's lease while it is being processed.
+    """
+
+    def __init__(self, queue, unit_id, worker_id, visibility_timeout):
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.unit_id = unit_id
+        self.worker_id = worker_id
+        self.visibility_timeout = visibility_timeout
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.visibility_timeout / 3):
+            if not self.queue.extend(self.unit_id, self.worker_id, self.visibility_timeout):
+                print(f"Lease lost for unit {self.unit_id}.")
+                return
+
+    def stop(self):
+        self.stopped.set()
+
+
+def find_source(acronym):
+    for url, acr, title, SpiderClass in PROCEEDINGS:
+        if acr.lower() == acronym.lower():
+            return url, acr, title, SpiderClass
+    raise ValueError(f"Unknown source: {acronym}")
+
+
+def publish(args):
+    queue = open_work_queue(args.queue)
+    sources = [acr for _, acr, _, _ in PROCEEDINGS] if not args.sources else args.sources
+
+    if args.no_keywords:
+        keywords = None
+    else:
+        # Keywords are expanded once here, so every worker filters with the same set
+        from keyword_cache import cached_augment_keywords
+        keywords = cached_augment_keywords(INITIAL_KEYWORDS, refresh=args.refresh_keywords)
+
+    count = 0
+    for acronym in sources:
+        _, acr, _, _ = find_source(acronym)
+        for year in args.years:
+            queue.publish("listing", {"venue": acr, "year": year, "keywords": keywords})
+            count += 1
+    print(f"Published {count} listing units.")
+
+
+def work(args):
+    queue = open_work_queue(args.queue)
+    worker_id = args.worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    download_spiders = {}
+    idle_since = time.time()
+    print(f"Worker {worker_id} started.")
+
+    try:
+        while True:
+            unit = queue.lease(worker_id, kinds=args.kinds, visibility_timeout=args.visibility_timeout)
+            if unit is None:
+                if time.time() - idle_since > args.idle_exit:
+                    print("No work left. Exiting.")
+                    break
+                time.sleep(args.poll_interval)
+                continue
+
+            heartbeat = LeaseHeartbeat(queue, unit["id"], worker_id, args.visibility_timeout)
+            heartbeat.start()
+            try:
+                with span("work_unit", stage=unit["kind"], venue=unit["payload"]["venue"],
+                          year=unit["payload"]["year"], attempt=unit["attempts"]):
+                    if unit["kind"] == "listing":
+                        process_listing(unit["payload"], queue, args)
+                    else:
+                        process_download(unit["payload"], download_spiders, args)
+                queue.complete(unit["id"], worker_id)
+            except Exception as e:
+                print(f"Unit {unit['id']} failed (attempt {unit['attempts']}): {e}")
+                queue.fail(unit["id"], worker_id, e)
+            finally:
+                heartbeat.stop()
+            idle_since = time.time()
+    finally:
+        for spider in download_spiders.values():
+            spider.cleanup()
+        REGISTRY.export(os.path.join(args.output, "metrics"), f"worker-{worker_id}")
+        TRACER.export(os.path.join(args.output, "traces"), f"worker-{worker_id}")
+
+
+def process_listing(payload, queue, args):
+    url, acr, title, SpiderClass = find_source(payload["venue"])
+    print(f"\n--- Listing {acr} {payload['year']}: '{title}' ---")
+    spider = SpiderClass(output_path=args.output, headless=True, venue=acr, work_queue=queue,
+                         lean=LEAN_BROWSER or acr in LEAN_BROWSER_VENUES)
+    try:
+        spider.scrape_papers(url, [payload["year"]], payload["keywords"])
+    finally:
+        spider.cleanup()
+
+
+def process_download(payload, download_spiders, args):
+    url, acr, _, SpiderClass = find_source(payload["venue"])
+
+    # One browser per venue and worker, logged in once, reused for all of that venue's downloads
+    spider = download_spiders.get(acr)
+    if spider is None:
+        spider = SpiderClass(output_path=args.output, headless=True, venue=acr,
+                             lean=LEAN_BROWSER or acr in LEAN_BROWSER_VENUES)
+        if hasattr(spider, "login"):
+            spider.login(url)
+        download_spiders[acr] = spider
+
+    if not spider.download(payload["pdf_url"], payload["title"], payload["year"], None,
+                           source_url=payload["source_url"]):
+        raise RuntimeError(f"Download failed: {payload['pdf_url']}")
+
+
+def status(args):
+    queue = open_work_queue(args.queue)
+    for (kind, state), count in sorted(queue.stats().items()):
+        print(f"{kind:10} {state:8} {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed scraper.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    publish_parser = subparsers.add_parser("publish", help="Publish listing units for sources and years.")
+    publish_parser.add_argument("--queue", default="output/work_queue.db",
+                                help="SQLite queue path or redis:// URL.")
+    publish_parser.add_argument("--sources", nargs="*", help="Source acronyms (default: all).")
+    publish_parser.add_argument("--years", nargs="+", type=int, required=True)
+    publish_parser.add_argument("--no-keywords", action="store_true", help="Download all papers without filtering.")
+    publish_parser.add_argument("--refresh-keywords", action="store_true")
+
+    work_parser = subparsers.add_parser("work", help="Lease and process units until the queue is drained.")
+    work_parser.add_argument("--queue", default="output/work_queue.db")
+    work_parser.add_argument("--output", default="output", help="Shared output directory.")
+    work_parser.add_argument("--kinds", nargs="+", default=["listing", "download"],
+                             choices=["listing", "download"])
+    work_parser.add_argument("--worker-id")
+    work_parser.add_argument("--visibility-timeout", type=float, default=600)
+    work_parser.add_argument("--poll-interval", type=float, default=5)
+    work_parser.add_argument("--idle-exit", type=float, default=120,
+                             help="Exit after this many seconds without available work.")
+
+    status_parser = subparsers.add_parser("status", help="Show unit counts by kind and status.")
+    status_parser.add_argument("--queue", default="output/work_queue.db")
+
+    args = parser.parse_args()
+    {"publish": publish, "work": work, "status": status}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,25 @@ Interactive scraper:
 - Users can specify the years of interest for paper retrieval.
 - Supports topic extraction from user input to refine search criteria.
 - Uses predefined keywords, augmented with related terms for comprehensive search.
+- Reuses cached topic extractions and keyword expansions unless --refresh-keywords is given.
 """
 
-from config import PROCEEDINGS
-from keyword_handling import augment_keywords, extract_topics
+import argparse
+from config import PROCEEDINGS, LEAN_BROWSER, LEAN_BROWSER_VENUES, METRICS_PATH, TRACES_PATH, PROFILES_PATH
+from observability.metrics import REGISTRY
+from observability.profiling import (add_profile_argument, memory_checkpoint, profile_stage, start_profiling,
+                                       stop_profiling)
+from observability.tracing import TRACER, span
+from keyword_cache import cached_augment_keywords, cached_extract_topics
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Interactive scraper.")
+    parser.add_argument("--refresh-keywords", action="store_true",
+                        help="Call the LLM again instead of reusing cached topics and keyword expansions.")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
     # Display available sources
     print("\nAvailable sources:")
     for _, acr, title, _ in PROCEEDINGS:
@@ -76,19 +88,30 @@ def main():
     user_query = input("\nSpecify the topics you are most interested in: ").strip()
     print(f"User query: {user_query}")
 
-    extracted_topics = extract_topics(user_query)
+    extracted_topics = cached_extract_topics(user_query, refresh=args.refresh_keywords)
     print(f"\nExtracted topics: {extracted_topics}")
 
-    selected_keywords = augment_keywords(extracted_topics)
+    selected_keywords = cached_augment_keywords(extracted_topics, refresh=args.refresh_keywords)
     print(f"\nSelected keywords: {selected_keywords}")
 
+    if args.profile:
+        start_profiling(PROFILES_PATH, "interactive_main", mode=args.profile)
+
     # Perform scraping
-    for url, acr, title, SpiderClass in PROCEEDINGS:
-        if acr.lower() in selected_acronyms:
-            spider_instance = SpiderClass(headless=False)
-            print(f"\n--- Analyzing {acr}: '{title}' ---")
-            spider_instance.scrape_papers(url, selected_years, selected_keywords)
-            spider_instance.cleanup()
+    with span("interactive_main"):
+        for url, acr, title, SpiderClass in PROCEEDINGS:
+            if acr.lower() in selected_acronyms:
+                with span("scrape_venue", venue=acr), profile_stage(acr):
+                    spider_instance = SpiderClass(headless=False, venue=acr,
+                                                  lean=LEAN_BROWSER or acr in LEAN_BROWSER_VENUES)
+                    print(f"\n--- Analyzing {acr}: '{title}' ---")
+                    spider_instance.scrape_papers(url, selected_years, selected_keywords)
+                    spider_instance.cleanup()
+                memory_checkpoint(f"after {acr}", full=True)
+
+    REGISTRY.export(METRICS_PATH, "interactive_main")
+    TRACER.export(TRACES_PATH, "interactive_main")
+    stop_profiling()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,232 @@
+"""
+Persistent, versioned cache for LLM keyword handling:
+- Stores the results of `augment_keywords` and `extract_topics` on disk.
+- Entries are keyed by the kind of call (its STAGE_ROUTES stage name), the model deployment serving
+  it (its route) and the normalized input.
+- Cached results are reused by default; a refresh stores a new version next to the old ones.
+- Two cached versions of the same expansion can be diffed group by group.
+
+Usage:
+    python keyword_cache.py list
+    python keyword_cache.py diff <entry_id> <old_version> <new_version>
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+from agentic_summary.config import DEPLOYMENT_NAME, STAGE_ROUTES
+
+KEYWORD_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "keywords")
+CACHE_FORMAT_VERSION = 1
+
+
+def normalize_groups(keyword_groups):
+    """
+    Normalize keyword groups for cache keying: terms are stripped, whitespace-collapsed and lowercased,
+    duplicates within a group are dropped and empty groups removed. Group order is preserved.
+    """
+    normalized = []
+    for group in keyword_groups:
+        terms = []
+        for term in group:
+            term = " ".join(str(term).split()).lower()
+            if term and term not in terms:
+                terms.append(term)
+        if terms:
+            normalized.append(terms)
+    return normalized
+
+
+def normalize_text(text):
+    return " ".join(text.split()).lower()
+
+
+def stage_model(kind):
+    """
+    Deployment (and endpoint, for routes served by another server) that answers a kind of call,
+    as routed by the LLM scheduler.
+    """
+    route = STAGE_ROUTES.get(kind) or {}
+    model = route.get("deployment") or DEPLOYMENT_NAME or "default"
+    return f"{route['endpoint']} {model}" if route.get("endpoint") else model
+
+
+class KeywordCache:
+    def __init__(self, cache_dir=KEYWORD_CACHE_DIR, model=None):
+        """
+        Args:
+            cache_dir (str): Directory of the cache entries.
+            model (str): Model keying every entry; by default, the deployment each kind of call is routed to.
+        """
+        self.cache_dir = cache_dir
+        self.model = model
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def model_for(self, kind):
+        return self.model or stage_model(kind)
+
+    def entry_id(self, kind, normalized_input):
+        payload = json.dumps({"kind": kind, "model": self.model_for(kind), "input": normalized_input},
+                             sort_keys=True)
+        return f"{kind}-{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]}"
+
+    def _entry_path(self, entry_id):
+        return os.path.join(self.cache_dir, f"{entry_id}.json")
+
+    def load_entry(self, entry_id):
+        path = self._entry_path(entry_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        if entry.get("format") != CACHE_FORMAT_VERSION:
+            return None
+        return entry
+
+    def get(self, kind, normalized_input, version=None):
+        """
+        Return the cached result for an input (latest version unless `version` is given), or None.
+        """
+        entry = self.load_entry(self.entry_id(kind, normalized_input))
+        if not entry or not entry["versions"]:
+            return None
+        if version is None:
+            return entry["versions"][-1]["result"]
+        for item in entry["versions"]:
+            if item["version"] == version:
+                return item["result"]
+        return None
+
+    def put(self, kind, normalized_input, result):
+        """
+        Store a new version of the result for an input and return its version number.
+        """
+        entry_id = self.entry_id(kind, normalized_input)
+        entry = self.load_entry(entry_id) or {
+            "format": CACHE_FORMAT_VERSION,
+            "kind": kind,
+            "model": self.model_for(kind),
+            "input": normalized_input,
+            "versions": []
+        }
+        version = entry["versions"][-1]["version"] + 1 if entry["versions"] else 1
+        entry["versions"].append({"version": version, "created_at": time.time(), "result": result})
+
+        # Write atomically so concurrent runs never read a truncated entry
+        path = self._entry_path(entry_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(tmp_path, path)
+        return version
+
+    def entries(self):
+        entries = []
+        for file in sorted(os.listdir(self.cache_dir)):
+            if file.endswith(".json"):
+                entry = self.load_entry(file[:-len(".json")])
+                if entry:
+                    entries.append((file[:-len(".json")], entry))
+        return entries
+
+    def diff(self, entry_id, old_version, new_version):
+        """
+        Compare two cached versions of a keyword expansion group by group (case-insensitively).
+
+        Returns:
+            list: One dict per group index with the terms "added" and "removed" in `new_version`.
+        """
+        entry = self.load_entry(entry_id)
+        if not entry:
+            raise KeyError(f"No cache entry '{entry_id}'.")
+        results = {item["version"]: item["result"] for item in entry["versions"]}
+        if old_version not in results or new_version not in results:
+            raise KeyError(f"Cache entry '{entry_id}' has versions {sorted(results)}.")
+
+        old_groups, new_groups = results[old_version], results[new_version]
+        changes = []
+        for index in range(max(len(old_groups), len(new_groups))):
+            old_terms = old_groups[index] if index < len(old_groups) else []
+            new_terms = new_groups[index] if index < len(new_groups) else []
+            if isinstance(old_terms, str):
+                old_terms = [old_terms]
+            if isinstance(new_terms, str):
+                new_terms = [new_terms]
+            old_keys = {normalize_text(term) for term in old_terms}
+            new_keys = {normalize_text(term) for term in new_terms}
+            changes.append({
+                "group": index,
+                "added": [term for term in new_terms if normalize_text(term) not in old_keys],
+                "removed": [term for term in old_terms if normalize_text(term) not in new_keys]
+            })
+        return changes
+
+
+def cached_augment_keywords(keywords, refresh=False, cache=None):
+    """
+    Cached wrapper around `augment_keywords`. The LLM is only called when no expansion is cached
+    for these keyword groups and model, or when `refresh` is set.
+    """
+    cache = cache or KeywordCache()
+    normalized = normalize_groups(keywords)
+    if not refresh:
+        cached = cache.get("augment_keywords", normalized)
+        if cached is not None:
+            print("Using cached keyword expansion.")
+            return cached
+
+    from keyword_handling import augment_keywords
+    augmented = augment_keywords(keywords)
+    version = cache.put("augment_keywords", normalized, augmented)
+    print(f"Keyword expansion cached (version {version}).")
+    return augmented
+
+
+def cached_extract_topics(user_input, refresh=False, cache=None):
+    """
+    Cached wrapper around `extract_topics`, keyed by the normalized user query.
+    """
+    cache = cache or KeywordCache()
+    normalized = normalize_text(user_input)
+    if not refresh:
+        cached = cache.get("extract_topics", normalized)
+        if cached is not None:
+            print("Using cached topic extraction.")
+            return cached
+
+    from keyword_handling import extract_topics
+    topics = extract_topics(user_input)
+    cache.put("extract_topics", normalized, topics)
+    return topics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the keyword cache.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="List cached entries and their versions.")
+    diff_parser = subparsers.add_parser("diff", help="Diff two versions of a cached expansion.")
+    diff_parser.add_argument("entry_id")
+    diff_parser.add_argument("old_version", type=int)
+    diff_parser.add_argument("new_version", type=int)
+    args = parser.parse_args()
+
+    cache = KeywordCache()
+    if args.command == "list":
+        for entry_id, entry in cache.entries():
+            versions = ", ".join(str(item["version"]) for item in entry["versions"])
+            print(f"{entry_id} [{entry['model']}] versions: {versions}")
+            print(f"    input: {entry['input']}")
+    else:
+        for change in cache.diff(args.entry_id, args.old_version, args.new_version):
+            print(f"\nGroup {change['group']}:")
+            for term in change["added"]:
+                print(f"  + {term}")
+            for term in change["removed"]:
+                print(f"  - {term}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,35 @@
 import json
 import re
-from openai import AzureOpenAI
 from agentic_summary.config import (
     API_KEY, AZURE_ENDPOINT, DEPLOYMENT_NAME, API_VERSION,
-    MAX_TOKENS, TEMPERATURE, TOP_P, FREQUENCY_PENALTY, PRESENCE_PENALTY
+    MAX_TOKENS, TEMPERATURE, TOP_P, FREQUENCY_PENALTY, PRESENCE_PENALTY,
+    TOKENS_PER_MINUTE, REQUESTS_PER_MINUTE, USAGE_LEDGER_PATH, MODEL_PRICES, STAGE_ROUTES
 )
+from agentic_summary.llm_scheduler import LLMScheduler
+from agentic_summary.usage_ledger import UsageLedger, usage_context
 
-# Initialize the Azure OpenAI client with API credentials and configuration settings
-client = AzureOpenAI(
-    azure_endpoint=AZURE_ENDPOINT,
-    azure_deployment=DEPLOYMENT_NAME,
-    api_key=API_KEY,
-    api_version=API_VERSION
-)
+_client = None
+
+
+def get_client():
+    """
+    Returns the shared Azure OpenAI client, creating it on first use so that importing this module
+    neither loads the OpenAI SDK nor requires the API environment variables.
+    Requests go through an LLMScheduler pacing them against the deployment's quotas, and are
+    recorded in the usage ledger; each stage is routed to its deployment by STAGE_ROUTES.
+    """
+    global _client
+    if _client is None:
+        from openai import AzureOpenAI
+
+        # Initialize the Azure OpenAI client with API credentials and configuration settings
+        _client = LLMScheduler(AzureOpenAI(
+            azure_endpoint=AZURE_ENDPOINT,
+            api_key=API_KEY,
+            api_version=API_VERSION
+        ), TOKENS_PER_MINUTE, REQUESTS_PER_MINUTE, ledger=UsageLedger(USAGE_LEDGER_PATH, prices=MODEL_PRICES),
+            routes=STAGE_ROUTES)
+    return _client
 
 
 def extract_topics(user_input):
@@ -48,17 +65,18 @@ def extract_topics(user_input):
         {"role": "user", "content": prompt}
     ]
 
-    completion = client.chat.completions.create(
-        model=DEPLOYMENT_NAME,
-        messages=chat_prompt,
-        max_tokens=MAX_TOKENS,
-        temperature=TEMPERATURE,
-        top_p=TOP_P,
-        frequency_penalty=FREQUENCY_PENALTY,
-        presence_penalty=PRESENCE_PENALTY,
-        stop=None,
-        stream=False
-    )
+    with usage_context(stage="extract_topics"):
+        completion = get_client().chat.completions.create(
+            model=DEPLOYMENT_NAME,
+            messages=chat_prompt,
+            max_tokens=MAX_TOKENS,
+            temperature=TEMPERATURE,
+            top_p=TOP_P,
+            frequency_penalty=FREQUENCY_PENALTY,
+            presence_penalty=PRESENCE_PENALTY,
+            stop=None,
+            stream=False
+        )
 
     # Extract and clean the response
     answer = completion.choices[0].message.content.strip()
@@ -133,17 +151,18 @@ def augment_keywords(keywords):
         {"role": "user", "content": prompt}
     ]
 
-    completion = client.chat.completions.create(
-        model=DEPLOYMENT_NAME,
-        messages=chat_prompt,
-        max_tokens=MAX_TOKENS,
-        temperature=TEMPERATURE,
-        top_p=TOP_P,
-        frequency_penalty=FREQUENCY_PENALTY,
-        presence_penalty=PRESENCE_PENALTY,
-        stop=None,
-        stream=False
-    )
+    with usage_context(stage="augment_keywords"):
+        completion = get_client().chat.completions.create(
+            model=DEPLOYMENT_NAME,
+            messages=chat_prompt,
+            max_tokens=MAX_TOKENS,
+            temperature=TEMPERATURE,
+            top_p=TOP_P,
+            frequency_penalty=FREQUENCY_PENALTY,
+            presence_penalty=PRESENCE_PENALTY,
+            stop=None,
+            stream=False
+        )
 
     # Extract and clean the response
     answer = completion.choices[0].message.content.strip()
@@ -5,10 +5,19 @@ No-Keywords Automatic scraper:
 - Downloads all available papers without filtering by keywords.
 """
 
-from config import PROCEEDINGS
+import argparse
+from config import PROCEEDINGS, LEAN_BROWSER, LEAN_BROWSER_VENUES, METRICS_PATH, TRACES_PATH, PROFILES_PATH
+from observability.metrics import REGISTRY
+from observability.profiling import (add_profile_argument, memory_checkpoint, profile_stage, start_profiling,
+                                       stop_profiling)
+from observability.tracing import TRACER, span
 
 
 def main():
+    parser = argparse.ArgumentParser(description="No-keywords automatic scraper.")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
     # Display available sources
     print("\nAvailable sources:")
     for _, acr, title, _ in PROCEEDINGS:
@@ -48,13 +57,24 @@ def main():
     selected_years = sorted(selected_years, reverse=True)
     print("\nSelected years:", selected_years)
 
+    if args.profile:
+        start_profiling(PROFILES_PATH, "nokeywords_automatic_main", mode=args.profile)
+
     # Perform scraping
-    for url, acr, title, SpiderClass in PROCEEDINGS:
-        if acr.lower() in selected_acronyms:
-            spider_instance = SpiderClass(headless=True)
-            print(f"\n--- Analyzing {acr}: '{title}' ---")
-            spider_instance.scrape_papers(url, selected_years, None)
-            spider_instance.cleanup()
+    with span("nokeywords_automatic_main"):
+        for url, acr, title, SpiderClass in PROCEEDINGS:
+            if acr.lower() in selected_acronyms:
+                with span("scrape_venue", venue=acr), profile_stage(acr):
+                    spider_instance = SpiderClass(headless=True, venue=acr,
+                                                  lean=LEAN_BROWSER or acr in LEAN_BROWSER_VENUES)
+                    print(f"\n--- Analyzing {acr}: '{title}' ---")
+                    spider_instance.scrape_papers(url, selected_years, None)
+                    spider_instance.cleanup()
+                memory_checkpoint(f"after {acr}", full=True)
+
+    REGISTRY.export(METRICS_PATH, "nokeywords_automatic_main")
+    TRACER.export(TRACES_PATH, "nokeywords_automatic_main")
+    stop_profiling()
 
 
 if __name__ == "__main__":
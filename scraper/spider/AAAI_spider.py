@@ -1,11 +1,9 @@
+from observability.tracing import span
 from .base_spider import BaseSpider
-from .utils import download_paper
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import re
-import time
-import os
 
 
 class AAAI_spider(BaseSpider):
@@ -14,7 +12,7 @@ class AAAI_spider(BaseSpider):
         retry_delay = 30
 
         try:
-            self.driver.get(link)
+            self.get(link)
             # Collect pagination if exists
             page_links = [link]
             # Attempt to find a "Next" button
@@ -30,7 +28,7 @@ class AAAI_spider(BaseSpider):
 
             year_url_mapping = {}
             for page in page_links:
-                self.driver.get(page)
+                self.get(page)
                 sections = self.wait_for_all_presence(
                     By.XPATH, "//h2/a[@class='title' and contains(@href, '/view/')]/..", timeout=10
                 )
@@ -64,45 +62,47 @@ class AAAI_spider(BaseSpider):
                     print(f"Year {yr} not selected. Skipping.")
                     continue
 
-                for attempt_year in range(1, max_retries + 1):
-                    try:
-                        self.driver.get(y_url)
-                        WebDriverWait(self.driver, 10).until(
-                            EC.presence_of_all_elements_located(
-                                (By.XPATH, "//a[contains(@class, 'obj_galley_link') and contains(@class, 'pdf')]")
+                with span("scrape_year", venue=self.venue, year=yr):
+                    for attempt_year in range(1, max_retries + 1):
+                        try:
+                            self.get(y_url)
+                            WebDriverWait(self.driver, 10).until(
+                                EC.presence_of_all_elements_located(
+                                    (By.XPATH, "//a[contains(@class, 'obj_galley_link') and contains(@class, 'pdf')]")
+                                )
                             )
-                        )
-                        pdf_links = self.driver.find_elements(By.XPATH,
-                            "//a[contains(@class, 'obj_galley_link') and contains(@class, 'pdf')]")
-                        print(f"Found {len(pdf_links)} PDFs for year {yr}.")
+                            # Galley links and the titles they are labelled by, in one round trip
+                            records = self.extract_records(
+                                "//a[contains(@class, 'obj_galley_link') and contains(@class, 'pdf')]",
+                                {"title": {"idref": "aria-labelledby"}}
+                            )
+                            print(f"Found {len(records)} PDFs for year {yr}.")
 
-                        for pdf_link in pdf_links:
-                            for attempt_pdf in range(1, max_retries + 1):
-                                try:
-                                    pdf_url = pdf_link.get_attribute("href")
-                                    article_id = pdf_link.get_attribute("aria-labelledby")
-                                    title_element = self.driver.find_element(By.XPATH, f"//a[@id='{article_id}']")
-                                    pdf_title = title_element.text.strip()
+                            for record in records:
+                                for attempt_pdf in range(1, max_retries + 1):
+                                    try:
+                                        pdf_url = record["href"]
+                                        pdf_title = record["title"]
+                                        if not pdf_title:
+                                            print(f"Title not found for PDF link: {pdf_url}")
+                                            break
 
-                                    print(f"Checking PDF: {pdf_title} (Year: {yr})")
-                                    download_paper(
-                                        pdf_url, pdf_title, os.path.join(self.output_path, str(yr)),
-                                        self.driver, keywords
-                                    )
-                                    break
-                                except Exception as e:
-                                    print(f"Error scraping PDF attempt {attempt_pdf}: {e}")
-                                    if attempt_pdf < max_retries:
-                                        time.sleep(retry_delay)
-                                    else:
-                                        print("PDF scraping failed after all attempts.")
-                        break
-                    except Exception as e:
-                        print(f"Error scraping year {yr}, attempt {attempt_year}: {e}")
-                        if attempt_year < max_retries:
-                            time.sleep(retry_delay)
-                        else:
-                            print(f"Year {yr} scraping failed after all attempts.")
+                                        print(f"Checking PDF: {pdf_title} (Year: {yr})")
+                                        self.download(pdf_url, pdf_title, yr, keywords, source_url=y_url)
+                                        break
+                                    except Exception as e:
+                                        print(f"Error scraping PDF attempt {attempt_pdf}: {e}")
+                                        if attempt_pdf < max_retries:
+                                            self.sleep(retry_delay, "retry")
+                                        else:
+                                            print("PDF scraping failed after all attempts.")
+                            break
+                        except Exception as e:
+                            print(f"Error scraping year {yr}, attempt {attempt_year}: {e}")
+                            if attempt_year < max_retries:
+                                self.sleep(retry_delay, "retry")
+                            else:
+                                print(f"Year {yr} scraping failed after all attempts.")
 
         except Exception as e:
             print(f"Error scraping AAAI: {e}")
@@ -1,11 +1,9 @@
-import os
 import re
-import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
+from observability.tracing import span
 from .base_spider import BaseSpider
-from .utils import download_paper
 
 
 class ACL_spider(BaseSpider):
@@ -14,7 +12,7 @@ class ACL_spider(BaseSpider):
         retry_delay = 30
 
         try:
-            self.driver.get(link)
+            self.get(link)
             WebDriverWait(self.driver, 5).until(
                 EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a[href*='events/']"))
             )
@@ -40,48 +38,48 @@ class ACL_spider(BaseSpider):
                     continue
 
                 print(f"\nYear {year} selected!")
-                for attempt_year in range(1, max_retries + 1):
-                    try:
-                        self.driver.get(year_url)
-                        WebDriverWait(self.driver, 15).until(
-                            EC.presence_of_all_elements_located((By.XPATH, "//a[contains(@href, '.pdf') and @data-original-title='Open PDF']"))
-                        )
+                with span("scrape_year", venue=self.venue, year=yr):
+                    for attempt_year in range(1, max_retries + 1):
+                        try:
+                            self.get(year_url)
+                            WebDriverWait(self.driver, 15).until(
+                                EC.presence_of_all_elements_located((By.XPATH, "//a[contains(@href, '.pdf') and @data-original-title='Open PDF']"))
+                            )
 
-                        pdf_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '.pdf') and @data-original-title='Open PDF']")
-                        print(f"Found {len(pdf_links)} PDFs for year {year}.")
+                            # PDF links and their titles in one round trip: the title link is '/<paper id>/'
+                            # for a PDF at '/<paper id>.pdf'
+                            records = self.extract_records(
+                                "//a[contains(@href, '.pdf') and @data-original-title='Open PDF']",
+                                {"title": {"path_from_href": [r"^.*/([^/]+)\.pdf$", "/$1/"]}}
+                            )
+                            print(f"Found {len(records)} PDFs for year {year}.")
 
-                        for pdf_link in pdf_links:
-                            for attempt_pdf in range(1, max_retries + 1):
-                                try:
-                                    pdf_url = pdf_link.get_attribute("href")
-                                    # Derive title link
-                                    new_url = pdf_url.replace('.pdf', '')
-                                    relative_new_url = "/" + new_url.split("/")[-1] + "/"
-                                    title_element = WebDriverWait(self.driver, 10).until(
-                                        EC.presence_of_element_located(
-                                            (By.XPATH, f"//a[contains(@href, '{relative_new_url}')]")
-                                        )
-                                    )
-                                    pdf_title = title_element.text.strip()
+                            for record in records:
+                                for attempt_pdf in range(1, max_retries + 1):
+                                    try:
+                                        pdf_url = record["href"]
+                                        pdf_title = record["title"]
+                                        if not pdf_title:
+                                            print(f"Title not found for PDF link: {pdf_url}")
+                                            break
 
-                                    print(f"Processing PDF: {pdf_title} (Year: {year})")
-                                    download_paper(pdf_url, pdf_title, os.path.join(self.output_path, year),
-                                                   self.driver, keywords)
-                                    break
-                                except Exception as e:
-                                    print(f"Error scraping PDF attempt {attempt_pdf}: {e}")
-                                    if attempt_pdf < max_retries:
-                                        time.sleep(retry_delay)
-                                    else:
-                                        print("PDF scraping failed after all attempts.")
-                        break
+                                        print(f"Processing PDF: {pdf_title} (Year: {year})")
+                                        self.download(pdf_url, pdf_title, yr, keywords, source_url=year_url)
+                                        break
+                                    except Exception as e:
+                                        print(f"Error scraping PDF attempt {attempt_pdf}: {e}")
+                                        if attempt_pdf < max_retries:
+                                            self.sleep(retry_delay, "retry")
+                                        else:
+                                            print("PDF scraping failed after all attempts.")
+                            break
 
-                    except Exception as e:
-                        print(f"Error scraping year {year}, attempt {attempt_year}: {e}")
-                        if attempt_year < max_retries:
-                            time.sleep(retry_delay)
-                        else:
-                            print(f"Year {year} scraping failed after all attempts.")
+                        except Exception as e:
+                            print(f"Error scraping year {year}, attempt {attempt_year}: {e}")
+                            if attempt_year < max_retries:
+                                self.sleep(retry_delay, "retry")
+                            else:
+                                print(f"Year {year} scraping failed after all attempts.")
 
         except Exception as e:
             print(f"Error scraping ACL: {e}")
@@ -1,9 +1,9 @@
 import time
 import re
-import os
 from fuzzywuzzy import fuzz
+from observability.tracing import span
 from .base_spider import BaseSpider
-from .utils import download_paper, load_credentials
+from .utils import load_credentials
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -11,7 +11,28 @@ from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
 
 
+# Opens every collapsed TOC section in one pass; the page then fires its lazy section requests
+# concurrently. Each control is clicked at most once so a slow handler is never toggled closed again.
+# Returns the number of sections opened by this call and the PDF links loaded so far.
+EXPAND_TOC_SCRIPT = """
+let opened = 0;
+for (const control of document.querySelectorAll('.accordion-tabbed__control')) {
+    if (control.getAttribute('aria-expanded') !== 'true' && !control.dataset.tocExpanded) {
+        control.dataset.tocExpanded = 'true';
+        control.click();
+        opened++;
+    }
+}
+return [opened, document.querySelectorAll("a[href*='/doi/pdf/']").length];
+"""
+
+
 class ACM_spider(BaseSpider):
+    # Institutional login on the ACM Digital Library, reused across runs
+    session_name = "acm"
+    session_origin = "https://dl.acm.org"
+    logged_in_marker = "institution__name"
+
     def safe_click(self, by, locator, timeout=10, retries=10):
         """
         Safely click an element identified by (by, locator).
@@ -26,7 +47,7 @@ class ACM_spider(BaseSpider):
                 return True
             except StaleElementReferenceException:
                 print(f"Stale element on safe_click attempt {attempt+1}, retrying...")
-                time.sleep(1)
+                self.sleep(1, "retry")
         return False
 
     def safe_find(self, by, locator, timeout=10, retries=3):
@@ -42,9 +63,56 @@ class ACM_spider(BaseSpider):
                 return element
             except StaleElementReferenceException:
                 print(f"Stale element on safe_find attempt {attempt+1}, retrying...")
-                time.sleep(1)
+                self.sleep(1, "retry")
         return None
 
+    def load_table_of_contents(self, timeout=60, settle=2, poll=0.5):
+        """
+        Expand every section of an ACM proceedings table of contents without clicking
+        the accordions one by one, and return the complete paper list.
+
+        All collapsed sections are opened by one script, then the page is polled until no new
+        section appears and the number of PDF links has not changed for `settle` seconds.
+
+        Returns:
+            list: One dict per paper with "title", "doi", "pdf_url" and "url" (the DOI page).
+        """
+        WebDriverWait(self.driver, 30).until(
+            lambda driver: driver.find_elements(By.CLASS_NAME, "accordion-tabbed__control")
+            or driver.find_elements(By.XPATH, "//a[contains(@href, '/doi/pdf/')]")
+        )
+
+        deadline = time.time() + timeout
+        last_count, stable_since = -1, time.time()
+        while time.time() < deadline:
+            opened, count = self.driver.execute_script(EXPAND_TOC_SCRIPT)
+            if count != last_count or opened:
+                last_count, stable_since = count, time.time()
+            elif time.time() - stable_since >= settle:
+                break
+            self.sleep(poll, "poll")
+        else:
+            print(f"Table of contents still loading after {timeout}s, using the {last_count} PDF links found.")
+
+        # The title links to '/doi/<doi>' for a PDF at '/doi/pdf/<doi>'
+        records = self.extract_records(
+            "//a[contains(@href, '/doi/pdf/')]",
+            {"title": {"path_from_href": ["^/doi/pdf/", "/doi/"]}}
+        )
+        papers, seen = [], set()
+        for record in records:
+            doi = record["href"].split("/doi/pdf/", 1)[-1]
+            if doi in seen:
+                continue
+            seen.add(doi)
+            papers.append({
+                "title": record["title"],
+                "doi": doi,
+                "pdf_url": record["href"],
+                "url": record["href"].replace("/doi/pdf/", "/doi/")
+            })
+        return papers
+
     def login(self, link):
         max_retries = 5
         retry_delay = 30
@@ -52,23 +120,28 @@ class ACM_spider(BaseSpider):
 
         if not username or not password:
             print("No ACM credentials provided. Proceeding without login.")
-            self.driver.get(link)
+            self.get(link)
+            return
+
+        if self.restore_session():
+            print("Reusing saved ACM login session.")
+            self.get(link)
             return
 
         for attempt_login in range(1, max_retries + 1):
             try:
-                self.driver.get("https://dl.acm.org/action/showLogin")
+                self.get("https://dl.acm.org/action/showLogin")
                 # Let the page load
-                time.sleep(3)
+                self.sleep(3, "login")
 
                 if not self.safe_click(By.XPATH, "//a[@data-simple-tab-id='institutional-login']", timeout=10):
                     raise TimeoutException("Institutional login button not clickable.")
 
-                time.sleep(2)
+                self.sleep(2, "login")
                 if not self.safe_click(By.XPATH, "//i[@class='icon-arrow_d_n']", timeout=10):
                     raise TimeoutException("Dropdown arrow not clickable.")
 
-                time.sleep(2)
+                self.sleep(2, "login")
                 search_input = self.safe_find(By.XPATH, "//input[@placeholder='Search Institution name']", timeout=10)
                 if not search_input:
                     raise TimeoutException("Search input not found.")
@@ -80,7 +153,7 @@ class ACM_spider(BaseSpider):
                     raise TimeoutException("Institution option not found.")
                 self.click_element(institution_option)
 
-                time.sleep(2)
+                self.sleep(2, "login")
                 username_field = self.safe_find(By.ID, "username", timeout=10)
                 password_field = self.safe_find(By.ID, "password", timeout=10)
                 if not username_field or not password_field:
@@ -95,21 +168,22 @@ class ACM_spider(BaseSpider):
                 if not institution_elem:
                     raise TimeoutException("Institution name element not found after login.")
 
-                time.sleep(5)
+                self.sleep(5, "login")
                 institution_name = institution_elem.text
                 similarity = fuzz.ratio(institution.lower(), institution_name.lower())
                 if similarity >= 70:
-                    self.driver.get(link)
+                    self.save_session()
+                    self.get(link)
                     print("Login successful!")
                     break
 
             except Exception as e:
                 print(f"Login attempt {attempt_login} failed: {e}")
                 if attempt_login < max_retries:
-                    time.sleep(retry_delay)
+                    self.sleep(retry_delay, "retry")
                 else:
                     print("Unable to login after all attempts.")
-                    self.driver.get(link)
+                    self.get(link)
                     break
 
     def scrape_papers(self, link, selected_years, keywords):
@@ -118,12 +192,12 @@ class ACM_spider(BaseSpider):
         self.login(link)
 
         try:
-            time.sleep(8)
+            self.sleep(8)
             if not self.safe_click(By.XPATH, "//span[@class='btn' and text()='View All Proceedings']", timeout=15):
                 print("Could not click 'View All Proceedings' button.")
                 return
 
-            time.sleep(8)
+            self.sleep(8)
             # Wait for proceedings links
             WebDriverWait(self.driver, 15).until(
                 EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a[href*='/doi/proceedings/']"))
@@ -159,71 +233,41 @@ class ACM_spider(BaseSpider):
                     continue
 
                 print(f"\nYear {year} selected!")
-                for attempt_year in range(1, max_retries + 1):
-                    try:
-                        self.driver.get(year_url)
-
-                        # Expand collapses
-                        time.sleep(8)
-                        # Repeatedly find elements and click them to reduce staleness
-                        paper_collapses = WebDriverWait(self.driver, 30).until(
-                            EC.presence_of_all_elements_located((By.CLASS_NAME, "accordion-tabbed__control"))
-                        )
-
-                        time.sleep(8)
-                        for pc in paper_collapses:
-                            try:
-                                if pc.get_attribute("aria-expanded") != "true":
-                                    self.click_element(pc)
-                                    time.sleep(1)
-                            except StaleElementReferenceException:
-                                # Re-locate and retry if stale
-                                paper_collapses = self.driver.find_elements(By.CLASS_NAME, "accordion-tabbed__control")
-                                for pc_retry in paper_collapses:
-                                    if pc_retry.get_attribute("aria-expanded") != "true":
-                                        self.click_element(pc_retry)
-                                        time.sleep(1)
-
-                        # Wait for PDF links
-                        time.sleep(8)
-                        WebDriverWait(self.driver, 10).until(
-                            EC.presence_of_all_elements_located((By.XPATH, "//a[contains(@href, '/doi/pdf/')]"))
-                        )
-
-                        pdf_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/doi/pdf/')]")
-                        print(f"Found {len(pdf_links)} PDFs for year {year}.")
-
-                        for pdf_link in pdf_links:
-                            for attempt_pdf in range(1, max_retries + 1):
-                                try:
-                                    pdf_url = pdf_link.get_attribute("href")
-                                    doi_url = pdf_url.replace('/pdf', '')
-                                    relative_doi_url = "/doi" + doi_url.split("/doi")[-1]
-
-                                    # Re-locate the title element each time
-                                    title_element = WebDriverWait(self.driver, 10).until(
-                                        EC.presence_of_element_located((By.XPATH, f"//a[contains(@href, '{relative_doi_url}')]"))
-                                    )
-                                    pdf_title = title_element.text.strip()
-
-                                    print(f"Processing PDF: {pdf_title} (Year: {year})")
-                                    download_paper(pdf_url, pdf_title, os.path.join(self.output_path, year),
-                                                   self.driver, keywords)
-                                    break
-                                except (StaleElementReferenceException, TimeoutException) as e:
-                                    print(f"Error scraping PDF attempt {attempt_pdf}: {e}")
-                                    if attempt_pdf < max_retries:
-                                        time.sleep(retry_delay)
-                                    else:
-                                        print("PDF scraping failed after all attempts.")
-                        break
-
-                    except Exception as e:
-                        print(f"Error scraping year {year}, attempt {attempt_year}: {e}")
-                        if attempt_year < max_retries:
-                            time.sleep(retry_delay)
-                        else:
-                            print(f"Year {year} scraping failed after all attempts.")
+                with span("scrape_year", venue=self.venue, year=yr):
+                    for attempt_year in range(1, max_retries + 1):
+                        try:
+                            self.get(year_url)
+
+                            papers = self.load_table_of_contents()
+                            print(f"Found {len(papers)} PDFs for year {year}.")
+
+                            for paper in papers:
+                                for attempt_pdf in range(1, max_retries + 1):
+                                    try:
+                                        pdf_url = paper["pdf_url"]
+                                        doi_url = paper["url"]
+                                        pdf_title = paper["title"]
+                                        if not pdf_title:
+                                            print(f"Title not found for PDF link: {pdf_url}")
+                                            break
+
+                                        print(f"Processing PDF: {pdf_title} (Year: {year})")
+                                        self.download(pdf_url, pdf_title, yr, keywords, source_url=doi_url)
+                                        break
+                                    except (StaleElementReferenceException, TimeoutException) as e:
+                                        print(f"Error scraping PDF attempt {attempt_pdf}: {e}")
+                                        if attempt_pdf < max_retries:
+                                            self.sleep(retry_delay, "retry")
+                                        else:
+                                            print("PDF scraping failed after all attempts.")
+                            break
+
+                        except Exception as e:
+                            print(f"Error scraping year {year}, attempt {attempt_year}: {e}")
+                            if attempt_year < max_retries:
+                                self.sleep(retry_delay, "retry")
+                            else:
+                                print(f"Year {year} scraping failed after all attempts.")
 
         except Exception as e:
             print(f"Error scraping ACM: {e}")
\ No newline at end of file
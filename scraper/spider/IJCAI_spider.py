@@ -1,11 +1,9 @@
-import os
 import re
-import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
+from observability.tracing import span
 from .base_spider import BaseSpider
-from .utils import download_paper
 
 
 class IJCAI_spider(BaseSpider):
@@ -14,7 +12,7 @@ class IJCAI_spider(BaseSpider):
         retry_delay = 30
 
         try:
-            self.driver.get(link)
+            self.get(link)
             WebDriverWait(self.driver, 15).until(
                 EC.presence_of_all_elements_located((By.XPATH, "//a[contains(@href, '/proceedings')]"))
             )
@@ -38,63 +36,65 @@ class IJCAI_spider(BaseSpider):
                     continue
 
                 print(f"\nYear {yr} selected!")
-                for attempt_year in range(1, max_retries + 1):
-                    try:
-                        self.driver.get(year_url)
+                with span("scrape_year", venue=self.venue, year=yr):
+                    for attempt_year in range(1, max_retries + 1):
+                        try:
+                            self.get(year_url)
 
-                        # Different logic depending on year
-                        if yr >= 2017:
-                            WebDriverWait(self.driver, 10).until(
-                                EC.presence_of_all_elements_located((By.CLASS_NAME, "paper_wrapper"))
-                            )
-                            paper_sections = self.driver.find_elements(By.CLASS_NAME, "paper_wrapper")
-                        elif 2015 <= yr <= 2016:
-                            WebDriverWait(self.driver, 10).until(
-                                EC.presence_of_all_elements_located((By.XPATH, "//p[contains(., 'PDF')]"))
-                            )
-                            paper_sections = self.driver.find_elements(By.XPATH, "//p[contains(., 'PDF')]")
-                        else:
-                            WebDriverWait(self.driver, 10).until(
-                                EC.presence_of_all_elements_located((By.XPATH, "//a[contains(@href, '.pdf')]"))
-                            )
-                            paper_sections = self.driver.find_elements(By.XPATH, "//a[contains(@href, '.pdf')]")
+                            # Different logic depending on year
+                            if yr >= 2017:
+                                WebDriverWait(self.driver, 10).until(
+                                    EC.presence_of_all_elements_located((By.CLASS_NAME, "paper_wrapper"))
+                                )
+                                records = self.extract_records("//*[contains(concat(' ', @class, ' '), ' paper_wrapper ')]", {
+                                    "title": {"xpath": ".//*[contains(concat(' ', @class, ' '), ' title ')]"},
+                                    "pdf_url": {"xpath": ".//a[contains(@href, '.pdf')]", "attr": "href"}
+                                })
+                            elif 2015 <= yr <= 2016:
+                                WebDriverWait(self.driver, 10).until(
+                                    EC.presence_of_all_elements_located((By.XPATH, "//p[contains(., 'PDF')]"))
+                                )
+                                records = self.extract_records("//p[contains(., 'PDF')]", {
+                                    "pdf_url": {"xpath": ".//a[contains(@href, '.pdf')]", "attr": "href"}
+                                })
+                                for record in records:
+                                    record["title"] = record["text"].split("/")[0].strip()
+                            else:
+                                WebDriverWait(self.driver, 10).until(
+                                    EC.presence_of_all_elements_located((By.XPATH, "//a[contains(@href, '.pdf')]"))
+                                )
+                                records = self.extract_records("//a[contains(@href, '.pdf')]")
+                                for record in records:
+                                    record["title"], record["pdf_url"] = record["text"], record["href"]
 
-                        print(f"Found {len(paper_sections)} PDFs for year {yr}.")
+                            print(f"Found {len(records)} PDFs for year {yr}.")
 
-                        for section in paper_sections:
-                            for attempt_pdf in range(1, max_retries + 1):
-                                try:
-                                    if yr > 2016:
-                                        title_element = section.find_element(By.CLASS_NAME, "title")
-                                        pdf_title = title_element.text.strip()
-                                        pdf_link_element = section.find_element(By.XPATH, ".//a[contains(@href, '.pdf')]")
-                                        pdf_url = pdf_link_element.get_attribute("href")
-                                    elif 2015 <= yr <= 2016:
-                                        pdf_title = section.text.split("/")[0].strip()
-                                        pdf_link_element = section.find_element(By.XPATH, ".//a[contains(@href, '.pdf')]")
-                                        pdf_url = pdf_link_element.get_attribute("href")
-                                    else:
-                                        pdf_title = section.text.strip()
-                                        pdf_url = section.get_attribute("href")
+                            for record in records:
+                                for attempt_pdf in range(1, max_retries + 1):
+                                    try:
+                                        pdf_title = record["title"]
+                                        pdf_url = record["pdf_url"]
+                                        if not pdf_title or not pdf_url:
+                                            print(f"Title or PDF link not found for entry: {record['text'][:80]}")
+                                            break
 
-                                    print(f"Processing PDF: {pdf_title} (Year: {yr})")
-                                    download_paper(pdf_url, pdf_title, os.path.join(self.output_path, str(yr)),
-                                                   self.driver, keywords)
-                                    break
-                                except Exception as e:
-                                    print(f"Error scraping PDF attempt {attempt_pdf}: {e}")
-                                    if attempt_pdf < max_retries:
-                                        time.sleep(retry_delay)
-                                    else:
-                                        print("PDF scraping failed after all attempts.")
-                        break
+                                        print(f"Processing PDF: {pdf_title} (Year: {yr})")
+                                        self.download(pdf_url, pdf_title, yr, keywords, source_url=year_url)
+                                        break
+                                    except Exception as e:
+                                        print(f"Error scraping PDF attempt {attempt_pdf}: {e}")
+                                        if attempt_pdf < max_retries:
+                                            self.sleep(retry_delay, "retry")
+                                        else:
+                                            print("PDF scraping failed after all attempts.")
+                            break
 
-                    except Exception as e:
-                        print(f"Error scraping year {yr}, attempt {attempt_year}: {e}")
-                        if attempt_year < max_retries:
-                            time.sleep(retry_delay)
-                        else:
-                            print(f"Year {yr} scraping failed after all attempts.")
+                        except Exception as e:
+                            print(f"Error scraping year {yr}, attempt {attempt_year}: {e}")
+                            if attempt_year < max_retries:
+                                self.sleep(retry_delay, "retry")
+                            else:
+                                print(f"Year {yr} scraping failed after all attempts.")
 
         except Exception as e:
             print(f"Error scraping IJCAI: {e}")
@@ -0,0 +1,31 @@
+import importlib
+
+
+class LazySpider:
+    """
+    Placeholder for a spider class that imports its module (and Selenium with it) only when
+    the spider is first instantiated or resolved, so listing sources stays cheap.
+    """
+
+    def __init__(self, class_name):
+        self.class_name = class_name
+        self._spider_class = None
+
+    def resolve(self):
+        if self._spider_class is None:
+            module = importlib.import_module(f".{self.class_name}", __name__)
+            self._spider_class = getattr(module, self.class_name)
+        return self._spider_class
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"LazySpider({self.class_name!r})"
+
+
+def get_spider(class_name):
+    """
+    Return the spider class with the given name (e.g. "ACM_spider"), importing its module on demand.
+    """
+    return LazySpider(class_name).resolve()
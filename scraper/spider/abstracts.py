@@ -0,0 +1,60 @@
+"""
+Abstracts read from the first page of the downloaded PDFs, for the catalog's full-text index and
+the relevance triage. The dblp listings crawled by the spiders carry no abstracts, so the PDF is
+the one source every venue has.
+"""
+
+import re
+
+# Text between "Abstract" and the first heading that usually follows it
+ABSTRACT_PATTERN = re.compile(
+    r"\babstract\b[\s.:—-]*(.*?)"
+    r"(?=\n\s*(?:1\.?|I\.)?\s*(?:introduction|keywords|index terms|ccs concepts)\b|\Z)",
+    re.IGNORECASE | re.DOTALL
+)
+# Shorter matches are headers or table-of-contents noise rather than an abstract
+MIN_ABSTRACT_CHARS = 200
+
+
+def find_abstract(text, max_chars=3000):
+    """
+    Returns the abstract found in the first-page text, or None when there is none.
+    """
+    match = ABSTRACT_PATTERN.search(text)
+    if match and len(match.group(1).strip()) >= MIN_ABSTRACT_CHARS:
+        return " ".join(match.group(1).split())[:max_chars]
+    return None
+
+
+def extract_abstract(text, max_chars=3000):
+    """
+    Returns the abstract found in the first-page text, or the whole text when there is none.
+    """
+    return find_abstract(text, max_chars) or " ".join(text.split())[:max_chars]
+
+
+def read_first_pages(pdf_path, pages=1):
+    """
+    Extracts the text of the first `pages` pages of a PDF.
+
+    Returns:
+        tuple: The extracted text and the page count of the PDF.
+    """
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(pdf_path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages[:pages]), len(reader.pages)
+
+
+def pdf_abstract(pdf_path):
+    """
+    Abstract of a downloaded PDF, None when it has none, cannot be read, or PyPDF2 is not installed.
+    """
+    try:
+        text, _ = read_first_pages(pdf_path)
+    except ImportError:
+        return None
+    except Exception as e:
+        print(f"Could not read the abstract of '{pdf_path}': {e}")
+        return None
+    return find_abstract(text)
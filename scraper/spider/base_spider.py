@@ -1,9 +1,72 @@
+import json
 import os
+import time
 import chromedriver_autoinstaller
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from observability.metrics import REGISTRY
+from observability.profiling import memory_checkpoint
+from observability.tracing import span
+from .browser_profile import blocked_url_patterns, host_of, lean_chrome_prefs, PAGE_METRICS_SCRIPT
+from .catalog import PaperCatalog
+from .pdf_store import STORE_DIR, PdfStore
+from .replay import active_replay, original_url, rewrite_url
+from selenium.common.exceptions import WebDriverException
+from .utils import build_http_session, download_paper, keyword_match, clean_title, sync_session_cookies
+
+
+# Collects one record per node matched by an XPath in a single WebDriver round trip.
+# Field specs: {"xpath": relative XPath} | {"idref": attribute holding an element id}
+#              | {"path_from_href": [regex, replacement]} (first link on the page whose path equals the
+#              item's href path rewritten by the regex), each optionally with "attr" (default: text).
+EXTRACT_RECORDS_SCRIPT = """
+const itemXPath = arguments[0];
+const fields = arguments[1];
+const valueOf = (node, attr) => {
+    if (!node) return null;
+    if (!attr) return (node.innerText || node.textContent || '').trim();
+    if (attr === 'href' && node.href !== undefined) return node.href;
+    return node.getAttribute(attr);
+};
+let linksByPath = null;
+const linkByPath = (path) => {
+    if (linksByPath === null) {
+        linksByPath = new Map();
+        for (const a of document.querySelectorAll('a[href]')) {
+            const p = new URL(a.href, document.baseURI).pathname;
+            if (!linksByPath.has(p)) linksByPath.set(p, a);
+        }
+    }
+    if (linksByPath.has(path)) return linksByPath.get(path);
+    for (const a of document.querySelectorAll('a[href]')) {
+        if (a.getAttribute('href').includes(path)) return a;
+    }
+    return null;
+};
+const snapshot = document.evaluate(itemXPath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const records = [];
+for (let i = 0; i < snapshot.snapshotLength; i++) {
+    const item = snapshot.snapshotItem(i);
+    const record = {href: item.href || item.getAttribute('href'), text: valueOf(item, null)};
+    for (const [name, spec] of Object.entries(fields)) {
+        let node = null;
+        if (spec.xpath) {
+            node = document.evaluate(spec.xpath, item, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        } else if (spec.idref) {
+            const id = item.getAttribute(spec.idref);
+            node = id ? document.getElementById(id) : null;
+        } else if (spec.path_from_href && record.href) {
+            const path = new URL(record.href, document.baseURI).pathname;
+            node = linkByPath(path.replace(new RegExp(spec.path_from_href[0]), spec.path_from_href[1]));
+        }
+        record[name] = valueOf(node, spec.attr);
+    }
+    records.push(record);
+}
+return JSON.stringify(records);
+"""
 
 
 class BaseSpider:
@@ -12,14 +75,37 @@ class BaseSpider:
     and utility methods for waiting, clicking, and extracting elements.
     """
 
-    def __init__(self, output_path="output", headless=True):
+    # Spiders with a login flow set these to persist their session across runs (see restore_session)
+    session_name = None
+    session_origin = None
+    logged_in_marker = None
+    # Multiplier of every fixed sleep (the replay benchmark lowers it to measure the spider's own overhead)
+    sleep_scale = 1.0
+
+    def __init__(self, output_path="output", headless=True, venue=None, catalog_path=None, work_queue=None,
+                 lean=False):
         self.output_path = output_path
+        # Lean mode: eager page loads, no images, and CDP-blocked fonts, stylesheets and trackers
+        self.lean = lean
+        self._blocked_patterns = None
+        # When set, download() publishes download units to this queue instead of downloading
+        self.work_queue = work_queue
+        # Venue acronym used to label catalog records (e.g. "KDD" for an ACM_spider instance)
+        self.venue = venue or type(self).__name__.replace("_spider", "")
+        self.catalog = PaperCatalog(catalog_path or os.path.join(output_path, "catalog.db"))
+        # PDFs are kept once in a content-addressed store, with `output/{venue}/{year}` views
+        self.store = PdfStore(os.path.join(output_path, STORE_DIR))
+        # HTTP session sharing the browser's cookies, built on the first download (i.e. after login)
+        self._http_session = None
         #self.driver_path = chromedriver_autoinstaller.chromedriver_filename
         #self.service = Service(self.driver_path)
         self.driver = self._init_driver(headless=headless)
 
     def _init_driver(self, headless=True):
         options = webdriver.ChromeOptions()
+        if self.lean:
+            # Return from get() at DOMContentLoaded instead of waiting for every subresource
+            options.page_load_strategy = "eager"
         if headless:
             options.add_argument("--headless")
             # Set a larger window size to ensure elements are visible
@@ -36,13 +122,63 @@ class BaseSpider:
             )
 
         # Configure download preferences
-        options.add_experimental_option("prefs", {
+        prefs = {
             "download.default_directory": os.path.abspath(self.output_path),
             "plugins.always_open_pdf_externally": True
-        })
+        }
+        if self.lean:
+            prefs.update(lean_chrome_prefs())
+        options.add_experimental_option("prefs", prefs)
+        replay = active_replay()
+        if replay is not None and not replay.record:
+            # Replaying: keep the browser offline, every request must be answered by the replay servers
+            options.add_argument("--host-resolver-rules=MAP * ~NOTFOUND , EXCLUDE 127.0.0.1")
 
         #return webdriver.Chrome(service=self.service, options=options)
-        return webdriver.Chrome(options=options)
+        driver = webdriver.Chrome(options=options)
+        if self.lean:
+            driver.execute_cdp_cmd("Network.enable", {})
+        return driver
+
+    def get(self, url):
+        """
+        Navigate to `url`. In lean mode, first update the CDP URL blocklist for the target host,
+        so allowlisted hosts keep the resource types their pages need.
+        While a replay server is active, the page is loaded from it instead of the real host.
+        """
+        url = original_url(url)
+        if self.lean:
+            patterns = blocked_url_patterns(url)
+            if patterns != self._blocked_patterns:
+                self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+                self._blocked_patterns = patterns
+        host = host_of(url)
+        with span("page_load", host=host, url=url), \
+                REGISTRY.histogram("page_load_seconds", "Browser page load time").time(venue=self.venue, host=host):
+            self.driver.get(rewrite_url(url))
+        REGISTRY.counter("pages_total", "Pages loaded by the browser").inc(venue=self.venue, host=host)
+
+    def sleep(self, seconds, stage="wait"):
+        """
+        Fixed sleep, accounted per stage so retry rates and time spent waiting show up in the metrics.
+        """
+        seconds *= self.sleep_scale
+        REGISTRY.counter("sleeps_total", "Fixed sleeps").inc(venue=self.venue, stage=stage)
+        REGISTRY.counter("sleep_seconds_total", "Time spent in fixed sleeps").inc(seconds, venue=self.venue, stage=stage)
+        with span("sleep", stage=stage, seconds=seconds):
+            time.sleep(seconds)
+
+    def measure_page_load(self, url):
+        """
+        Load `url` and return its wall-clock load time and the bytes transferred for the page
+        and its subresources, as reported by the Navigation and Resource Timing APIs.
+        """
+        start = time.perf_counter()
+        self.get(url)
+        elapsed = time.perf_counter() - start
+        metrics = self.driver.execute_script(PAGE_METRICS_SCRIPT)
+        metrics["wall_time_s"] = elapsed
+        return metrics
 
     def wait_for_presence(self, by, locator, timeout=10):
         return WebDriverWait(self.driver, timeout).until(EC.presence_of_element_located((by, locator)))
@@ -50,6 +186,20 @@ class BaseSpider:
     def wait_for_all_presence(self, by, locator, timeout=10):
         return WebDriverWait(self.driver, timeout).until(EC.presence_of_all_elements_located((by, locator)))
 
+    def extract_records(self, item_xpath, fields=None):
+        """
+        Extract every node matching `item_xpath` as a plain record in one `execute_script` call,
+        instead of one WebDriver round trip per element and attribute.
+
+        Args:
+            item_xpath (str): XPath of the item nodes (usually the PDF or detail links).
+            fields (dict): Extra fields per record, see EXTRACT_RECORDS_SCRIPT for the spec format.
+
+        Returns:
+            list: One dict per item with "href", "text" and the requested fields (None when missing).
+        """
+        return json.loads(self.driver.execute_script(EXTRACT_RECORDS_SCRIPT, item_xpath, fields or {}))
+
     def click_element(self, element):
         self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
         self.driver.execute_script("arguments[0].click();", element)
@@ -57,8 +207,95 @@ class BaseSpider:
     def get_cookies_dict(self):
         return {cookie['name']: cookie['value'] for cookie in self.driver.get_cookies()}
 
+    @property
+    def http_session(self):
+        if self._http_session is None:
+            self._http_session = build_http_session(self.driver)
+        return self._http_session
+
+    def restore_session(self):
+        """
+        Restore the saved login session of this spider into the browser (and HTTP session).
+        The saved cookies are first validated with a single HTTP request against `session_origin`.
+
+        Returns:
+            bool: True if a valid session was restored, False if a login is needed.
+        """
+        from .session_store import SessionStore, session_is_valid
+
+        store = SessionStore()
+        state = store.load(self.session_name)
+        if state is None:
+            return False
+        user_agent = self.driver.execute_script("return navigator.userAgent;")
+        if not session_is_valid(state, state["origin"], self.logged_in_marker, user_agent=user_agent):
+            print(f"Saved session '{self.session_name}' is no longer logged in.")
+            store.clear(self.session_name)
+            return False
+
+        # Cookies can only be set for the domain currently loaded
+        self.get(state["origin"])
+        for cookie in state["cookies"]:
+            try:
+                self.driver.add_cookie(cookie)
+            except WebDriverException as e:
+                print(f"Could not restore cookie '{cookie['name']}': {e.msg}")
+        self.driver.execute_script(
+            "for (const [key, value] of Object.entries(arguments[0])) { localStorage.setItem(key, value); }",
+            state["local_storage"]
+        )
+        if self._http_session is not None:
+            sync_session_cookies(self._http_session, self.driver)
+        return True
+
+    def save_session(self):
+        """
+        Save the browser's cookies and local storage for `session_origin` (the browser must be on that origin).
+        """
+        from .session_store import SessionStore
+
+        local_storage = self.driver.execute_script("return Object.assign({}, window.localStorage);")
+        SessionStore().save(self.session_name, self.session_origin, self.driver.get_cookies(), local_storage)
+        print(f"Login session '{self.session_name}' saved.")
+
+    def download(self, pdf_url, pdf_title, year, keywords, source_url=None):
+        """
+        Download a paper into the PDF store, with a view in `output/{venue}/{year}`, and record it in the
+        catalog under this spider's venue.
+        With a work queue attached, matching papers are published as download units instead.
+        """
+        with span("paper", venue=self.venue, year=int(year), title=pdf_title) as paper_span:
+            if self.work_queue is not None:
+                result = self.enqueue_download(pdf_url, pdf_title, year, keywords, source_url)
+            else:
+                result = download_paper(pdf_url, pdf_title, os.path.join(self.output_path, self.venue, str(year)),
+                                        self.driver, keywords, catalog=self.catalog, venue=self.venue, year=year,
+                                        source_url=source_url, session=self.http_session, store=self.store)
+            paper_span.set_attribute("downloaded", bool(result))
+        memory_checkpoint(f"{self.venue} {year}: {pdf_title}")
+        return result
+
+    def enqueue_download(self, pdf_url, pdf_title, year, keywords, source_url=None):
+        self.catalog.add_paper(self.venue, year, ' '.join(pdf_title.split()), source_url=source_url, pdf_url=pdf_url)
+        if keywords is not None and not keyword_match(clean_title(pdf_title), keywords):
+            print(f"Skipping PDF '{pdf_title}': does not match keywords.")
+            return False
+
+        self.work_queue.publish("download", {
+            "venue": self.venue,
+            "year": int(year),
+            "title": pdf_title,
+            "pdf_url": pdf_url,
+            "source_url": source_url
+        })
+        print(f"Queued PDF '{pdf_title}' for download.")
+        return True
+
     def cleanup(self):
+        if self._http_session is not None:
+            self._http_session.close()
         self.driver.quit()
+        self.catalog.close()
 
     def scrape_papers(self, link, selected_years, keywords):
         """
@@ -0,0 +1,78 @@
+from urllib.parse import urlparse
+
+
+# URL patterns blocked through CDP Network.setBlockedURLs in lean mode, grouped by resource type
+LEAN_BLOCKED_URL_PATTERNS = {
+    "images": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "css": ["*.css"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.ogg"],
+    "trackers": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+        "*facebook.net*", "*hotjar.com*", "*scorecardresearch.com*", "*crazyegg.com*", "*nr-data.net*",
+        "*newrelic.com*", "*addthis.com*", "*adobedtm.com*", "*omtrdc.net*", "*cookielaw.org*"
+    ],
+}
+
+# Resource types that stay enabled on hosts whose pages break without them
+LEAN_HOST_ALLOWLIST = {
+    # ACM's accordions and "View All Proceedings" button rely on stylesheets for visibility checks
+    "dl.acm.org": ["css"],
+}
+
+
+def host_of(url):
+    return urlparse(url).hostname or ""
+
+
+def allowed_resource_types(url, allowlist=LEAN_HOST_ALLOWLIST):
+    """
+    Resource types allowed for the host of `url`, including allowlist entries for parent domains.
+    """
+    host = host_of(url)
+    allowed = set()
+    for allowed_host, types in allowlist.items():
+        if host == allowed_host or host.endswith("." + allowed_host):
+            allowed.update(types)
+    return allowed
+
+
+def blocked_url_patterns(url, patterns=LEAN_BLOCKED_URL_PATTERNS, allowlist=LEAN_HOST_ALLOWLIST):
+    """
+    URL patterns to block while loading `url`, after removing the resource types allowed for its host.
+    """
+    allowed = allowed_resource_types(url, allowlist)
+    if "*" in allowed:
+        return []
+    return [pattern for resource_type, type_patterns in patterns.items() if resource_type not in allowed
+            for pattern in type_patterns]
+
+
+def lean_chrome_prefs(allowlist=LEAN_HOST_ALLOWLIST):
+    """
+    Chrome preferences disabling images, with per-site exceptions for allowlisted hosts.
+    Web fonts have no content setting and are blocked through CDP patterns only.
+    """
+    image_exceptions = {
+        f"[*.]{host},*": {"setting": 1}
+        for host, types in allowlist.items() if "images" in types or "*" in types
+    }
+    return {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.content_settings.exceptions.images": image_exceptions,
+    }
+
+
+# JavaScript returning transferred bytes and timings for the current page (Navigation/Resource Timing APIs)
+PAGE_METRICS_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0] || {};
+const resources = performance.getEntriesByType('resource');
+let bytes = nav.transferSize || 0;
+for (const r of resources) { bytes += r.transferSize || 0; }
+return {
+    bytes: bytes,
+    resources: resources.length,
+    dom_content_loaded_ms: nav.domContentLoadedEventEnd || 0,
+    load_ms: nav.loadEventEnd || 0
+};
+"""
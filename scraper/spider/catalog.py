@@ -0,0 +1,244 @@
+import os
+import sqlite3
+import time
+
+
+class PaperCatalog:
+    """
+    Local SQLite catalog of every paper seen by the spiders, with a full-text index
+    (FTS5) on title and abstract. Abstracts are read from the first page of the downloaded
+    PDFs (see abstracts.py); papers that are not downloaded are indexed by title only.
+
+    Each spider records one row per listing entry, whether or not the PDF is downloaded,
+    so keyword filtering, "what do we already have" checks and summarization selection
+    can run as queries instead of re-crawling or walking the output directories.
+    """
+
+    def __init__(self, db_path="output/catalog.db"):
+        self.db_path = db_path
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.fts_enabled = True
+        self._create_schema()
+
+    def _create_schema(self):
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS papers (
+                id INTEGER PRIMARY KEY,
+                venue TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                abstract TEXT,
+                source_url TEXT,
+                pdf_url TEXT,
+                pdf_path TEXT,
+                sha256 TEXT,
+                downloaded INTEGER NOT NULL DEFAULT 0,
+                added_at REAL NOT NULL,
+                UNIQUE (venue, year, title)
+            )
+        """)
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(papers)")}
+        if "sha256" not in columns:
+            # Catalogs created before the content-addressed PDF store
+            self.conn.execute("ALTER TABLE papers ADD COLUMN sha256 TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS papers_venue_year ON papers (venue, year)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS papers_sha256 ON papers (sha256)")
+
+        try:
+            self.conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                    title, abstract, content='papers', content_rowid='id'
+                )
+            """)
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: fall back to LIKE queries in search()
+            print("SQLite FTS5 not available, catalog search will use LIKE queries.")
+            self.fts_enabled = False
+
+        if self.fts_enabled:
+            # Keep the external-content index in sync with the papers table
+            self.conn.executescript("""
+                CREATE TRIGGER IF NOT EXISTS papers_ai AFTER INSERT ON papers BEGIN
+                    INSERT INTO papers_fts(rowid, title, abstract) VALUES (new.id, new.title, new.abstract);
+                END;
+                CREATE TRIGGER IF NOT EXISTS papers_ad AFTER DELETE ON papers BEGIN
+                    INSERT INTO papers_fts(papers_fts, rowid, title, abstract)
+                    VALUES ('delete', old.id, old.title, old.abstract);
+                END;
+                CREATE TRIGGER IF NOT EXISTS papers_au AFTER UPDATE OF title, abstract ON papers BEGIN
+                    INSERT INTO papers_fts(papers_fts, rowid, title, abstract)
+                    VALUES ('delete', old.id, old.title, old.abstract);
+                    INSERT INTO papers_fts(rowid, title, abstract) VALUES (new.id, new.title, new.abstract);
+                END;
+            """)
+        self.conn.commit()
+
+    def add_paper(self, venue, year, title, source_url=None, pdf_url=None, abstract=None, pdf_path=None):
+        """
+        Insert a paper, or update the known fields of an existing (venue, year, title) record.
+        Fields passed as None never overwrite a value already stored.
+
+        Returns:
+            int: The id of the catalog record.
+        """
+        downloaded = 1 if pdf_path else 0
+        self.conn.execute("""
+            INSERT INTO papers (venue, year, title, abstract, source_url, pdf_url, pdf_path, downloaded, added_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (venue, year, title) DO UPDATE SET
+                abstract = COALESCE(excluded.abstract, abstract),
+                source_url = COALESCE(excluded.source_url, source_url),
+                pdf_url = COALESCE(excluded.pdf_url, pdf_url),
+                pdf_path = COALESCE(excluded.pdf_path, pdf_path),
+                downloaded = MAX(downloaded, excluded.downloaded)
+        """, (venue, int(year), title, abstract, source_url, pdf_url, pdf_path, downloaded, time.time()))
+        self.conn.commit()
+        row = self.conn.execute(
+            "SELECT id FROM papers WHERE venue = ? AND year = ? AND title = ?", (venue, int(year), title)
+        ).fetchone()
+        return row["id"]
+
+    def mark_downloaded(self, venue, year, title, pdf_path, sha256=None):
+        """
+        Record the downloaded PDF of a paper: its path (the venue/year view) and, for PDFs
+        in the content-addressed store, its SHA-256.
+        """
+        self.conn.execute("""
+            UPDATE papers SET pdf_path = ?, sha256 = COALESCE(?, sha256), downloaded = 1
+            WHERE venue = ? AND year = ? AND title = ?
+        """, (pdf_path, sha256, venue, int(year), title))
+        self.conn.commit()
+
+    def stored_hash(self, venue, year, title):
+        """
+        SHA-256 of a downloaded paper's PDF, None when it is not downloaded or not in the store.
+        """
+        row = self.conn.execute(
+            "SELECT sha256 FROM papers WHERE venue = ? AND year = ? AND title = ? AND downloaded = 1",
+            (venue, int(year), title)
+        ).fetchone()
+        return row["sha256"] if row else None
+
+    @staticmethod
+    def _filters(venue=None, year=None, downloaded_only=False, prefix="papers."):
+        clauses, params = [], []
+        if venue is not None:
+            clauses.append(f"{prefix}venue = ?")
+            params.append(venue)
+        if year is not None:
+            years = [year] if isinstance(year, int) else list(year)
+            clauses.append(f"{prefix}year IN ({', '.join('?' for _ in years)})")
+            params.extend(int(y) for y in years)
+        if downloaded_only:
+            clauses.append(f"{prefix}downloaded = 1")
+        return clauses, params
+
+    def papers(self, venue=None, year=None, downloaded_only=False):
+        """
+        List catalog records, optionally filtered by venue, year (int or iterable of ints)
+        and download status.
+        """
+        clauses, params = self._filters(venue, year, downloaded_only)
+        query = "SELECT * FROM papers"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY year DESC, venue, title"
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def search(self, query, venue=None, year=None, downloaded_only=False, limit=100):
+        """
+        Full-text search on title and abstract. `query` uses FTS5 syntax
+        (e.g. '"language model" AND recommend*'); results are ordered by bm25 rank.
+        """
+        clauses, params = self._filters(venue, year, downloaded_only)
+        if self.fts_enabled:
+            sql = ("SELECT papers.*, bm25(papers_fts) AS rank FROM papers_fts "
+                   "JOIN papers ON papers.id = papers_fts.rowid WHERE papers_fts MATCH ?")
+            params = [query] + params
+            order = " ORDER BY rank"
+        else:
+            sql = "SELECT papers.* FROM papers WHERE (title LIKE ? OR abstract LIKE ?)"
+            params = [f"%{query}%", f"%{query}%"] + params
+            order = " ORDER BY year DESC"
+        for clause in clauses:
+            sql += " AND " + clause
+        sql += order + " LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def match_keywords(self, keywords, min_groups=2, venue=None, year=None):
+        """
+        Catalog equivalent of `keyword_match`: returns the records whose title matches
+        at least `min_groups` keyword groups, using one FTS query per group.
+        Options are matched as word-prefix phrases rather than raw substrings.
+        """
+        if not self.fts_enabled:
+            from .utils import keyword_match
+            return [p for p in self.papers(venue, year) if keyword_match(p["title"], keywords, min_groups)]
+
+        counts = {}
+        for group in keywords:
+            phrases = " OR ".join('"{}"*'.format(option.replace('"', '""')) for option in group)
+            query = f"title : ({phrases})"
+            clauses, params = self._filters(venue, year)
+            sql = ("SELECT papers.id FROM papers_fts JOIN papers ON papers.id = papers_fts.rowid "
+                   "WHERE papers_fts MATCH ?")
+            for clause in clauses:
+                sql += " AND " + clause
+            for row in self.conn.execute(sql, [query] + params):
+                counts[row["id"]] = counts.get(row["id"], 0) + 1
+
+        ids = [paper_id for paper_id, count in counts.items() if count >= min_groups]
+        if not ids:
+            return []
+        placeholders = ", ".join("?" for _ in ids)
+        rows = self.conn.execute(
+            f"SELECT * FROM papers WHERE id IN ({placeholders}) ORDER BY year DESC, venue, title", ids
+        )
+        return [dict(row) for row in rows]
+
+    def rank(self, keywords, top_k=None, threshold=None, min_groups=1, venue=None, year=None,
+             per_venue_year=True, scheme="bm25"):
+        """
+        Rank catalog records against keyword groups with `RelevanceRanker` (BM25/TF-IDF on title
+        and abstract), as a graded alternative to `match_keywords`.
+
+        Args:
+            keywords (list): Keyword groups, as produced by `augment_keywords`.
+            top_k (int): Keep at most this many records, per (venue, year) when `per_venue_year` is set.
+            threshold (float): Minimum relevance score.
+            min_groups (int): Minimum number of keyword groups a record must match.
+            venue (str): Optional venue filter.
+            year (int or iterable): Optional year filter.
+            per_venue_year (bool): Apply `top_k` per (venue, year) instead of globally.
+            scheme (str): "bm25" or "tfidf".
+
+        Returns:
+            list: Catalog records with an added "score" field, best first.
+        """
+        from .relevance import RelevanceRanker
+
+        records = self.papers(venue, year)
+        if not records:
+            return []
+        ranker = RelevanceRanker(scheme=scheme).fit(
+            [f"{record['title']} {record['abstract'] or ''}" for record in records]
+        )
+        partitions = [(record["venue"], record["year"]) for record in records] if per_venue_year else None
+        ranked = ranker.rank(keywords, top_k=top_k, threshold=threshold, min_groups=min_groups,
+                             partitions=partitions)
+        return [dict(records[index], score=score) for index, score in ranked]
+
+    def count(self, venue=None, year=None, downloaded_only=False):
+        clauses, params = self._filters(venue, year, downloaded_only)
+        query = "SELECT COUNT(*) FROM papers"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        return self.conn.execute(query, params).fetchone()[0]
+
+    def close(self):
+        self.conn.close()
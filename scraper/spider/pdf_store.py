@@ -0,0 +1,201 @@
+"""
+Content-addressed store of the downloaded PDFs:
+- Every PDF is stored once, under `output/store/{sha[:2]}/{sha[2:4]}/{sha}.pdf`: no directory grows
+  past a few hundred entries, identical downloads are deduplicated, and two titles cleaning to the
+  same file name can no longer overwrite each other.
+- The catalog (catalog.py) is the metadata index, mapping each (venue, year, title) to its hash.
+- `output/{venue}/{year}/{title}.pdf` views are materialized as hardlinks (symlinks when hardlinks
+  are not possible) for the tools and people browsing the folders; the store is the source of truth.
+
+Move the catalogued PDFs of a flat `output/{year}/` tree into the store and rebuild the views from the catalog
+(flat PDFs without a catalog record, whose venue is unknown, stay in place and are still summarized):
+    python -m spider.pdf_store --output output --migrate
+Read the abstracts of papers downloaded before the catalog recorded them:
+    python -m spider.pdf_store --output output --abstracts
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import socket
+from .abstracts import pdf_abstract
+from .catalog import PaperCatalog
+
+STORE_DIR = "store"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PdfStore:
+    def __init__(self, root, views="hardlink"):
+        """
+        Args:
+            root (str): Store directory (e.g. `output/store`).
+            views (str): "hardlink" or "symlink", how the venue/year views link to the store.
+        """
+        self.root = root
+        self.views = views
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def path(self, sha256):
+        return os.path.join(self.root, sha256[:2], sha256[2:4], f"{sha256}.pdf")
+
+    def has(self, sha256):
+        return sha256 is not None and os.path.exists(self.path(sha256))
+
+    def partial_path(self, name):
+        """
+        Unique temporary path for a download in progress, on the store's file system so it can be
+        moved into place atomically.
+        """
+        return os.path.join(self.tmp_dir, f"{name[:100]}.{socket.gethostname()}.{os.getpid()}.part")
+
+    def put(self, file_path):
+        """
+        Moves a finished download into the store; the file is dropped when its content is already stored.
+
+        Returns:
+            str: The SHA-256 of the PDF.
+        """
+        sha256 = file_sha256(file_path)
+        stored_path = self.path(sha256)
+        if os.path.exists(stored_path):
+            os.remove(file_path)
+        else:
+            os.makedirs(os.path.dirname(stored_path), exist_ok=True)
+            os.replace(file_path, stored_path)
+        return sha256
+
+    def link_view(self, sha256, view_dir, title):
+        """
+        Materializes `{view_dir}/{title}.pdf` for a stored PDF. When another paper already owns
+        that name, the view is named `{title} [{hash prefix}].pdf` instead.
+
+        Returns:
+            str: The path of the view.
+        """
+        stored_path = self.path(sha256)
+        os.makedirs(view_dir, exist_ok=True)
+        for view_path in (os.path.join(view_dir, f"{title}.pdf"),
+                          os.path.join(view_dir, f"{title} [{sha256[:8]}].pdf")):
+            if not os.path.exists(view_path):
+                # Missing, or a dangling symlink left by a moved store
+                break
+            if os.path.samefile(view_path, stored_path):
+                return view_path
+        else:
+            raise FileExistsError(f"Views of '{title}' are taken by other files in '{view_dir}'.")
+
+        # Linked under a temporary name then renamed, so concurrent workers never see a half-made view
+        tmp_path = f"{view_path}.{socket.gethostname()}.{os.getpid()}.link"
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        try:
+            if self.views != "hardlink":
+                raise OSError("symlink views requested")
+            os.link(stored_path, tmp_path)
+        except OSError:
+            # Store on another device, or a file system without hardlinks
+            os.symlink(os.path.relpath(stored_path, view_dir), tmp_path)
+        os.replace(tmp_path, view_path)
+        return view_path
+
+
+def migrate(output_path, catalog, store):
+    """
+    Moves the downloaded PDFs recorded in the catalog into the store, records their hash and
+    replaces the old files with venue/year views.
+
+    Several records may share a file (the same title cleaned to the same name at two venues):
+    each file is hashed once, and the old files are only removed once every record is updated.
+
+    Returns:
+        tuple: Papers migrated and papers whose PDF was not found.
+    """
+    migrated, missing = 0, 0
+    hashes = {}
+    for paper in catalog.papers(downloaded_only=True):
+        pdf_path = paper["pdf_path"]
+        sha256 = paper["sha256"]
+        if not store.has(sha256):
+            old_path = os.path.abspath(pdf_path) if pdf_path else None
+            sha256 = hashes.get(old_path)
+            if sha256 is None:
+                if not pdf_path or not os.path.isfile(pdf_path):
+                    print(f"PDF of '{paper['title']}' ({paper['venue']} {paper['year']}) not found.")
+                    missing += 1
+                    continue
+                # Linked (or copied) into the store, so an interrupted migration never loses the original file
+                part_path = store.partial_path(os.path.basename(pdf_path))
+                try:
+                    os.link(pdf_path, part_path)
+                except OSError:
+                    shutil.copyfile(pdf_path, part_path)
+                sha256 = store.put(part_path)
+                hashes[old_path] = sha256
+            migrated += 1
+
+        view_dir = os.path.join(output_path, paper["venue"], str(paper["year"]))
+        view_path = store.link_view(sha256, view_dir, os.path.splitext(os.path.basename(pdf_path))[0])
+        catalog.mark_downloaded(paper["venue"], paper["year"], paper["title"], view_path, sha256)
+
+    # Old files are removed once every record points at its view (unless an old file is itself a view)
+    views = {os.path.abspath(paper["pdf_path"]) for paper in catalog.papers(downloaded_only=True) if paper["pdf_path"]}
+    for old_path in hashes:
+        if old_path not in views and os.path.isfile(old_path):
+            os.remove(old_path)
+    return migrated, missing
+
+
+def fill_abstracts(catalog):
+    """
+    Records the abstract of every downloaded paper that has none in the catalog, read from its PDF.
+
+    Returns:
+        int: Abstracts added.
+    """
+    added = 0
+    for paper in catalog.papers(downloaded_only=True):
+        if paper["abstract"] or not paper["pdf_path"] or not os.path.isfile(paper["pdf_path"]):
+            continue
+        abstract = pdf_abstract(paper["pdf_path"])
+        if abstract:
+            catalog.add_paper(paper["venue"], paper["year"], paper["title"], abstract=abstract)
+            added += 1
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed PDF store of the scraper.")
+    parser.add_argument("--output", default="output", help="Scraper output directory.")
+    parser.add_argument("--catalog", help="Catalog database (`{output}/catalog.db` by default).")
+    parser.add_argument("--views", choices=["hardlink", "symlink"], default="hardlink")
+    parser.add_argument("--migrate", action="store_true",
+                        help="Move the catalogued PDFs of a flat `{output}/{year}/` tree into the store.")
+    parser.add_argument("--abstracts", action="store_true",
+                        help="Read the missing abstracts of downloaded papers from their PDFs.")
+    args = parser.parse_args()
+
+    catalog = PaperCatalog(args.catalog or os.path.join(args.output, "catalog.db"))
+    store = PdfStore(os.path.join(args.output, STORE_DIR), views=args.views)
+    if args.migrate:
+        migrated, missing = migrate(args.output, catalog, store)
+        print(f"{migrated} PDFs moved into the store, {missing} not found.")
+    if args.abstracts:
+        print(f"{fill_abstracts(catalog)} abstracts added to the catalog.")
+    stored = catalog.count(downloaded_only=True)
+    hashed = sum(1 for paper in catalog.papers(downloaded_only=True) if store.has(paper["sha256"]))
+    print(f"{hashed} of {stored} downloaded papers are in the store '{store.root}'.")
+    catalog.close()
+
+
+if __name__ == "__main__":
+    main()
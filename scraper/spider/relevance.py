@@ -0,0 +1,305 @@
+import re
+from bisect import bisect_left
+from itertools import chain
+
+import numpy as np
+from scipy import sparse
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+DOCUMENT_TOKEN_PATTERN = re.compile(r"[a-z0-9]+|\n")
+
+
+def tokenize(text):
+    """
+    Lowercase a title or abstract and split it into alphanumeric tokens.
+    """
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class RelevanceRanker:
+    """
+    Offline relevance engine for paper titles and abstracts.
+
+    Builds a sparse document-term matrix (BM25 or TF-IDF weighted) over the whole listing once,
+    then scores every document against all keyword groups with a single sparse matrix product.
+    Unlike `keyword_match`, which is a boolean "at least N groups" test, the ranker produces a
+    graded score that supports top-K selection and score thresholds.
+    """
+
+    def __init__(self, scheme="bm25", k1=1.5, b=0.75, prefix_match=True):
+        """
+        Args:
+            scheme (str): Term weighting, either "bm25" or "tfidf".
+            k1 (float): BM25 term-frequency saturation.
+            b (float): BM25 document-length normalization.
+            prefix_match (bool): Expand single-word options, and the last word of multi-word options, to
+                every vocabulary term starting with them (so "recommend" also scores "recommender" and
+                "recommender system" scores "recommender systems"), mirroring the substring semantics
+                of `keyword_match`.
+        """
+        if scheme not in ("bm25", "tfidf"):
+            raise ValueError(f"Unknown weighting scheme: {scheme}")
+        self.scheme = scheme
+        self.k1 = k1
+        self.b = b
+        self.prefix_match = prefix_match
+        self.vocabulary = {}
+        self.sorted_terms = []
+        self.matrix = None
+        # Token positions of the listing (term id and document of each token), for phrase matching
+        self.positions = None
+        self.position_docs = None
+        self.n_docs = 1
+        self.lengths = None
+        self.df = None
+        self.avg_len = 1.0
+        self.row_norms = None
+
+    def fit(self, documents):
+        """
+        Build the weighted document-term matrix.
+
+        Args:
+            documents (list): One string per paper (typically title and abstract joined).
+
+        Returns:
+            RelevanceRanker: The fitted ranker.
+        """
+        # Tokenize the whole listing in one regex pass; "\n" tokens mark document boundaries
+        text = "\n".join(doc.replace("\n", " ") if doc else "" for doc in documents).lower()
+        tokens = DOCUMENT_TOKEN_PATTERN.findall(text)
+        n_rows = len(documents)
+
+        # Map tokens to ids at C speed: dict.fromkeys keeps first-seen order, "\n" gets id 0
+        token_ids = {term: term_id for term_id, term in enumerate(dict.fromkeys(chain(["\n"], tokens)))}
+        ids = np.fromiter(map(token_ids.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+
+        is_separator = ids == 0
+        doc_ids = np.cumsum(is_separator)[~is_separator]
+        term_ids = ids[~is_separator] - 1
+        vocabulary = {term: term_id - 1 for term, term_id in token_ids.items() if term_id > 0}
+        lengths = np.bincount(doc_ids, minlength=n_rows)
+
+        # Duplicate (doc, term) pairs are summed into raw term frequencies
+        tf = sparse.csr_matrix(
+            (np.ones(len(term_ids), dtype=np.float32), (doc_ids, term_ids)),
+            shape=(n_rows, len(vocabulary))
+        )
+        tf.sum_duplicates()
+
+        df = np.bincount(tf.indices, minlength=len(vocabulary)).astype(np.float32)
+        row_of_entry = np.repeat(np.arange(tf.shape[0]), np.diff(tf.indptr))
+
+        self.n_docs = max(n_rows, 1)
+        self.lengths = lengths
+        self.avg_len = max(float(lengths.mean()) if len(lengths) else 0.0, 1.0)
+        tf.data = self._weigh(tf.data, lengths[row_of_entry], self._idf(df)[tf.indices])
+        self.row_norms = None
+        if self.scheme == "tfidf":
+            row_norms = np.sqrt(np.asarray(tf.multiply(tf).sum(axis=1)).ravel())
+            row_norms[row_norms == 0] = 1
+            tf.data = tf.data / row_norms[row_of_entry]
+            self.row_norms = row_norms
+
+        self.df = df
+        self.vocabulary = vocabulary
+        self.sorted_terms = sorted(vocabulary)
+        self.matrix = tf.astype(np.float32)
+        self.positions = term_ids
+        self.position_docs = doc_ids
+        return self
+
+    def _idf(self, df):
+        if self.scheme == "bm25":
+            return np.log1p((self.n_docs - df + 0.5) / (df + 0.5))
+        return np.log((1 + self.n_docs) / (1 + df)) + 1
+
+    def _weigh(self, tf, lengths, idf):
+        """
+        Weight raw term frequencies `tf` of documents of `lengths` tokens with the ranker's scheme.
+        """
+        if self.scheme == "bm25":
+            norm = self.k1 * (1 - self.b + self.b * lengths / self.avg_len)
+            return tf * (self.k1 + 1) / (tf + norm) * idf
+        return (1 + np.log(tf)) * idf
+
+    def _expand(self, token):
+        if not self.prefix_match:
+            return [self.vocabulary[token]] if token in self.vocabulary else []
+        ids = []
+        index = bisect_left(self.sorted_terms, token)
+        while index < len(self.sorted_terms) and self.sorted_terms[index].startswith(token):
+            ids.append(self.vocabulary[self.sorted_terms[index]])
+            index += 1
+        return ids
+
+    def query_matrix(self, keyword_groups):
+        """
+        Build a binary (vocabulary x groups) query matrix from the single-word options of keyword groups.
+        Multi-word options are matched as phrases by `phrase_matrix`.
+        """
+        rows, cols = [], []
+        for group_index, group in enumerate(keyword_groups):
+            term_ids = set()
+            for option in group:
+                tokens = tokenize(option)
+                if len(tokens) == 1:
+                    term_ids.update(self._expand(tokens[0]))
+            rows.extend(term_ids)
+            cols.extend([group_index] * len(term_ids))
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(self.vocabulary), len(keyword_groups))
+        )
+
+    def _phrase_starts(self, tokens):
+        """
+        Positions of the listing where `tokens` occur as adjacent words of one document
+        (the last word prefix-expanded like single-word options).
+        """
+        n_tokens = len(tokens)
+        n_starts = len(self.positions) - n_tokens + 1
+        if n_starts <= 0 or any(token not in self.vocabulary for token in tokens[:-1]):
+            return np.zeros(0, dtype=np.int64)
+        match = np.isin(self.positions[n_tokens - 1:], self._expand(tokens[-1]))
+        for offset, token in enumerate(tokens[:-1]):
+            match &= self.positions[offset:offset + n_starts] == self.vocabulary[token]
+        starts = np.flatnonzero(match)
+        return starts[self.position_docs[starts] == self.position_docs[starts + n_tokens - 1]]
+
+    def phrase_matrix(self, keyword_groups):
+        """
+        Score every document against the multi-word options of keyword groups, each phrase being
+        weighted like a single term (its frequency and document frequency as a whole).
+
+        Returns:
+            scipy.sparse.csr_matrix: (documents x groups) score matrix.
+        """
+        n_docs = self.matrix.shape[0]
+        rows, cols, data = [], [], []
+        for group_index, group in enumerate(keyword_groups):
+            for phrase in dict.fromkeys(tuple(tokenize(option)) for option in group):
+                if len(phrase) < 2:
+                    continue
+                tf = np.bincount(self.position_docs[self._phrase_starts(phrase)], minlength=n_docs)
+                docs = np.flatnonzero(tf)
+                if not len(docs):
+                    continue
+                weights = self._weigh(tf[docs].astype(np.float32), self.lengths[docs],
+                                      self._idf(np.float32(len(docs))))
+                if self.row_norms is not None:
+                    weights = weights / self.row_norms[docs]
+                rows.append(docs)
+                cols.append(np.full(len(docs), group_index))
+                data.append(weights)
+        if not rows:
+            return sparse.csr_matrix((n_docs, len(keyword_groups)), dtype=np.float32)
+        return sparse.csr_matrix(
+            (np.concatenate(data).astype(np.float32), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n_docs, len(keyword_groups))
+        )
+
+    def group_scores(self, keyword_groups):
+        """
+        Score every document against every keyword group: one sparse product for the single-word
+        options, plus the phrase matches of the multi-word options.
+
+        Returns:
+            numpy.ndarray: Dense (documents x groups) score matrix.
+        """
+        if self.matrix is None:
+            raise RuntimeError("RelevanceRanker.fit() must be called before scoring.")
+        scores = self.matrix @ self.query_matrix(keyword_groups) + self.phrase_matrix(keyword_groups)
+        return np.asarray(scores.todense())
+
+    def reference_scores(self, keyword_groups):
+        """
+        Score of each keyword group matched against itself: the best score one of its options
+        (found in the listing) gets in a document made of that option alone.
+
+        Returns:
+            numpy.ndarray: One reference score per group (0 when no option occurs in the listing).
+        """
+        references = np.zeros(len(keyword_groups))
+        for group_index, group in enumerate(keyword_groups):
+            for option in group:
+                tokens = tokenize(option)
+                if len(tokens) == 1:
+                    df = self.df[self.vocabulary[tokens[0]]] if tokens[0] in self.vocabulary else 0
+                elif tokens:
+                    df = len(np.unique(self.position_docs[self._phrase_starts(tokens)]))
+                else:
+                    continue
+                if not df:
+                    continue
+                # A TF-IDF document of a single term has a unit weight after L2 normalization
+                weight = self._weigh(1.0, len(tokens), self._idf(np.float32(df))) if self.scheme == "bm25" else 1.0
+                references[group_index] = max(references[group_index], float(weight))
+        return references
+
+    def score(self, keyword_groups, min_groups=1, reference=False):
+        """
+        Combine per-group scores into one relevance score per document.
+
+        Each group column is scaled to [0, 1] so that large, heavily augmented groups do not
+        dominate: by the column maximum (the best document always scores 1 for each matched group),
+        or with `reference` by the group's `reference_scores`, capped at 1, so that scores do not
+        depend on how relevant the best document of the listing is. Documents matching fewer than
+        `min_groups` groups score 0.
+
+        Returns:
+            tuple: (scores, matched_groups) arrays of length n_documents.
+        """
+        per_group = self.group_scores(keyword_groups)
+        matched_groups = (per_group > 0).sum(axis=1)
+        if reference:
+            col_max = self.reference_scores(keyword_groups)
+        else:
+            col_max = per_group.max(axis=0) if per_group.size else np.zeros(per_group.shape[1])
+        col_max[col_max == 0] = 1
+        scores = np.minimum(per_group / col_max, 1).sum(axis=1)
+        scores[matched_groups < min_groups] = 0
+        return scores, matched_groups
+
+    def rank(self, keyword_groups, top_k=None, threshold=None, min_groups=1, partitions=None):
+        """
+        Rank documents against keyword groups.
+
+        Args:
+            keyword_groups (list): Keyword groups, as produced by `augment_keywords`.
+            top_k (int): Keep at most this many documents (per partition when `partitions` is given).
+            threshold (float): Drop documents scoring below this value.
+            min_groups (int): Minimum number of groups a document must match to be kept.
+            partitions (list): Optional per-document partition labels (e.g. (venue, year) tuples)
+                used for top-K per partition.
+
+        Returns:
+            list: (document_index, score) tuples in descending score order.
+        """
+        scores, _ = self.score(keyword_groups, min_groups=min_groups)
+        keep = scores > 0
+        if threshold is not None:
+            keep &= scores >= threshold
+        candidates = np.flatnonzero(keep)
+
+        if top_k is not None:
+            if partitions is None:
+                order = candidates[np.argsort(-scores[candidates], kind="stable")]
+                candidates = order[:top_k]
+            else:
+                label_ids = {}
+                partition_ids = np.fromiter(
+                    (label_ids.setdefault(partitions[index], len(label_ids)) for index in candidates),
+                    dtype=np.int64, count=len(candidates)
+                )
+                # Sort by partition, then by descending score, and keep the first top_k of each run
+                order = np.lexsort((-scores[candidates], partition_ids))
+                sorted_partitions = partition_ids[order]
+                run_starts = np.r_[0, np.flatnonzero(np.diff(sorted_partitions)) + 1]
+                run_lengths = np.diff(np.r_[run_starts, len(order)])
+                position_in_run = np.arange(len(order)) - np.repeat(run_starts, run_lengths)
+                candidates = candidates[order[position_in_run < top_k]]
+
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(index), float(scores[index])) for index in candidates]
@@ -0,0 +1,237 @@
+"""
+Record/replay of spider traffic, so spiders can be benchmarked and regression-tested offline:
+- Every origin a spider visits (https://dl.acm.org, https://dblp.org, ...) is served by its own local
+  HTTP server, and `rewrite_url` maps URLs onto it (https://dl.acm.org/doi/x -> http://127.0.0.1:PORT/doi/x).
+  Root-relative links in the served pages therefore keep resolving against the right origin.
+- In record mode, requests missing from the archive are fetched from the real origin and stored
+  (listing pages, detail pages and PDFs alike); in replay mode they answer 404.
+- Responses can be delayed (`latency` + uniform `jitter`) and replaced by injected errors
+  (`error_rate`, HTTP statuses from `error_statuses` or a dropped connection for status 0).
+
+Recording fetches pages without the browser's cookies, so content behind a login is recorded as
+the logged-out page.
+
+Usage:
+    with ReplayServer("output/replay", record=True) as replay:
+        spider = NeurIPS_spider(...)  # BaseSpider.get and download_paper go through rewrite_url
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+RECORD_USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                     "(KHTML, like Gecko) Chrome/88.0.4324.96 Safari/537.36")
+
+_active = None
+
+
+def active_replay():
+    return _active
+
+
+def rewrite_url(url):
+    """
+    Map `url` onto the local server of its origin while a ReplayServer is active (identity otherwise).
+    """
+    return _active.rewrite(url) if _active is not None else url
+
+
+def original_url(url):
+    """
+    Map a URL on a local replay server (e.g. a link resolved by the browser) back to its real origin.
+    """
+    return _active.original_url(url) if _active is not None else url
+
+
+class ReplayArchive:
+    """
+    Recorded responses on disk: `index.json` maps each URL to its status, content type and body file
+    (bodies are stored under `bodies/`, named by the SHA-1 of the URL).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = os.path.join(path, "index.json")
+        os.makedirs(os.path.join(path, "bodies"), exist_ok=True)
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url):
+        return url.split("#", 1)[0]
+
+    def get(self, url):
+        entry = self.index.get(self.key(url))
+        if entry is None:
+            return None
+        with open(os.path.join(self.path, "bodies", entry["file"]), "rb") as f:
+            return entry["status"], entry["content_type"], f.read()
+
+    def put(self, url, status, content_type, body):
+        key = self.key(url)
+        file_name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        with open(os.path.join(self.path, "bodies", file_name), "wb") as f:
+            f.write(body)
+        with self._lock:
+            self.index[key] = {"status": status, "content_type": content_type, "file": file_name}
+
+    def save(self):
+        with self._lock:
+            with open(f"{self.index_path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(self.index, f, indent=1, sort_keys=True)
+            os.replace(f"{self.index_path}.tmp", self.index_path)
+
+    def __len__(self):
+        return len(self.index)
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        replay = self.server.replay
+        url = self.server.origin + self.path
+        replay.requests += 1
+
+        delay = replay.latency + replay.rng.uniform(0, replay.jitter)
+        if delay:
+            time.sleep(delay)
+        if replay.error_rate and replay.rng.random() < replay.error_rate:
+            replay.injected_errors += 1
+            status = replay.rng.choice(replay.error_statuses)
+            if status == 0:
+                # Dropped connection
+                self.close_connection = True
+                return
+            self._respond(status, "text/plain", f"Injected error {status}".encode("utf-8"))
+            return
+
+        response = replay.archive.get(url)
+        if response is None and replay.record:
+            response = replay.fetch(url)
+        if response is None:
+            replay.misses += 1
+            self._respond(404, "text/plain", f"Not recorded: {url}".encode("utf-8"))
+            return
+        self._respond(*response)
+
+    def _respond(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer:
+    """
+    Serves a ReplayArchive on one local port per origin, optionally recording missing responses.
+
+    Args:
+        archive_path (str): Directory of the archive (created if missing).
+        record (bool): Fetch and store responses that are not in the archive.
+        latency (float): Seconds added to every response.
+        jitter (float): Extra random delay per response, uniform in [0, jitter] seconds.
+        error_rate (float): Probability of replacing a response by an injected error.
+        error_statuses (tuple): Injected HTTP statuses (0 drops the connection without a response).
+        seed (int): Seed of the latency/error generator, so runs inject the same faults.
+    """
+
+    def __init__(self, archive_path, record=False, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_statuses=(500, 503), seed=0):
+        self.archive = ReplayArchive(archive_path)
+        self.record = record
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.misses = 0
+        self.injected_errors = 0
+        # origin -> server, and local "host:port" -> origin
+        self._servers = {}
+        self._local_origins = {}
+        self._lock = threading.Lock()
+
+    def _server_for(self, origin):
+        with self._lock:
+            server = self._servers.get(origin)
+            if server is None:
+                server = ThreadingHTTPServer(("127.0.0.1", 0), _ReplayHandler)
+                server.daemon_threads = True
+                server.replay = self
+                server.origin = origin
+                threading.Thread(target=server.serve_forever, daemon=True).start()
+                self._servers[origin] = server
+                self._local_origins[f"127.0.0.1:{server.server_address[1]}"] = origin
+            return server
+
+    def rewrite(self, url):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or parts.netloc in self._local_origins:
+            return url
+        server = self._server_for(f"{parts.scheme}://{parts.netloc}")
+        local = f"http://127.0.0.1:{server.server_address[1]}{parts.path or '/'}"
+        return local + (f"?{parts.query}" if parts.query else "")
+
+    def original_url(self, url):
+        """
+        Inverse of `rewrite` (URLs that do not point at a replay server are returned unchanged).
+        """
+        parts = urlsplit(url)
+        origin = self._local_origins.get(parts.netloc)
+        if origin is None:
+            return url
+        return origin + (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+    def fetch(self, url, timeout=60):
+        request = urllib.request.Request(url, headers={"User-Agent": RECORD_USER_AGENT})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                status, content_type, body = response.status, response.headers.get("Content-Type", ""), response.read()
+        except urllib.error.HTTPError as e:
+            status, content_type, body = e.code, e.headers.get("Content-Type", ""), e.read()
+        except (urllib.error.URLError, OSError) as e:
+            print(f"Could not record {url}: {e}")
+            return None
+        self.archive.put(url, status, content_type or "application/octet-stream", body)
+        return status, content_type or "application/octet-stream", body
+
+    def start(self):
+        global _active
+        _active = self
+        return self
+
+    def stop(self):
+        global _active
+        if _active is self:
+            _active = None
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+        self._servers.clear()
+        self._local_origins.clear()
+        if self.record:
+            self.archive.save()
+            print(f"Replay archive '{self.archive.path}' now holds {len(self.archive)} responses.")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
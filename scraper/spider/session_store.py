@@ -0,0 +1,107 @@
+import json
+import os
+import time
+
+import requests
+from cryptography.fernet import Fernet, InvalidToken
+
+from .utils import add_session_cookies
+
+
+SESSION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions")
+# Fernet key (urlsafe base64); when unset, a key file is generated next to the saved sessions
+SESSION_KEY_ENV = "LITERATURESCOUT_SESSION_KEY"
+SESSION_TTL = 12 * 3600
+
+
+class SessionStore:
+    """
+    Encrypted on-disk store for authenticated browser state (cookies and local storage),
+    so institutional logins can be reused across runs until the session expires.
+    """
+
+    def __init__(self, session_dir=SESSION_DIR, key=None):
+        self.session_dir = session_dir
+        os.makedirs(self.session_dir, exist_ok=True)
+        self.fernet = Fernet(key or os.environ.get(SESSION_KEY_ENV) or self._load_key())
+
+    def _load_key(self):
+        key_path = os.path.join(self.session_dir, ".key")
+        if not os.path.exists(key_path):
+            try:
+                # O_EXCL: when two runs race, the loser reads the winner's key
+                fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(Fernet.generate_key())
+            except FileExistsError:
+                pass
+        with open(key_path, "rb") as f:
+            return f.read().strip()
+
+    def _path(self, name):
+        return os.path.join(self.session_dir, f"{name}.session")
+
+    def save(self, name, origin, cookies, local_storage=None, ttl=SESSION_TTL):
+        """
+        Save the session state of `origin`. It expires after `ttl` seconds, or earlier when
+        every persistent cookie has expired by then.
+        """
+        expires_at = time.time() + ttl
+        cookie_expiries = [cookie["expiry"] for cookie in cookies if "expiry" in cookie]
+        if cookie_expiries:
+            expires_at = min(expires_at, max(cookie_expiries))
+        state = {
+            "origin": origin,
+            "saved_at": time.time(),
+            "expires_at": expires_at,
+            "cookies": cookies,
+            "local_storage": local_storage or {}
+        }
+        path = self._path(name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.fernet.encrypt(json.dumps(state).encode("utf-8")))
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+
+    def load(self, name):
+        """
+        Return the saved state for `name`, or None if it is missing, expired or unreadable
+        (e.g. encrypted with another key).
+        """
+        path = self._path(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                state = json.loads(self.fernet.decrypt(f.read()))
+        except (InvalidToken, ValueError):
+            print(f"Saved session '{name}' could not be decrypted, ignoring it.")
+            return None
+        if state["expires_at"] <= time.time():
+            print(f"Saved session '{name}' has expired.")
+            return None
+        return state
+
+    def clear(self, name):
+        if os.path.exists(self._path(name)):
+            os.remove(self._path(name))
+
+
+def session_is_valid(state, check_url, logged_in_marker, user_agent=None, timeout=15):
+    """
+    Cheap validity check: fetch `check_url` over HTTP with the saved cookies and look for a marker
+    that only appears on logged-in pages, without starting a browser login flow.
+    """
+    session = requests.Session()
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+    add_session_cookies(session, state["cookies"])
+    try:
+        response = session.get(check_url, timeout=timeout)
+        return response.ok and logged_in_marker in response.text
+    except requests.RequestException as e:
+        print(f"Could not validate saved session: {e}")
+        return False
+    finally:
+        session.close()
@@ -1,9 +1,17 @@
 import os
 import re
 import shutil
+import socket
+import tempfile
 import requests
 import time
 import json
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from observability.metrics import REGISTRY
+from observability.tracing import traced
+from .abstracts import pdf_abstract
+from .replay import original_url, rewrite_url
 
 
 def keyword_match(title, keywords, min_groups=2):
@@ -24,57 +32,204 @@ def keyword_match(title, keywords, min_groups=2):
     return match_count >= min_groups
 
 
-def download_paper(pdf_url, pdf_title, save_dir, driver, keywords, max_retries=3, retry_delay=30):
+def clean_title(pdf_title):
+    """
+    Clean a paper title so it can be used as a file name.
+    """
+    title = re.sub(r'[^a-zA-Z0-9\s\-_.,]', '', pdf_title.strip())
+    return ' '.join(title.split())
+
+
+def partial_path(file_path):
+    """
+    Unique temporary path next to `file_path`, so concurrent workers sharing an output directory
+    never write the same file; the finished download is moved into place with os.replace.
+    """
+    return f"{file_path}.{socket.gethostname()}.{os.getpid()}.part"
+
+
+def add_session_cookies(session, cookies):
+    """
+    Add WebDriver-style cookie dicts (with their domains and paths) to a requests session.
+    """
+    for cookie in cookies:
+        session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain", ""),
+                            path=cookie.get("path", "/"))
+
+
+def sync_session_cookies(session, driver):
+    """
+    Copy the browser's cookies into a requests session.
+    """
+    add_session_cookies(session, driver.get_cookies())
+
+
+def build_http_session(driver, pool_size=8):
+    """
+    Build a pooled HTTP session carrying the browser's authenticated cookies and user agent,
+    so PDFs can be fetched directly instead of through a browser navigation.
+    """
+    session = requests.Session()
+    session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    sync_session_cookies(session, driver)
+    return session
+
+
+@traced()
+def fetch_pdf(session, pdf_url, part_path, timeout=60):
+    """
+    Fetch `pdf_url` over HTTP into `part_path`.
+
+    Returns:
+        bool: False when the server answers with an error status or something other than a PDF
+            (typically an HTML page that needs JavaScript, or a 403/503 browser challenge), so the
+            caller can fall back to the browser right away.
+    """
+    with session.get(pdf_url, stream=True, timeout=timeout) as response:
+        if not response.ok:
+            return False
+        chunks = response.iter_content(chunk_size=65536)
+        first_chunk = next(chunks, b"")
+        # The Content-Type is unreliable (PDFs served as octet-stream, HTML labelled as PDF):
+        # only the magic bytes, which may follow a few junk bytes, are trusted
+        if b"%PDF-" not in first_chunk[:1024]:
+            return False
+        with open(part_path, "wb") as file:
+            file.write(first_chunk)
+            for chunk in chunks:
+                file.write(chunk)
+    return True
+
+
+def record_download(file_path, stage, seconds, venue=None, year=None, host=None):
+    REGISTRY.counter("downloads_total", "PDFs downloaded").inc(venue=venue, year=year, stage=stage, host=host)
+    REGISTRY.counter("download_bytes_total", "Bytes of PDFs downloaded").inc(
+        os.path.getsize(file_path), venue=venue, year=year, stage=stage, host=host)
+    REGISTRY.histogram("download_seconds", "Time to download one PDF").observe(
+        seconds, venue=venue, stage=stage, host=host)
+
+
+@traced()
+def wait_for_download(download_dir, timeout=60, poll=0.5):
+    """
+    Wait until Chrome has finished writing a PDF into `download_dir` and return its name (None on timeout).
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        files = os.listdir(download_dir)
+        finished = next((f for f in files if f.endswith('.pdf')), None)
+        if finished and not any(f.endswith('.crdownload') for f in files):
+            return finished
+        time.sleep(poll)
+    return None
+
+
+@traced()
+def download_paper(pdf_url, pdf_title, save_dir, driver, keywords, max_retries=3, retry_delay=30,
+                   catalog=None, venue=None, year=None, source_url=None, session=None, store=None):
     """
     Download a PDF with retry logic and keyword checks.
+    When a `catalog` is given, the paper is recorded under (venue, year) whether or not
+    it matches the keywords, and marked as downloaded once the file is on disk.
+    With a `store` (see `PdfStore`), the PDF is saved in the content-addressed store and `save_dir`
+    only receives a view of it; the catalog, not the folder, tells whether it is already downloaded.
+    With an HTTP `session` (see `build_http_session`), every URL is fetched directly first;
+    the browser is only used for URLs that do not answer with a PDF.
+    While a replay server is active, the PDF is fetched from it instead of the real host.
     """
+    pdf_url = original_url(pdf_url)
+    fetch_url = rewrite_url(pdf_url)
+    catalog_title = ' '.join(pdf_title.split())
+    if catalog is not None and year is not None:
+        catalog.add_paper(venue, year, catalog_title, source_url=source_url, pdf_url=pdf_url)
+    host = urlparse(pdf_url).hostname
+    papers_seen = REGISTRY.counter("papers_seen_total", "Listing entries checked, by outcome")
+
     for attempt in range(1, max_retries + 1):
         try:
             os.makedirs(save_dir, exist_ok=True)
             # Clean title
-            title = re.sub(r'[^a-zA-Z0-9\s\-_.,]', '', pdf_title.strip())
-            title = ' '.join(title.split())
+            title = clean_title(pdf_title)
 
             # Check keywords
             if keywords is not None and not keyword_match(title, keywords):
                 print(f"Skipping PDF '{title}': does not match keywords.")
+                papers_seen.inc(venue=venue, year=year, stage="skipped")
                 return False
 
             file_path = os.path.join(save_dir, f"{title}.pdf")
-            if os.path.exists(file_path):
+            pdf_hash = None
+            if store is not None:
+                pdf_hash = catalog.stored_hash(venue, year, catalog_title) if catalog is not None else None
+                downloaded = store.has(pdf_hash)
+            else:
+                downloaded = os.path.exists(file_path)
+            if downloaded:
                 print(f"PDF '{title}' already downloaded.")
+                papers_seen.inc(venue=venue, year=year, stage="existing")
+                if store is None and catalog is not None and year is not None:
+                    catalog.mark_downloaded(venue, year, catalog_title, file_path)
                 return True
 
-            cookies = {c['name']: c['value'] for c in driver.get_cookies()}
-            if not pdf_url.endswith('.pdf'):
-                # Download through browser
-                temp_dir = os.path.join(save_dir, "temp_download")
-                os.makedirs(temp_dir, exist_ok=True)
-                driver.execute_cdp_cmd("Page.setDownloadBehavior", {"behavior": "allow", "downloadPath": temp_dir})
-                driver.get(pdf_url)
-                time.sleep(10)
-
-                downloaded_file = next((f for f in os.listdir(temp_dir) if f.endswith('.pdf')), None)
-                if downloaded_file:
-                    shutil.move(os.path.join(temp_dir, downloaded_file), file_path)
-                shutil.rmtree(temp_dir)
+            part_path = store.partial_path(title) if store is not None else partial_path(file_path)
+            start = time.perf_counter()
+            if session is not None and fetch_pdf(session, fetch_url, part_path):
+                stage = "http"
+            elif session is not None or not pdf_url.endswith('.pdf'):
+                # Download through browser, into a private temp dir so concurrent workers do not collide
+                temp_dir = tempfile.mkdtemp(prefix=".download-", dir=os.path.dirname(part_path))
+                try:
+                    driver.execute_cdp_cmd("Page.setDownloadBehavior", {"behavior": "allow", "downloadPath": temp_dir})
+                    driver.get(fetch_url)
+                    downloaded_file = wait_for_download(temp_dir)
+                    if not downloaded_file:
+                        raise TimeoutError(f"Browser download of {pdf_url} did not finish.")
+                    shutil.move(os.path.join(temp_dir, downloaded_file), part_path)
+                    stage = "browser"
+                finally:
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+                if session is not None:
+                    # The browser may have picked up new cookies (e.g. after a challenge page)
+                    sync_session_cookies(session, driver)
             else:
                 # Direct PDF URL
-                pdf_response = requests.get(pdf_url, cookies=cookies, stream=True)
+                cookies = {c['name']: c['value'] for c in driver.get_cookies()}
+                pdf_response = requests.get(fetch_url, cookies=cookies, stream=True)
                 pdf_response.raise_for_status()
-                with open(file_path, "wb") as file:
+                with open(part_path, "wb") as file:
                     for chunk in pdf_response.iter_content(chunk_size=8192):
                         file.write(chunk)
+                stage = "direct"
 
+            if store is not None:
+                pdf_hash = store.put(part_path)
+                file_path = store.link_view(pdf_hash, save_dir, title)
+            else:
+                os.replace(part_path, file_path)
+            record_download(file_path, stage, time.perf_counter() - start, venue=venue, year=year, host=host)
+            papers_seen.inc(venue=venue, year=year, stage="downloaded")
             print(f"PDF '{title}' saved successfully!")
+            if catalog is not None and year is not None and os.path.exists(file_path):
+                catalog.mark_downloaded(venue, year, catalog_title, file_path, pdf_hash)
+                # The listings carry no abstracts: the one of the PDF feeds the catalog's full-text index
+                abstract = pdf_abstract(file_path)
+                if abstract:
+                    catalog.add_paper(venue, year, catalog_title, abstract=abstract)
             return True
 
         except Exception as e:
             print(f"Error downloading PDF (attempt {attempt}): {e}")
             if attempt < max_retries:
+                REGISTRY.counter("sleeps_total", "Fixed sleeps").inc(venue=venue, stage="download_retry")
+                REGISTRY.counter("sleep_seconds_total", "Time spent in fixed sleeps").inc(
+                    retry_delay, venue=venue, stage="download_retry")
                 time.sleep(retry_delay)
             else:
                 print("Max attempts reached. Could not download PDF.")
+                papers_seen.inc(venue=venue, year=year, stage="failed")
                 return False
 
 
@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+
+def unit_id_for(kind, payload):
+    """
+    Deterministic id for a work unit, so publishing the same listing or download twice is a no-op.
+    """
+    key = json.dumps({"kind": kind, "payload": payload}, sort_keys=True)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class SQLiteWorkQueue:
+    """
+    File-backed work queue for workers running on a single host.
+
+    Units are leased with a visibility timeout: a leased unit that is neither completed nor
+    extended before its lease expires becomes available to other workers again.
+    """
+
+    def __init__(self, db_path="output/work_queue.db", max_attempts=3):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS units (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    owner TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS units_status ON units (status, kind)")
+
+    def _connect(self):
+        # One short-lived connection per operation keeps the queue safe to use from heartbeat threads
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def publish(self, kind, payload, unit_id=None):
+        unit_id = unit_id or unit_id_for(kind, payload)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO units (id, kind, payload, created_at) VALUES (?, ?, ?, ?)",
+                (unit_id, kind, json.dumps(payload), time.time())
+            )
+        return unit_id
+
+    def lease(self, worker_id, kinds=None, visibility_timeout=600):
+        """
+        Lease the oldest available unit (optionally restricted to `kinds`).
+
+        Returns:
+            dict: {"id", "kind", "payload", "attempts"} or None if nothing is available.
+        """
+        now = time.time()
+        query = ("SELECT * FROM units WHERE (status = 'queued' OR (status = 'leased' AND lease_expires < ?)) "
+                 "AND attempts < ?")
+        params = [now, self.max_attempts]
+        if kinds:
+            query += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params.extend(kinds)
+        query += " ORDER BY created_at LIMIT 1"
+
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE takes the write lock up front, so two workers cannot lease the same unit
+            conn.execute("BEGIN IMMEDIATE")
+            # Expired leases that already used up their attempts will never be leased again
+            conn.execute(
+                "UPDATE units SET status = 'failed', last_error = 'lease expired' "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts)
+            )
+            row = conn.execute(query, params).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE units SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                (worker_id, now + visibility_timeout, row["id"])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return {"id": row["id"], "kind": row["kind"], "payload": json.loads(row["payload"]),
+                "attempts": row["attempts"] + 1}
+
+    def extend(self, unit_id, worker_id, visibility_timeout=600):
+        """
+        Extend a lease still held by `worker_id`. Returns False if the lease was lost.
+        """
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE units SET lease_expires = ? WHERE id = ? AND owner = ? AND status = 'leased'",
+                (time.time() + visibility_timeout, unit_id, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, unit_id, worker_id):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE units SET status = 'done', lease_expires = NULL WHERE id = ? AND owner = ?",
+                (unit_id, worker_id)
+            )
+
+    def fail(self, unit_id, worker_id, error):
+        """
+        Release a failed unit: it is queued again until it reaches `max_attempts`, then marked failed.
+        """
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE units SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "owner = NULL, lease_expires = NULL, last_error = ? WHERE id = ? AND owner = ?",
+                (self.max_attempts, str(error), unit_id, worker_id)
+            )
+
+    def stats(self):
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT kind, status, COUNT(*) AS n FROM units GROUP BY kind, status").fetchall()
+        return {(row["kind"], row["status"]): row["n"] for row in rows}
+
+
+class RedisWorkQueue:
+    """
+    Work queue backed by a Redis-compatible server, for workers spread over several nodes.
+
+    Any client exposing the redis-py command methods can be passed in (e.g. a local stand-in
+    such as fakeredis in tests); otherwise one is created from `url`, which requires the `redis` package.
+    Leases are kept in a sorted set scored by expiry time; expired leases are re-queued by the
+    next worker that asks for work. Every operation runs as one WATCH/MULTI transaction (retried
+    when a watched key changes), so a worker dying mid-operation never loses or half-queues a unit.
+    """
+
+    def __init__(self, url="redis://localhost:6379/0", client=None, namespace="literaturescout", max_attempts=3):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.namespace = namespace
+        self.max_attempts = max_attempts
+
+    def _key(self, *parts):
+        return ":".join((self.namespace,) + parts)
+
+    @staticmethod
+    def _text(value):
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def publish(self, kind, payload, unit_id=None):
+        unit_id = unit_id or unit_id_for(kind, payload)
+
+        def publish_unit(pipe):
+            if pipe.sismember(self._key("seen"), unit_id):
+                return
+            pipe.multi()
+            pipe.sadd(self._key("seen"), unit_id)
+            pipe.hset(self._key("units"), unit_id, json.dumps({"kind": kind, "payload": payload}))
+            pipe.rpush(self._key("queue", kind), unit_id)
+
+        # WATCH/MULTI: a unit is marked seen only together with being queued
+        self.client.transaction(publish_unit, self._key("seen"))
+        return unit_id
+
+    def _requeue_expired(self):
+        now = time.time()
+        for unit_id in self.client.zrangebyscore(self._key("leases"), 0, now):
+            self._release(self._text(unit_id), "lease expired")
+
+    def _release(self, unit_id, error, worker_id=None):
+        """
+        Drop the lease of a unit and queue it again, or mark it failed once it reached `max_attempts`.
+
+        Args:
+            unit_id (str): Leased unit.
+            error (str): Reason recorded for the release.
+            worker_id (str): Release only if this worker still owns the lease; None releases only
+                an expired lease.
+
+        Returns:
+            bool: True if this call released the unit (exactly one of several racing workers does).
+        """
+        def release_unit(pipe):
+            expires = pipe.zscore(self._key("leases"), unit_id)
+            if expires is None:
+                return False
+            if worker_id is None and expires > time.time():
+                return False
+            if worker_id is not None and self._text(pipe.hget(self._key("owners"), unit_id)) != worker_id:
+                return False
+            attempts = int(pipe.hget(self._key("attempts"), unit_id) or 0)
+            unit = json.loads(self._text(pipe.hget(self._key("units"), unit_id)))
+            pipe.multi()
+            pipe.zrem(self._key("leases"), unit_id)
+            pipe.hdel(self._key("owners"), unit_id)
+            pipe.hset(self._key("errors"), unit_id, str(error))
+            if attempts >= self.max_attempts:
+                pipe.sadd(self._key("failed"), unit_id)
+            else:
+                pipe.rpush(self._key("queue", unit["kind"]), unit_id)
+            return True
+
+        return self.client.transaction(release_unit, self._key("leases"), self._key("owners"),
+                                       value_from_callable=True)
+
+    def lease(self, worker_id, kinds=("listing", "download"), visibility_timeout=600):
+        self._requeue_expired()
+        for kind in kinds or ("listing", "download"):
+            queue_key = self._key("queue", kind)
+
+            def lease_unit(pipe):
+                unit_id = pipe.lindex(queue_key, 0)
+                if unit_id is None:
+                    return None
+                unit_id = self._text(unit_id)
+                attempts = int(pipe.hget(self._key("attempts"), unit_id) or 0) + 1
+                unit = json.loads(self._text(pipe.hget(self._key("units"), unit_id)))
+                # The unit leaves its queue in the same transaction that records its lease,
+                # so a worker dying in between can no longer lose it
+                pipe.multi()
+                pipe.lpop(queue_key)
+                pipe.zadd(self._key("leases"), {unit_id: time.time() + visibility_timeout})
+                pipe.hset(self._key("owners"), unit_id, worker_id)
+                pipe.hset(self._key("attempts"), unit_id, attempts)
+                return {"id": unit_id, "kind": unit["kind"], "payload": unit["payload"], "attempts": attempts}
+
+            leased = self.client.transaction(lease_unit, queue_key, value_from_callable=True)
+            if leased is not None:
+                return leased
+        return None
+
+    def extend(self, unit_id, worker_id, visibility_timeout=600):
+        def extend_lease(pipe):
+            if self._text(pipe.hget(self._key("owners"), unit_id)) != worker_id:
+                return False
+            pipe.multi()
+            pipe.zadd(self._key("leases"), {unit_id: time.time() + visibility_timeout})
+            return True
+
+        return self.client.transaction(extend_lease, self._key("owners"), value_from_callable=True)
+
+    def complete(self, unit_id, worker_id):
+        def complete_unit(pipe):
+            if self._text(pipe.hget(self._key("owners"), unit_id)) != worker_id:
+                return
+            pipe.multi()
+            pipe.zrem(self._key("leases"), unit_id)
+            pipe.hdel(self._key("owners"), unit_id)
+            pipe.sadd(self._key("done"), unit_id)
+
+        self.client.transaction(complete_unit, self._key("owners"))
+
+    def fail(self, unit_id, worker_id, error):
+        self._release(unit_id, error, worker_id=worker_id)
+
+    def stats(self):
+        stats = {
+            ("all", "done"): self.client.scard(self._key("done")),
+            ("all", "failed"): self.client.scard(self._key("failed")),
+            ("all", "leased"): self.client.zcard(self._key("leases")),
+        }
+        for kind in ("listing", "download"):
+            stats[(kind, "queued")] = self.client.llen(self._key("queue", kind))
+        return stats
+
+
+def open_work_queue(spec):
+    """
+    Open a queue from a spec string: "redis://host:port/db" for Redis, anything else is a SQLite path.
+    """
+    if spec.startswith(("redis://", "rediss://", "unix://")):
+        return RedisWorkQueue(url=spec)
+    return SQLiteWorkQueue(spec[len("sqlite:"):] if spec.startswith("sqlite:") else spec)
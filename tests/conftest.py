@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The packages are imported from the project root, as the entry points do
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,100 @@
+import sqlite3
+
+import pytest
+from scraper.spider import pdf_store
+from scraper.spider.abstracts import extract_abstract, find_abstract
+from scraper.spider.catalog import PaperCatalog
+
+ABSTRACT = ("We study how large language models can serve as recommender systems. " * 5).strip()
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = PaperCatalog(str(tmp_path / "catalog.db"))
+    yield catalog
+    catalog.close()
+
+
+@pytest.fixture
+def papers(catalog):
+    catalog.add_paper("KDD", 2024, "Large Language Models for Recommendation")
+    catalog.add_paper("KDD", 2024, "Graph Neural Networks at Scale", abstract="Message passing for recommender systems.")
+    catalog.add_paper("ACL", 2023, "Dense Retrieval with Language Models")
+    return catalog
+
+
+def test_search_covers_titles_and_abstracts(papers):
+    if not papers.fts_enabled:
+        pytest.skip("SQLite built without FTS5")
+    # "Graph Neural Networks at Scale" matches through its abstract
+    assert {p["title"] for p in papers.search("recommend*")} == {
+        "Graph Neural Networks at Scale", "Large Language Models for Recommendation"
+    }
+    assert [p["title"] for p in papers.search('"language models"', year=2023)] == [
+        "Dense Retrieval with Language Models"
+    ]
+
+
+def test_abstract_added_later_is_indexed_and_kept(papers):
+    papers.add_paper("ACL", 2023, "Dense Retrieval with Language Models", abstract="Passage ranking for QA.")
+    papers.add_paper("ACL", 2023, "Dense Retrieval with Language Models", pdf_url="https://example.org/a.pdf")
+    record = papers.papers(venue="ACL")[0]
+    assert record["abstract"] == "Passage ranking for QA."
+    assert [p["title"] for p in papers.search("passage")] == ["Dense Retrieval with Language Models"]
+
+
+def test_match_keywords_requires_min_groups(papers):
+    keywords = [["Language Model", "LLM"], ["Recommend"]]
+    assert [p["title"] for p in papers.match_keywords(keywords, min_groups=2)] == [
+        "Large Language Models for Recommendation"
+    ]
+    assert len(papers.match_keywords(keywords, min_groups=1)) == 2
+
+
+def test_catalog_without_sha256_column_is_migrated(tmp_path):
+    db_path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE papers (
+            id INTEGER PRIMARY KEY, venue TEXT NOT NULL, year INTEGER NOT NULL, title TEXT NOT NULL,
+            abstract TEXT, source_url TEXT, pdf_url TEXT, pdf_path TEXT,
+            downloaded INTEGER NOT NULL DEFAULT 0, added_at REAL NOT NULL, UNIQUE (venue, year, title)
+        )
+    """)
+    conn.execute("INSERT INTO papers (venue, year, title, pdf_path, downloaded, added_at) "
+                 "VALUES ('KDD', 2024, 'Old Paper', 'output/2024/Old Paper.pdf', 1, 0)")
+    conn.commit()
+    conn.close()
+
+    catalog = PaperCatalog(db_path)
+    assert catalog.stored_hash("KDD", 2024, "Old Paper") is None
+    catalog.mark_downloaded("KDD", 2024, "Old Paper", "output/KDD/2024/Old Paper.pdf", "ab" * 32)
+    assert catalog.stored_hash("KDD", 2024, "Old Paper") == "ab" * 32
+    catalog.close()
+
+
+def test_find_abstract_needs_an_abstract_section():
+    text = f"Title\nAuthors\nAbstract\n{ABSTRACT}\n1 Introduction\nBody"
+    assert find_abstract(text) == ABSTRACT
+    assert find_abstract("Title\nAuthors\n1 Introduction\nBody") is None
+    # The triage falls back to the first-page text
+    assert extract_abstract("Title\nAuthors\n1 Introduction") == "Title Authors 1 Introduction"
+
+
+def test_fill_abstracts_reads_missing_abstracts_from_the_pdfs(papers, tmp_path, monkeypatch):
+    pdf_path = str(tmp_path / "paper.pdf")
+    with open(pdf_path, "wb") as f:
+        f.write(b"%PDF-1.4 paper")
+    papers.mark_downloaded("KDD", 2024, "Large Language Models for Recommendation", pdf_path)
+    papers.mark_downloaded("KDD", 2024, "Graph Neural Networks at Scale", pdf_path)
+    papers.mark_downloaded("ACL", 2023, "Dense Retrieval with Language Models", str(tmp_path / "missing.pdf"))
+    read = []
+    monkeypatch.setattr(pdf_store, "pdf_abstract", lambda path: read.append(path) or ABSTRACT)
+
+    assert pdf_store.fill_abstracts(papers) == 1
+    # Papers with an abstract and missing files are not read
+    assert read == [pdf_path]
+    abstracts = {p["title"]: p["abstract"] for p in papers.papers()}
+    assert abstracts["Large Language Models for Recommendation"] == ABSTRACT
+    assert abstracts["Graph Neural Networks at Scale"] == "Message passing for recommender systems."
+    assert abstracts["Dense Retrieval with Language Models"] is None
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+from agentic_summary.job_ledger import JobLedger
+
+
+class BadRequestError(Exception):
+    pass
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "paper.pdf"
+    path.write_bytes(b"%PDF-1.4 paper")
+    return str(path)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+
+def test_failing_paper_is_poisoned_after_max_attempts(db_path, pdf_path):
+    ledger = JobLedger(db_path, max_attempts=2)
+    pdf_hash = ledger.pdf_hash(pdf_path)
+    assert ledger.claim(pdf_hash, pdf_path, 2024)
+    assert ledger.fail(pdf_hash, RuntimeError("timeout")) == "failed"
+    assert ledger.claim(pdf_hash, pdf_path, 2024)
+    assert ledger.fail(pdf_hash, RuntimeError("timeout")) == "poisoned"
+    assert not ledger.claim(pdf_hash, pdf_path, 2024)
+
+
+def test_permanent_error_poisons_immediately(db_path, pdf_path):
+    ledger = JobLedger(db_path, max_attempts=3)
+    pdf_hash = ledger.pdf_hash(pdf_path)
+    ledger.claim(pdf_hash, pdf_path)
+    assert ledger.fail(pdf_hash, BadRequestError("content filter")) == "poisoned"
+
+
+def test_crashing_paper_is_poisoned_after_max_reclaims(db_path, pdf_path):
+    # Negative stale_after: every running job counts as abandoned by a dead worker
+    ledger = JobLedger(db_path, max_attempts=2, stale_after=-1)
+    pdf_hash = ledger.pdf_hash(pdf_path)
+    assert ledger.claim(pdf_hash, pdf_path)
+    assert ledger.claim(pdf_hash, pdf_path)
+    assert not ledger.claim(pdf_hash, pdf_path)
+    job = ledger.status(pdf_hash)
+    assert job["status"] == "poisoned"
+    assert job["attempts"] == 2
+    assert job["error_class"] == "WorkerLost"
+
+
+def test_running_job_is_not_claimed_twice(db_path, pdf_path):
+    first = JobLedger(db_path, worker="first")
+    second = JobLedger(db_path, worker="second")
+    pdf_hash = first.pdf_hash(pdf_path)
+    assert first.claim(pdf_hash, pdf_path)
+    assert not second.claim(pdf_hash, pdf_path)
+    first.complete(pdf_hash, "summary.pdf", prompt_tokens=10, completion_tokens=5)
+    assert not second.claim(pdf_hash, pdf_path)
+    assert second.status(pdf_hash)["status"] == "done"
+
+
+def test_release_does_not_count_the_attempt(db_path, pdf_path):
+    ledger = JobLedger(db_path, max_attempts=1)
+    pdf_hash = ledger.pdf_hash(pdf_path)
+    assert ledger.claim(pdf_hash, pdf_path)
+    ledger.release(pdf_hash)
+    assert ledger.status(pdf_hash)["attempts"] == 0
+    assert ledger.claim(pdf_hash, pdf_path)
+
+
+def test_retry_resets_poisoned_papers(db_path, pdf_path):
+    ledger = JobLedger(db_path, max_attempts=1)
+    pdf_hash = ledger.pdf_hash(pdf_path)
+    ledger.claim(pdf_hash, pdf_path)
+    ledger.fail(pdf_hash, RuntimeError("boom"))
+    assert ledger.retry(pdf_hash[:8]) == 1
+    assert ledger.claim(pdf_hash, pdf_path)
+
+
+def test_hash_is_reused_while_the_file_is_unchanged(db_path, pdf_path):
+    ledger = JobLedger(db_path)
+    pdf_hash = ledger.pdf_hash(pdf_path)
+    ledger.claim(pdf_hash, pdf_path)
+    with open(pdf_path, "ab") as f:
+        f.write(b" changed")
+    os.utime(pdf_path, ns=(0, 0))
+    assert ledger.pdf_hash(pdf_path) != pdf_hash
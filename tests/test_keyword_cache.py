@@ -0,0 +1,66 @@
+import sys
+import types
+
+import pytest
+from scraper import keyword_cache
+from scraper.keyword_cache import KeywordCache, cached_augment_keywords, cached_extract_topics
+
+GROUPS = [["llm"], ["recommend"]]
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """Stand-in for `keyword_handling`, recording the LLM calls made through the cached wrappers."""
+    calls = []
+    module = types.ModuleType("keyword_handling")
+    module.augment_keywords = lambda keywords: calls.append("augment") or [group + ["large language model"]
+                                                                           for group in keywords]
+    module.extract_topics = lambda user_input: calls.append("topics") or [["llm"]]
+    monkeypatch.setitem(sys.modules, "keyword_handling", module)
+    return calls
+
+
+def route(monkeypatch, deployment):
+    monkeypatch.setattr(keyword_cache, "STAGE_ROUTES", {"augment_keywords": {"deployment": deployment},
+                                                        "extract_topics": {"deployment": deployment}})
+
+
+def test_augment_keywords_is_cached_under_the_routed_deployment(tmp_path, monkeypatch, llm_calls):
+    route(monkeypatch, "fast-v1")
+    cache = KeywordCache(str(tmp_path))
+    first = cached_augment_keywords(GROUPS, cache=cache)
+    assert cached_augment_keywords(GROUPS, cache=cache) == first
+    assert llm_calls == ["augment"]
+    [(_, entry)] = cache.entries()
+    assert entry["model"] == "fast-v1"
+
+    # Switching the fast deployment invalidates the cached expansions
+    route(monkeypatch, "fast-v2")
+    cached_augment_keywords(GROUPS, cache=cache)
+    assert llm_calls == ["augment", "augment"]
+
+
+def test_extract_topics_is_cached_under_the_routed_deployment(tmp_path, monkeypatch, llm_calls):
+    route(monkeypatch, "fast-v1")
+    cache = KeywordCache(str(tmp_path))
+    assert cached_extract_topics("LLMs for  recommendation", cache=cache) == [["llm"]]
+    assert cached_extract_topics("llms for recommendation", cache=cache) == [["llm"]]
+    assert llm_calls == ["topics"]
+    route(monkeypatch, "fast-v2")
+    cached_extract_topics("LLMs for recommendation", cache=cache)
+    assert llm_calls == ["topics", "topics"]
+
+
+def test_refresh_stores_a_new_version(tmp_path, monkeypatch, llm_calls):
+    route(monkeypatch, "fast-v1")
+    cache = KeywordCache(str(tmp_path))
+    cached_augment_keywords(GROUPS, cache=cache)
+    cached_augment_keywords(GROUPS, refresh=True, cache=cache)
+    [(_, entry)] = cache.entries()
+    assert [item["version"] for item in entry["versions"]] == [1, 2]
+
+
+def test_explicit_model_overrides_the_routes(tmp_path):
+    cache = KeywordCache(str(tmp_path), model="pinned")
+    assert cache.model_for("augment_keywords") == "pinned"
+    assert cache.model_for("extract_topics") == "pinned"
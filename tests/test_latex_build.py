@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from agentic_summary import latex_build
+from agentic_summary.latex_build import SEED_MARKER, build_pdf, seed_document
+
+# Stand-in for tectonic: records its arguments, then fails offline builds with $FAKE_TECTONIC_OFFLINE_ERROR
+FAKE_TECTONIC = """#!{python}
+import os, sys
+with open(os.environ["FAKE_TECTONIC_CALLS"], "a") as f:
+    f.write(" ".join(sys.argv[1:]) + "\\n")
+if "--only-cached" in sys.argv and os.environ.get("FAKE_TECTONIC_OFFLINE_ERROR"):
+    print(os.environ["FAKE_TECTONIC_OFFLINE_ERROR"])
+    sys.exit(1)
+tex_path, output_dir = sys.argv[1], sys.argv[sys.argv.index("--outdir") + 1]
+with open(os.path.join(output_dir, os.path.splitext(os.path.basename(tex_path))[0] + ".pdf"), "w") as f:
+    f.write("%PDF-1.4")
+"""
+
+
+@pytest.fixture
+def tectonic(tmp_path, monkeypatch):
+    if os.name != "posix":
+        pytest.skip("fake tectonic needs a POSIX shebang")
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "tectonic"
+    script.write_text(FAKE_TECTONIC.format(python=sys.executable))
+    script.chmod(0o755)
+    calls_path = tmp_path / "calls.txt"
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_TECTONIC_CALLS", str(calls_path))
+
+    def calls():
+        return calls_path.read_text().splitlines() if calls_path.exists() else []
+    return calls
+
+
+@pytest.fixture
+def seeded_cache(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    preamble = hashlib.sha256(seed_document().encode("utf-8")).hexdigest()
+    (cache_dir / SEED_MARKER).write_text(json.dumps({"preamble": preamble}))
+    return str(cache_dir)
+
+
+@pytest.fixture
+def tex_path(tmp_path):
+    path = tmp_path / "survey.tex"
+    path.write_text(latex_build.markdown_to_latex("# Survey\n\nText.\n")[0])
+    return str(path)
+
+
+def stamp(tex_path):
+    with open(os.path.splitext(tex_path)[0] + latex_build.STAMP_SUFFIX) as f:
+        return json.load(f)
+
+
+def test_seeded_cache_builds_offline_once(tectonic, seeded_cache, tex_path):
+    pdf_path, built = build_pdf(tex_path, os.path.dirname(tex_path), seeded_cache)
+    assert built and os.path.exists(pdf_path)
+    assert stamp(tex_path)["offline"]
+    assert build_pdf(tex_path, os.path.dirname(tex_path), seeded_cache) == (pdf_path, False)
+    assert len(tectonic()) == 1
+
+
+def test_offline_cache_miss_is_retried_online(tectonic, seeded_cache, tex_path, monkeypatch):
+    monkeypatch.setenv("FAKE_TECTONIC_OFFLINE_ERROR", "! LaTeX Error: File `tikz.sty' not found.")
+    _, built = build_pdf(tex_path, os.path.dirname(tex_path), seeded_cache)
+    assert built
+    assert ["--only-cached" in call for call in tectonic()] == [True, False]
+    assert not stamp(tex_path)["offline"]
+
+
+def test_offline_document_error_is_not_retried(tectonic, seeded_cache, tex_path, monkeypatch):
+    monkeypatch.setenv("FAKE_TECTONIC_OFFLINE_ERROR", "! Undefined control sequence.")
+    with pytest.raises(subprocess.CalledProcessError):
+        build_pdf(tex_path, os.path.dirname(tex_path), seeded_cache)
+    assert len(tectonic()) == 1
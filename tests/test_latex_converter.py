@@ -0,0 +1,59 @@
+from agentic_summary.latex_converter import escape, markdown_to_latex
+
+
+def body(document):
+    return document[document.index(r"\maketitle") + len(r"\maketitle"):document.index(r"\end{document}")].strip()
+
+
+def test_escape_special_characters():
+    assert escape(r"5% & $10 a_b #1 {x} ~ ^ | \ ") == (
+        r"5\% \& \$10 a\_b \#1 \{x\} \textasciitilde{} \textasciicircum{} \textbar{} \textbackslash{} "
+    )
+
+
+def test_list_item_starting_with_a_bracket_keeps_it_as_text():
+    document, unsupported = markdown_to_latex("- [1] Smith et al.\n- [2] Doe\n")
+    assert body(document).splitlines() == [
+        r"\begin{itemize}",
+        r"\item{} [1] Smith et al.",
+        r"\item{} [2] Doe",
+        r"\end{itemize}",
+    ]
+    assert unsupported == []
+
+
+def test_nested_and_mixed_lists():
+    document, _ = markdown_to_latex("- **Bold** item\n  - nested *it*\n1. first\n2) second\n")
+    assert body(document).splitlines() == [
+        r"\begin{itemize}",
+        r"\item{} \textbf{Bold} item",
+        r"\begin{itemize}",
+        r"\item{} nested \textit{it}",
+        r"\end{itemize}",
+        r"\end{itemize}",
+        r"\begin{enumerate}",
+        r"\item{} first",
+        r"\item{} second",
+        r"\end{enumerate}",
+    ]
+
+
+def test_list_continues_across_blank_lines_and_wrapped_items():
+    document, _ = markdown_to_latex("- first\n  wraps here\n\n- second\n\nAfter the list.\n")
+    assert body(document).splitlines() == [
+        r"\begin{itemize}",
+        r"\item{} first wraps here",
+        r"\item{} second",
+        r"\end{itemize}",
+        "After the list.",
+    ]
+
+
+def test_list_items_are_escaped_but_keep_math_and_code():
+    document, _ = markdown_to_latex("- 50% of $x_i$ use `a_b` & more\n")
+    assert r"\item{} 50\% of $x_i$ use \texttt{a\_b} \& more" in body(document)
+
+
+def test_unsupported_constructs_are_reported():
+    _, unsupported = markdown_to_latex("Text with ![figure](fig.png) and <div>html</div>.\n")
+    assert unsupported == ["images", "HTML"]
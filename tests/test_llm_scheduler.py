@@ -0,0 +1,115 @@
+import pytest
+from agentic_summary import llm_scheduler
+from agentic_summary.llm_scheduler import LLMScheduler
+from agentic_summary.usage_ledger import usage_context
+
+
+class APIStatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = None
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+class APITimeoutError(APIConnectionError):
+    pass
+
+
+class FakeClient:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "completion"
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(llm_scheduler.time, "sleep", lambda seconds: None)
+
+
+@pytest.mark.parametrize("error", [APIStatusError(500), APIStatusError(503), APIConnectionError("reset"),
+                                   APITimeoutError("timed out")])
+def test_transient_errors_are_retried(error):
+    client = FakeClient([error, error])
+    scheduler = LLMScheduler(client, max_retries=3)
+    assert scheduler.chat.completions.create(model="m", messages=[]) == "completion"
+    assert client.calls == 3
+
+
+def test_client_errors_are_not_retried():
+    client = FakeClient([APIStatusError(400)])
+    with pytest.raises(APIStatusError):
+        LLMScheduler(client, max_retries=3).chat.completions.create(model="m", messages=[])
+    assert client.calls == 1
+
+
+def test_retries_are_bounded():
+    client = FakeClient([APIStatusError(502)] * 5)
+    with pytest.raises(APIStatusError):
+        LLMScheduler(client, max_retries=2).chat.completions.create(model="m", messages=[])
+    assert client.calls == 3
+
+
+class Choice:
+    def __init__(self, finish_reason):
+        self.finish_reason = finish_reason
+
+
+class Completion:
+    usage = None
+
+    def __init__(self, finish_reason="stop"):
+        self.choices = [Choice(finish_reason)]
+
+
+class RecordingClient:
+    def __init__(self, finish_reason="stop"):
+        self.finish_reason = finish_reason
+        self.requests = []
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return Completion(self.finish_reason)
+
+
+def test_route_without_max_tokens_keeps_the_callers_value():
+    client = RecordingClient()
+    scheduler = LLMScheduler(client, routes={"summarize": {"deployment": "fast", "max_tokens": None}})
+    with usage_context(stage="summarize"):
+        scheduler.chat.completions.create(model="strong", messages=[], max_tokens=10000)
+    assert client.requests[0]["model"] == "fast"
+    assert client.requests[0]["max_tokens"] == 10000
+
+
+def test_quota_windows_are_kept_per_deployment():
+    client = RecordingClient()
+    scheduler = LLMScheduler(client, tokens_per_minute=1000,
+                             routes={"triage": {"deployment": "fast", "tokens_per_minute": 50}})
+    scheduler.chat.completions.create(model="strong", messages=[], max_tokens=900)
+    with usage_context(stage="triage"):
+        # Would wait for a minute if it shared the strong deployment's window
+        scheduler.chat.completions.create(model="strong", messages=[], max_tokens=40)
+    assert scheduler.wait_seconds < 1
+    assert set(scheduler.utilization()["deployments"]) == {"strong", "fast"}
+    assert scheduler.utilization()["deployments"]["fast"]["tpm_peak_utilization"] == 40 / 50
+
+
+def test_truncated_answers_are_counted(capsys):
+    scheduler = LLMScheduler(RecordingClient(finish_reason="length"))
+    with usage_context(stage="summarize"):
+        scheduler.chat.completions.create(model="m", messages=[], max_tokens=10)
+    assert scheduler.truncated == 1
+    assert "truncated" in capsys.readouterr().out
@@ -0,0 +1,80 @@
+import os
+
+import pytest
+from scraper.spider.catalog import PaperCatalog
+from scraper.spider.pdf_store import STORE_DIR, PdfStore, file_sha256, migrate
+
+
+@pytest.fixture
+def output(tmp_path):
+    return str(tmp_path / "output")
+
+
+@pytest.fixture
+def store(output):
+    return PdfStore(os.path.join(output, STORE_DIR))
+
+
+@pytest.fixture
+def catalog(output):
+    catalog = PaperCatalog(os.path.join(output, "catalog.db"))
+    yield catalog
+    catalog.close()
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+
+def test_put_deduplicates_identical_content(store, tmp_path):
+    first = store.put(write(str(tmp_path / "a.part"), b"%PDF-1.4 same"))
+    second = store.put(write(str(tmp_path / "b.part"), b"%PDF-1.4 same"))
+    assert first == second
+    assert os.path.exists(store.path(first))
+    assert not os.path.exists(tmp_path / "b.part")
+
+
+def test_views_of_different_papers_with_the_same_title_do_not_collide(store, tmp_path):
+    view_dir = str(tmp_path / "views")
+    first = store.put(write(str(tmp_path / "a.part"), b"%PDF-1.4 one"))
+    second = store.put(write(str(tmp_path / "b.part"), b"%PDF-1.4 two"))
+    first_view = store.link_view(first, view_dir, "Title")
+    second_view = store.link_view(second, view_dir, "Title")
+    assert os.path.basename(first_view) == "Title.pdf"
+    assert os.path.basename(second_view) == f"Title [{second[:8]}].pdf"
+    assert file_sha256(second_view) == second
+    # Linking again is a no-op
+    assert store.link_view(first, view_dir, "Title") == first_view
+
+
+def test_migration_of_records_sharing_a_flat_file(output, store, catalog):
+    shared = write(os.path.join(output, "2024", "Same Title.pdf"), b"%PDF-1.4 shared")
+    other = write(os.path.join(output, "2024", "Other.pdf"), b"%PDF-1.4 other")
+    for venue in ("ACL", "EMNLP"):
+        catalog.add_paper(venue, 2024, "Same Title")
+        catalog.mark_downloaded(venue, 2024, "Same Title", shared)
+    catalog.add_paper("ACL", 2024, "Other")
+    catalog.mark_downloaded("ACL", 2024, "Other", other)
+
+    assert migrate(output, catalog, store) == (3, 0)
+    papers = catalog.papers(downloaded_only=True)
+    assert all(store.has(paper["sha256"]) for paper in papers)
+    assert all(os.path.isfile(paper["pdf_path"]) for paper in papers)
+    assert {os.path.relpath(paper["pdf_path"], output) for paper in papers} == {
+        os.path.join("ACL", "2024", "Same Title.pdf"), os.path.join("EMNLP", "2024", "Same Title.pdf"),
+        os.path.join("ACL", "2024", "Other.pdf")}
+    assert not os.path.exists(shared) and not os.path.exists(other)
+
+    # A second run only checks the views
+    assert migrate(output, catalog, store) == (0, 0)
+    assert all(os.path.isfile(paper["pdf_path"]) for paper in catalog.papers(downloaded_only=True))
+
+
+def test_migration_reports_missing_files(output, store, catalog):
+    catalog.add_paper("ACL", 2024, "Gone")
+    catalog.mark_downloaded("ACL", 2024, "Gone", os.path.join(output, "2024", "Gone.pdf"))
+    assert migrate(output, catalog, store) == (0, 1)
+    assert catalog.papers()[0]["sha256"] is None
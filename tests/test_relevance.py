@@ -0,0 +1,67 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+from scraper.spider.relevance import RelevanceRanker  # noqa: E402
+
+DOCUMENTS = [
+    "Large language models for recommender systems",
+    "A language for large models",
+    "Recommend items with an LLM",
+    "Systems recommender",
+]
+
+
+@pytest.fixture(params=["bm25", "tfidf"])
+def ranker(request):
+    return RelevanceRanker(scheme=request.param).fit(DOCUMENTS)
+
+
+def test_multi_word_option_matches_only_as_a_phrase(ranker):
+    scores = ranker.group_scores([["Large Language Model"], ["Recommender System"]])
+    # "A language for large models" and "Systems recommender" have the words, not the phrase
+    assert (scores[:, 0] > 0).tolist() == [True, False, False, False]
+    assert (scores[:, 1] > 0).tolist() == [True, False, False, False]
+
+
+def test_single_word_options_are_prefix_expanded(ranker):
+    scores = ranker.group_scores([["Recommend"], ["LLM"]])
+    assert (scores[:, 0] > 0).tolist() == [True, False, True, True]
+    assert (scores[:, 1] > 0).tolist() == [False, False, True, False]
+
+
+def test_phrase_does_not_span_two_documents():
+    ranker = RelevanceRanker().fit(["Scaling a large language", "Model merging at scale"])
+    assert not ranker.group_scores([["large language model"]]).any()
+
+
+def test_prefix_match_off_requires_exact_last_word():
+    ranker = RelevanceRanker(prefix_match=False).fit(DOCUMENTS)
+    assert not ranker.group_scores([["Recommender System"]]).any()
+    assert ranker.group_scores([["recommender systems"]])[0, 0] > 0
+
+
+def test_rank_keeps_documents_matching_min_groups(ranker):
+    ranked = ranker.rank([["Large Language Model", "LLM"], ["Recommend"]], min_groups=2)
+    assert sorted(index for index, _ in ranked) == [0, 2]
+
+
+def test_reference_scores_do_not_depend_on_the_best_document():
+    filler = " and other words" * 30
+    ranker = RelevanceRanker().fit([
+        "Graph neural networks, with a short note on a language model" + filler,
+        "Protein folding with diffusion" + filler,
+    ])
+    groups = [["Large Language Model", "language model"]]
+    relative, _ = ranker.score(groups)
+    absolute, _ = ranker.score(groups, reference=True)
+    # Relative to the column maximum, the only (weak) match always scores 1
+    assert relative[0] == pytest.approx(1.0)
+    assert 0 < absolute[0] < 1
+    assert absolute[1] == 0
+
+
+def test_reference_scores_are_capped_at_one():
+    ranker = RelevanceRanker().fit(["LLM LLM LLM LLM", "Unrelated protein folding paper"])
+    scores, _ = ranker.score([["LLM"]], reference=True)
+    assert scores[0] == pytest.approx(1.0)
@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+pytest.importorskip("pdf2image")
+pytest.importorskip("fpdf")
+
+from agentic_summary.agentic_summarization import Agentic_Summarization  # noqa: E402
+from scraper.spider.catalog import PaperCatalog  # noqa: E402
+from scraper.spider.pdf_store import STORE_DIR, PdfStore  # noqa: E402
+
+
+@pytest.fixture
+def scraped(tmp_path):
+    """
+    Scraper output with the same title at two venues (different PDFs) and one PDF shared by two venues.
+    """
+    input_path = str(tmp_path / "scraper")
+    store = PdfStore(os.path.join(input_path, STORE_DIR))
+    catalog = PaperCatalog(os.path.join(input_path, "catalog.db"))
+    for venue, title, content in [("ACL", "Same Title", b"%PDF-1.4 acl"), ("EMNLP", "Same Title", b"%PDF-1.4 emnlp"),
+                                  ("ACL", "Shared", b"%PDF-1.4 shared"), ("NAACL", "Shared", b"%PDF-1.4 shared")]:
+        part_path = store.partial_path(title)
+        with open(part_path, "wb") as f:
+            f.write(content)
+        sha256 = store.put(part_path)
+        view_path = store.link_view(sha256, os.path.join(input_path, venue, "2024"), title)
+        catalog.add_paper(venue, 2024, title)
+        catalog.mark_downloaded(venue, 2024, title, view_path, sha256)
+    yield input_path, catalog
+    catalog.close()
+
+
+def summarization(input_path, output_path, catalog):
+    return Agentic_Summarization(input_path, output_path, "deployment", None, 72, 80, 100, 0, 1, 0, 0,
+                                 catalog=catalog)
+
+
+def test_same_title_at_two_venues_gets_two_summaries(scraped, tmp_path, monkeypatch):
+    input_path, catalog = scraped
+    output_path = str(tmp_path / "summaries")
+    summarizer = summarization(input_path, output_path, catalog)
+
+    pdfs = summarizer.pdf_files_by_year([2024])["2024"]
+    assert sorted((venue, os.path.basename(pdf_path)) for pdf_path, _, venue in pdfs) == [
+        ("ACL", "Same Title.pdf"), ("ACL", "Shared.pdf"), ("EMNLP", "Same Title.pdf")]
+
+    # The first venue's summary exists: the other venue's paper with the same title is still summarized
+    os.makedirs(os.path.join(output_path, "2024", "ACL"))
+    open(os.path.join(output_path, "2024", "ACL", "Same Title_summary.pdf"), "wb").close()
+    jobs = []
+    monkeypatch.setattr(summarizer, "run_job", lambda pdf_path, year, pdf_hash, venue: jobs.append((venue, pdf_hash)))
+    summarizer.process_pdfs_by_year([2024])
+    assert sorted(venue for venue, _ in jobs) == ["ACL", "EMNLP"]
+    assert summarizer.summary_dir("2024", "EMNLP") == os.path.join(output_path, "2024", "EMNLP")
+
+
+def test_missing_views_are_linked_again(scraped, tmp_path):
+    input_path, catalog = scraped
+    os.remove(os.path.join(input_path, "EMNLP", "2024", "Same Title.pdf"))
+    pdfs = summarization(input_path, str(tmp_path / "summaries"), catalog).pdf_files_by_year([2024])["2024"]
+    assert os.path.join(input_path, "EMNLP", "2024", "Same Title.pdf") in [pdf_path for pdf_path, _, _ in pdfs]
+
+
+def test_flat_pdfs_without_a_catalog_record_are_still_listed(scraped, tmp_path):
+    input_path, catalog = scraped
+    # Downloaded into the flat `{year}/` layout before the catalog existed
+    os.makedirs(os.path.join(input_path, "2024"))
+    flat_path = os.path.join(input_path, "2024", "Pre Catalog.pdf")
+    with open(flat_path, "wb") as f:
+        f.write(b"%PDF-1.4 pre-catalog")
+    catalog.add_paper("KDD", 2024, "Recorded Flat")
+    recorded_path = os.path.join(input_path, "2024", "Recorded Flat.pdf")
+    with open(recorded_path, "wb") as f:
+        f.write(b"%PDF-1.4 recorded")
+    catalog.mark_downloaded("KDD", 2024, "Recorded Flat", recorded_path)
+
+    pdfs = summarization(input_path, str(tmp_path / "summaries"), catalog).pdf_files_by_year([2024])["2024"]
+    assert (flat_path, None, None) in pdfs
+    # The flat PDF the catalog knows about is listed once, under its venue
+    assert [venue for pdf_path, _, venue in pdfs if pdf_path == recorded_path] == ["KDD"]
+    assert len(pdfs) == 5
@@ -0,0 +1,63 @@
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+from agentic_summary import triage
+from agentic_summary.triage import PaperTriage
+
+ABSTRACTS = {"relevant.pdf": "Large language models for recommendation.",
+             "flaky.pdf": "A paper the grader fails on.",
+             "unrelated.pdf": "Protein folding with diffusion."}
+
+
+class FakeCompletions:
+    """Grades abstracts by file, raising for the ones listed in `failing`."""
+
+    def __init__(self, grades, failing=()):
+        self.grades = grades
+        self.failing = set(failing)
+        self.graded = []
+
+    def create(self, model, messages, **kwargs):
+        abstract = messages[-1]["content"]
+        name = next(name for name, text in ABSTRACTS.items() if text in abstract)
+        self.graded.append(name)
+        if name in self.failing:
+            raise ConnectionError("grader unavailable")
+        message = SimpleNamespace(content=str(self.grades[name]))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+@pytest.fixture
+def pdf_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(triage, "read_first_pages", lambda pdf_path, pages: (ABSTRACTS[os.path.basename(pdf_path)], 8))
+    return [str(tmp_path / name) for name in ABSTRACTS]
+
+
+def llm_triage(completions):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return PaperTriage(["llm"], method="llm", threshold=0.5, client=client, deployment_name="fast")
+
+
+def test_failed_grade_keeps_the_paper_and_is_retried_next_run(tmp_path, pdf_paths):
+    output_path = str(tmp_path / "output")
+    completions = FakeCompletions({"relevant.pdf": 9, "flaky.pdf": 8, "unrelated.pdf": 1}, failing=["flaky.pdf"])
+    kept = llm_triage(completions).select("2024", pdf_paths, output_path)
+    assert [os.path.basename(path) for path in kept] == ["relevant.pdf", "flaky.pdf"]
+
+    with open(os.path.join(output_path, "2024", "triage.json")) as f:
+        report = json.load(f)
+    scores = {paper["file"]: paper["score"] for paper in report["kept"] + report["skipped"]}
+    assert scores == {"relevant.pdf": 0.9, "flaky.pdf": None, "unrelated.pdf": 0.1}
+
+    # Only the paper that could not be graded is sent to the LLM again
+    completions = FakeCompletions({"relevant.pdf": 9, "flaky.pdf": 2, "unrelated.pdf": 1})
+    kept = llm_triage(completions).select("2024", pdf_paths, output_path)
+    assert completions.graded == ["flaky.pdf"]
+    assert [os.path.basename(path) for path in kept] == ["relevant.pdf"]
+
+
+def test_unparseable_grade_counts_as_ungraded():
+    completions = FakeCompletions({"relevant.pdf": "highly relevant", "flaky.pdf": 8, "unrelated.pdf": 1})
+    assert llm_triage(completions).score_llm(ABSTRACTS["relevant.pdf"]) is None
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import pytest
+from agentic_summary.llm_scheduler import LLMScheduler
+from agentic_summary.usage_ledger import BudgetExceededError, UsageLedger, usage_context
+
+IMAGE_MESSAGES = [{"role": "user", "content": [
+    {"type": "text", "text": "Summarize."},
+    {"type": "image_url", "image_url": {"url": "data:image/jpeg;base64,AAAA", "detail": "high"}},
+]}]
+
+
+class RecordingClient:
+    """Answers every request with 600 prompt and 400 completion tokens and keeps the requests sent."""
+
+    def __init__(self):
+        self.requests = []
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return SimpleNamespace(choices=[], usage=SimpleNamespace(prompt_tokens=600, completion_tokens=400))
+
+
+def scheduled(tmp_path, policy):
+    ledger = UsageLedger(str(tmp_path / "usage.db"), token_budget=1500, policy=policy)
+    client = RecordingClient()
+    return ledger, client, LLMScheduler(client, ledger=ledger, downgrade_max_tokens=300)
+
+
+def summarize(scheduler):
+    with usage_context(stage="summarize", paper="paper.pdf"):
+        return scheduler.chat.completions.create(model="gpt", messages=IMAGE_MESSAGES, max_tokens=4000)
+
+
+def test_stop_policy_refuses_requests_once_over_budget(tmp_path):
+    ledger, client, scheduler = scheduled(tmp_path, "stop")
+    summarize(scheduler)
+    summarize(scheduler)
+    assert ledger.over_budget()
+    with pytest.raises(BudgetExceededError):
+        summarize(scheduler)
+    # The refused request never reaches the API and is not recorded
+    assert len(client.requests) == 2
+    assert ledger.summary()[0]["calls"] == 2
+    ledger.close()
+
+
+def test_downgrade_policy_sends_cheaper_requests_and_records_them(tmp_path):
+    ledger, client, scheduler = scheduled(tmp_path, "downgrade")
+    for _ in range(3):
+        summarize(scheduler)
+
+    first, second, third = client.requests
+    assert first["max_tokens"] == second["max_tokens"] == 4000
+    assert third["max_tokens"] == 300
+    assert third["messages"][0]["content"][1]["image_url"]["detail"] == "low"
+    # The caller's messages are left untouched
+    assert IMAGE_MESSAGES[0]["content"][1]["image_url"]["detail"] == "high"
+
+    [row] = ledger.summary()
+    assert row["name"] == "summarize"
+    assert row["calls"] == 3
+    assert row["downgraded"] == 1
+    downgraded = ledger.conn.execute("SELECT downgraded FROM llm_calls ORDER BY id").fetchall()
+    assert [r["downgraded"] for r in downgraded] == [0, 0, 1]
+    ledger.close()
+
+
+def test_cost_budget_counts_priced_calls(tmp_path):
+    ledger = UsageLedger(str(tmp_path / "usage.db"), prices={"gpt": (0.01, 0.03)}, cost_budget=0.02)
+    with usage_context(stage="summarize"):
+        assert ledger.record("gpt", 600, 400, 0, 1.0) == pytest.approx(0.018)
+        assert not ledger.check_budget()
+        ledger.record("gpt", 600, 400, 0, 1.0)
+        with pytest.raises(BudgetExceededError):
+            ledger.check_budget()
+    ledger.close()
@@ -0,0 +1,126 @@
+import pytest
+from scraper.spider.work_queue import RedisWorkQueue, SQLiteWorkQueue
+
+fakeredis = pytest.importorskip("fakeredis")
+redis = pytest.importorskip("redis")
+
+
+@pytest.fixture
+def redis_queue():
+    return RedisWorkQueue(client=fakeredis.FakeRedis(), max_attempts=2)
+
+
+@pytest.fixture
+def sqlite_queue(tmp_path):
+    return SQLiteWorkQueue(str(tmp_path / "work_queue.db"), max_attempts=2)
+
+
+@pytest.fixture
+def drop_next_exec(monkeypatch):
+    """The connection drops when the next transaction is sent, as when a worker dies mid-operation."""
+    def drop():
+        def execute(self, raise_on_error=True):
+            monkeypatch.undo()
+            raise redis.ConnectionError("connection lost")
+        monkeypatch.setattr(redis.client.Pipeline, "execute", execute)
+    return drop
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def queue(request):
+    return request.getfixturevalue(f"{request.param}_queue")
+
+
+def test_publishing_twice_queues_one_unit(queue):
+    first = queue.publish("download", {"url": "https://example.org/a.pdf"})
+    second = queue.publish("download", {"url": "https://example.org/a.pdf"})
+    assert first == second
+    assert queue.lease("w1", kinds=["download"])["id"] == first
+    assert queue.lease("w2", kinds=["download"]) is None
+
+
+def test_expired_lease_goes_to_another_worker(queue):
+    unit_id = queue.publish("listing", {"venue": "kdd", "year": 2024})
+    assert queue.lease("w1", kinds=["listing"], visibility_timeout=-1)["attempts"] == 1
+
+    leased = queue.lease("w2", kinds=["listing"])
+    assert leased["id"] == unit_id
+    assert leased["attempts"] == 2
+    # The first worker lost its lease and can no longer extend or complete the unit
+    assert not queue.extend(unit_id, "w1")
+    queue.complete(unit_id, "w1")
+    assert queue.extend(unit_id, "w2")
+
+
+def test_unit_fails_after_max_attempts(queue):
+    queue.publish("download", {"url": "https://example.org/b.pdf"})
+    for worker_id in ("w1", "w2"):
+        leased = queue.lease(worker_id, kinds=["download"])
+        queue.fail(leased["id"], worker_id, "HTTP 500")
+    assert queue.lease("w3", kinds=["download"]) is None
+
+
+def test_expired_lease_fails_after_max_attempts(queue):
+    queue.publish("download", {"url": "https://example.org/c.pdf"})
+    for worker_id in ("w1", "w2"):
+        assert queue.lease(worker_id, kinds=["download"], visibility_timeout=-1)
+    assert queue.lease("w3", kinds=["download"]) is None
+
+
+def test_redis_failed_and_done_units_are_counted(redis_queue):
+    failing = redis_queue.publish("download", {"url": "https://example.org/d.pdf"})
+    redis_queue.publish("download", {"url": "https://example.org/e.pdf"})
+    for worker_id in ("w1", "w2"):
+        assert redis_queue.lease(worker_id, kinds=["download"])["id"] == failing
+        redis_queue.fail(failing, worker_id, "HTTP 500")
+        if worker_id == "w1":
+            done = redis_queue.lease("w1", kinds=["download"])
+            redis_queue.complete(done["id"], "w1")
+    stats = redis_queue.stats()
+    assert stats[("all", "done")] == 1
+    assert stats[("all", "failed")] == 1
+    assert stats[("all", "leased")] == 0
+    assert stats[("download", "queued")] == 0
+
+
+def test_redis_publish_interrupted_before_exec_leaves_nothing_half_queued(redis_queue, drop_next_exec):
+    payload = {"url": "https://example.org/f.pdf"}
+    drop_next_exec()
+    with pytest.raises(redis.ConnectionError):
+        redis_queue.publish("download", payload)
+    assert redis_queue.client.scard(redis_queue._key("seen")) == 0
+
+    # Publishing again after the failure queues the unit
+    unit_id = redis_queue.publish("download", payload)
+    assert redis_queue.lease("w1", kinds=["download"])["id"] == unit_id
+
+
+def test_redis_lease_interrupted_before_exec_keeps_the_unit_queued(redis_queue, drop_next_exec):
+    unit_id = redis_queue.publish("download", {"url": "https://example.org/g.pdf"})
+    drop_next_exec()
+    with pytest.raises(redis.ConnectionError):
+        redis_queue.lease("w1", kinds=["download"])
+    assert redis_queue.stats()[("download", "queued")] == 1
+    assert redis_queue.stats()[("all", "leased")] == 0
+    leased = redis_queue.lease("w2", kinds=["download"])
+    assert leased["id"] == unit_id
+    assert leased["attempts"] == 1
+
+
+def test_redis_lease_retries_when_another_worker_takes_the_unit(redis_queue, monkeypatch):
+    first = redis_queue.publish("download", {"url": "https://example.org/h.pdf"})
+    second = redis_queue.publish("download", {"url": "https://example.org/i.pdf"})
+    lindex = redis.client.Pipeline.lindex
+
+    def racing_lindex(self, name, index):
+        # Another worker pops the head of the queue between our read and our transaction
+        monkeypatch.undo()
+        unit_id = lindex(self, name, index)
+        redis_queue.client.lpop(name)
+        return unit_id
+    monkeypatch.setattr(redis.client.Pipeline, "lindex", racing_lindex, raising=False)
+
+    leased = redis_queue.lease("w1", kinds=["download"])
+    assert leased["id"] == second != first
+    assert redis_queue.stats()[("download", "queued")] == 0
+    assert redis_queue.stats()[("all", "leased")] == 1